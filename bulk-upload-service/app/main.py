@@ -3,7 +3,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from app.services.file_upload import handle_file_upload
 from app.services.metadata_parser import MetadataParser
-from app.services.message_queue import publish_event
+from app.services.message_queue import publish_events
 import datetime
 import uuid
 import logging
@@ -53,8 +53,9 @@ async def bulk_upload(file: UploadFile = File(...)):
         job_id = str(uuid.uuid4())
         batch_result = parser.parse_file(file_path, job_id)
 
-        # Step 3: Send batch message to the message queue
-        publish_event("bulk_metadata_upload", batch_result)
+        # Step 3: Send the records to the message queue in batches, so
+        # metadata-service workers can write them concurrently
+        publish_events("bulk_metadata_upload", parser.split_batches(batch_result))
 
         # Return job information
         return JSONResponse(
@@ -32,4 +32,30 @@ def publish_event(event_type: str, payload: dict):
         connection.close()
     except Exception as e:
         logger.error(f"Failed to publish event: {str(e)}")
-        raise
\ No newline at end of file
+        raise
+
+
+def publish_events(event_type: str, payloads: list):
+    """Publish several messages to one queue over a single connection"""
+    try:
+        connection = get_rabbitmq_connection()
+        channel = connection.channel()
+
+        channel.queue_declare(queue=event_type, durable=True)
+
+        for payload in payloads:
+            channel.basic_publish(
+                exchange="",
+                routing_key=event_type,
+                body=json.dumps(payload),
+                properties=pika.BasicProperties(
+                    delivery_mode=2,
+                    content_type='application/json'
+                )
+            )
+
+        logger.info(f"Published {len(payloads)} messages to queue: {event_type}")
+        connection.close()
+    except Exception as e:
+        logger.error(f"Failed to publish events: {str(e)}")
+        raise
@@ -68,6 +68,26 @@ class MetadataParser:
             logger.error(f"Failed to parse file {file_path}: {e}")
             raise
     
+    def split_batches(self, batch_message: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Split a parsed job into messages of at most batch_size records"""
+        records = batch_message["records"]
+        total_batches = max(1, -(-len(records) // self.batch_size))
+        batches = []
+        for index in range(total_batches):
+            batch = {
+                **batch_message,
+                "batch_id": index + 1,
+                "total_batches": total_batches,
+                "total_records": len(records),
+                "records": records[index * self.batch_size:(index + 1) * self.batch_size],
+                # Parser errors are reported once per job
+                "validation_errors": batch_message["validation_errors"] if index == 0 else []
+            }
+            for record in batch["records"]:
+                record["source"]["batch_id"] = index + 1
+            batches.append(batch)
+        return batches
+    
     def _parse_csv(self, file_path: str) -> List[Dict[str, Any]]:
         """Parse CSV file using streaming approach"""
         records = []
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from fastapi import APIRouter, HTTPException, status
+
+from app.services.bulk_metadata_consumer import bulk_job_tracker
+
+
+router = APIRouter(prefix="/bulk-jobs", tags=["bulk-jobs"])
+
+
+@router.get("/{job_id}")
+def read_bulk_job(job_id: str) -> Dict[str, Any]:
+    progress = bulk_job_tracker.get(job_id)
+    if progress is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Bulk job {job_id} not found")
+    return progress
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, status
 
 from app.schemas.document_metadata import (
     DocumentMetadataHistoryResponse,
+    DocumentMetadataListResponse,
     DocumentMetadataResponse,
     DocumentMetadataUpdate,
 )
@@ -22,24 +23,67 @@ from app.services.postgres_service import (
 router = APIRouter(prefix="/documents", tags=["documents"])
 
 
+@router.get("", response_model=DocumentMetadataListResponse)
+def list_documents(
+    user_id: Optional[UUID] = None,
+    category: Optional[str] = None,
+    division: Optional[str] = None,
+    business_unit: Optional[str] = None,
+    brand_id: Optional[UUID] = None,
+    file_type: Optional[str] = None,
+    document_type: Optional[str] = None,
+    tags: Optional[List[str]] = Query(None, description="Only documents carrying all of these tags"),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+) -> DocumentMetadataListResponse:
+    filters = {
+        "user_id": user_id,
+        "category": category,
+        "division": division,
+        "business_unit": business_unit,
+        "brand_id": brand_id,
+        "file_type": file_type,
+        "document_type": document_type,
+    }
+    try:
+        records, next_cursor = get_document_service().list_documents(
+            filters, tags=tags, limit=limit, cursor=cursor
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return DocumentMetadataListResponse(
+        items=[DocumentMetadataResponse.model_validate(record.to_dict()) for record in records],
+        next_cursor=next_cursor,
+    )
+
+
 @router.get("/{document_id}", response_model=DocumentMetadataResponse)
 def read_document(document_id: UUID, include_deleted: bool = False) -> DocumentMetadataResponse:
     try:
         record = get_document_service().get_latest_document(document_id, include_deleted=include_deleted)
     except DocumentNotFoundError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
-    return DocumentMetadataResponse.model_validate(record)
+    return DocumentMetadataResponse.model_validate(record.to_dict())
 
 
 @router.get("/{document_id}/history", response_model=DocumentMetadataHistoryResponse)
-def read_document_history(document_id: UUID) -> DocumentMetadataHistoryResponse:
-    history = list_document_history(document_id)
-    if not history:
+def read_document_history(
+    document_id: UUID,
+    limit: int = Query(100, ge=1, le=1000),
+    before_revision: Optional[int] = Query(None, ge=1, description="next_before_revision from the previous page"),
+) -> DocumentMetadataHistoryResponse:
+    # One extra revision tells whether another page follows
+    history = list_document_history(document_id, limit=limit + 1, before_revision=before_revision)
+    if not history and before_revision is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
+    next_before_revision = None
+    if len(history) > limit:
+        history = history[:limit]
+        next_before_revision = history[-1]["revision"]
     items: List[DocumentMetadataResponse] = [
-        DocumentMetadataResponse.model_validate(record) for record in history
+        DocumentMetadataResponse.model_validate(record.to_dict()) for record in history
     ]
-    return DocumentMetadataHistoryResponse(items=items)
+    return DocumentMetadataHistoryResponse(items=items, next_before_revision=next_before_revision)
 
 
 @router.put("/{document_id}", response_model=DocumentMetadataResponse)
@@ -48,7 +92,7 @@ def update_document(document_id: UUID, payload: DocumentMetadataUpdate) -> Docum
         record = update_document_metadata(document_id, payload.model_dump(exclude_unset=True))
     except DocumentNotFoundError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
-    return DocumentMetadataResponse.model_validate(record)
+    return DocumentMetadataResponse.model_validate(record.to_dict())
 
 
 @router.delete("/{document_id}", response_model=DocumentMetadataResponse)
@@ -57,4 +101,4 @@ def delete_document(document_id: UUID) -> DocumentMetadataResponse:
         record = delete_document_metadata(document_id)
     except DocumentNotFoundError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
-    return DocumentMetadataResponse.model_validate(record)
+    return DocumentMetadataResponse.model_validate(record.to_dict())
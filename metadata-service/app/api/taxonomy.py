@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+from fastapi import APIRouter
+
+from app.config import taxonomy_cache
+
+
+router = APIRouter(prefix="/admin/taxonomy", tags=["admin"])
+
+
+@router.post("/reload")
+def reload_taxonomy() -> Dict[str, Any]:
+    taxonomy = taxonomy_cache.reload()
+    return {
+        "loaded_at": datetime.fromtimestamp(taxonomy_cache.loaded_at, timezone.utc).isoformat(),
+        "regions": len(taxonomy.regions),
+        "countries": len(taxonomy.languages_by_country),
+        "categories": len(taxonomy.categories),
+        "divisions": len(taxonomy.divisions),
+        "business_units": len(taxonomy.business_units),
+        "document_types": len(taxonomy.document_types),
+    }
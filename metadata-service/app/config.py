@@ -1,38 +1,127 @@
 import json
+import logging
+import os
+import threading
+import time
 from pathlib import Path
-from typing import Dict, List
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Mapping, Optional
+
+logger = logging.getLogger(__name__)
 
 CONFIG_DIR = Path(__file__).parent.parent / "config"
 
-def _load_config(filename: str) -> Dict:
-    """Helper function to load JSON config files"""
-    with open(CONFIG_DIR / filename) as f:
-        return json.load(f)
+TAXONOMY_FILES = (
+    "regions.json",
+    "countries.json",
+    "categories.json",
+    "divisions.json",
+    "business_units.json",
+    "document_types.json",
+)
+
+# How often, at most, the taxonomy files are stat'ed for changes
+TAXONOMY_CHECK_INTERVAL_SECONDS = float(os.getenv("TAXONOMY_CHECK_INTERVAL_SECONDS", "5"))
+
+class Taxonomy:
+    """Immutable snapshot of the taxonomy files, shaped for O(1) membership checks"""
+
+    def __init__(self, configs: Dict[str, Dict]):
+        regions = configs["regions.json"]["regions"]
+        countries = configs["countries.json"]["countries"]
+        self.regions: FrozenSet[str] = frozenset(region["name"] for region in regions)
+        self.countries_by_region: Mapping[str, FrozenSet[str]] = MappingProxyType({
+            region["name"]: frozenset(region.get("countries", [])) for region in regions
+        })
+        self.languages_by_country: Mapping[str, FrozenSet[str]] = MappingProxyType({
+            country["name"]: frozenset(language["code"] for language in country.get("languages", []))
+            for country in countries
+        })
+        self.categories: FrozenSet[str] = frozenset(configs["categories.json"]["categories"])
+        self.divisions: FrozenSet[str] = frozenset(configs["divisions.json"]["divisions"])
+        self.business_units: FrozenSet[str] = frozenset(configs["business_units.json"]["business_units"])
+        self.document_types: FrozenSet[str] = frozenset(configs["document_types.json"]["document_types"])
+
+class TaxonomyCache:
+    """
+    Loads the taxonomy once and serves the same snapshot until a file changes
+
+    File modification times are checked at most every `check_interval` seconds;
+    `reload` forces a fresh load. A snapshot is replaced as a whole, so readers
+    never see a mix of old and new files. If a changed file is missing or only
+    half written, `get` keeps serving the previous snapshot and tries again on
+    the next check.
+    """
+
+    def __init__(self, directory: Path, check_interval: float):
+        self.directory = directory
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._taxonomy: Optional[Taxonomy] = None
+        self._mtimes: Dict[str, float] = {}
+        self._next_check = 0.0
+        self.loaded_at: Optional[float] = None
+
+    def _current_mtimes(self) -> Dict[str, float]:
+        return {filename: os.stat(self.directory / filename).st_mtime for filename in TAXONOMY_FILES}
+
+    def reload(self) -> Taxonomy:
+        """Load all taxonomy files now and return the new snapshot"""
+        with self._lock:
+            mtimes = self._current_mtimes()
+            configs = {}
+            for filename in TAXONOMY_FILES:
+                with open(self.directory / filename) as f:
+                    configs[filename] = json.load(f)
+            self._taxonomy = Taxonomy(configs)
+            self._mtimes = mtimes
+            self.loaded_at = time.time()
+            self._next_check = time.monotonic() + self.check_interval
+            return self._taxonomy
+
+    def get(self) -> Taxonomy:
+        taxonomy = self._taxonomy
+        if taxonomy is None:
+            return self.reload()
+        if time.monotonic() >= self._next_check:
+            self._next_check = time.monotonic() + self.check_interval
+            try:
+                if self._current_mtimes() != self._mtimes:
+                    return self.reload()
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Could not reload taxonomy, keeping the previous one: {str(e)}")
+        return taxonomy
+
+taxonomy_cache = TaxonomyCache(CONFIG_DIR, TAXONOMY_CHECK_INTERVAL_SECONDS)
+
+def get_taxonomy() -> Taxonomy:
+    """Get the current taxonomy snapshot"""
+    return taxonomy_cache.get()
 
-def get_regions() -> List[str]:
-    """Get list of available regions"""
-    return _load_config("regions.json")["regions"]
+def get_regions() -> FrozenSet[str]:
+    """Get set of available region names"""
+    return get_taxonomy().regions
 
-def get_countries() -> Dict[str, List[str]]:
+def get_countries() -> Mapping[str, FrozenSet[str]]:
     """Get mapping of regions to countries"""
-    return _load_config("countries.json")
+    return get_taxonomy().countries_by_region
 
-def get_languages() -> Dict[str, List[str]]:
-    """Get mapping of countries to languages"""
-    return _load_config("countries.json")  # Reusing countries.json since it contains languages
+def get_languages() -> Mapping[str, FrozenSet[str]]:
+    """Get mapping of countries to language codes"""
+    return get_taxonomy().languages_by_country
 
-def get_categories() -> List[str]:
-    """Get list of document categories"""
-    return _load_config("categories.json")["categories"]
+def get_categories() -> FrozenSet[str]:
+    """Get set of document categories"""
+    return get_taxonomy().categories
 
-def get_divisions() -> List[str]:
-    """Get list of organizational divisions"""
-    return _load_config("divisions.json")["divisions"]
+def get_divisions() -> FrozenSet[str]:
+    """Get set of organizational divisions"""
+    return get_taxonomy().divisions
 
-def get_business_units() -> List[str]:
-    """Get list of business units"""
-    return _load_config("business_units.json")["business_units"]
+def get_business_units() -> FrozenSet[str]:
+    """Get set of business units"""
+    return get_taxonomy().business_units
 
-def get_document_types() -> List[str]:
-    """Get list of document types"""
-    return _load_config("document_types.json")["document_types"]
+def get_document_types() -> FrozenSet[str]:
+    """Get set of document types"""
+    return get_taxonomy().document_types
@@ -7,9 +7,13 @@ import logging
 import uuid
 from datetime import datetime, timezone
 
+from app.api import bulk_jobs as bulk_jobs_router
 from app.api import documents as documents_router
+from app.api import taxonomy as taxonomy_router
+from app.services.bulk_metadata_consumer import start_bulk_metadata_workers
+from app.services.document_cache import cache_invalidation_bus, latest_document_cache
 from app.services.message_queue import listen_for_events
-from app.services.postgres_service import save_document_metadata
+from app.services.postgres_service import close_connection_pool, get_document_service, save_document_metadata
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -106,12 +110,18 @@ async def lifespan(app: FastAPI):
     listener_thread = threading.Thread(target=run_event_listener, daemon=True)
     listener_thread.start()
     logger.info("Metadata event listener started")
+    start_bulk_metadata_workers(get_document_service())
+    if cache_invalidation_bus is not None:
+        cache_invalidation_bus.start()
     yield
     # Shutdown: Clean up if needed
     logger.info("Shutting down metadata service")
+    close_connection_pool()
 
 app = FastAPI(lifespan=lifespan)
 app.include_router(documents_router.router)
+app.include_router(bulk_jobs_router.router)
+app.include_router(taxonomy_router.router)
 
 @app.get("/health")
 async def health_check():
@@ -121,4 +131,11 @@ async def health_check():
         content={"status": "healthy", "service": "metadata-service"}
     )
 
+@app.get("/metrics")
+async def metrics():
+    """Cache statistics for the latest-document read path"""
+    return {
+        "document_cache": latest_document_cache.stats() if latest_document_cache is not None else None
+    }
+
 # ... rest of your endpoints remain the same
@@ -79,14 +79,14 @@ class DocumentMetadata(BaseModel):
     @validator('region')
     def validate_region(cls, v):
         if v and v not in get_regions():
-            raise ValueError(f"Invalid region. Must be one of: {', '.join(get_regions())}")
+            raise ValueError(f"Invalid region. Must be one of: {', '.join(sorted(get_regions()))}")
         return v
 
     @validator('country')
     def validate_country(cls, v, values):
         if v:
             if 'region' in values and values['region']:
-                region_countries = get_countries().get(values['region'], [])
+                region_countries = get_countries().get(values['region'], frozenset())
                 if v not in region_countries:
                     raise ValueError(f"Invalid country for region {values['region']}")
             return v
@@ -95,7 +95,7 @@ class DocumentMetadata(BaseModel):
     @validator('languages')
     def validate_languages(cls, v, values):
         if v and 'country' in values and values['country']:
-            country_languages = get_languages().get(values['country'], [])
+            country_languages = get_languages().get(values['country'], frozenset())
             invalid_languages = [lang for lang in v if lang not in country_languages]
             if invalid_languages:
                 raise ValueError(f"Invalid languages for country {values['country']}: {', '.join(invalid_languages)}")
@@ -104,25 +104,25 @@ class DocumentMetadata(BaseModel):
     @validator('category')
     def validate_category(cls, v):
         if v and v not in get_categories():
-            raise ValueError(f"Invalid category. Must be one of: {', '.join(get_categories())}")
+            raise ValueError(f"Invalid category. Must be one of: {', '.join(sorted(get_categories()))}")
         return v
 
     @validator('division')
     def validate_division(cls, v):
         if v and v not in get_divisions():
-            raise ValueError(f"Invalid division. Must be one of: {', '.join(get_divisions())}")
+            raise ValueError(f"Invalid division. Must be one of: {', '.join(sorted(get_divisions()))}")
         return v
 
     @validator('business_unit')
     def validate_business_unit(cls, v):
         if v and v not in get_business_units():
-            raise ValueError(f"Invalid business unit. Must be one of: {', '.join(get_business_units())}")
+            raise ValueError(f"Invalid business unit. Must be one of: {', '.join(sorted(get_business_units()))}")
         return v
 
     @validator('document_type')
     def validate_document_type(cls, v):
         if v not in get_document_types():
-            raise ValueError(f"Invalid document type. Must be one of: {', '.join(get_document_types())}")
+            raise ValueError(f"Invalid document type. Must be one of: {', '.join(sorted(get_document_types()))}")
         return v
 
 class BrandMetadata(BaseModel):
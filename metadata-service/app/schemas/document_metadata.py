@@ -40,6 +40,12 @@ class DocumentMetadataResponse(DocumentMetadataBase):
 
 class DocumentMetadataHistoryResponse(BaseModel):
     items: List[DocumentMetadataResponse]
+    next_before_revision: Optional[int] = None
+
+
+class DocumentMetadataListResponse(BaseModel):
+    items: List[DocumentMetadataResponse]
+    next_cursor: Optional[str] = None
 
 
 class DocumentMetadataUpdate(BaseModel):
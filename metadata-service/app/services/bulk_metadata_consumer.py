@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from uuid import UUID, uuid5
+
+from dotenv import load_dotenv
+
+from .document_service import DocumentService
+from .message_queue import listen_for_events
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+BULK_METADATA_QUEUE = os.getenv("BULK_METADATA_QUEUE", "bulk_metadata_upload")
+# Consumer threads, each with its own RabbitMQ connection; every worker holds one
+# pooled Postgres connection while it writes, so keep this below POSTGRES_POOL_MAX_SIZE
+BULK_METADATA_WORKERS = int(os.getenv("BULK_METADATA_WORKERS", "4"))
+# Messages the broker pushes to a worker ahead of the one being written, so the
+# next batch is already local when a transaction commits
+BULK_METADATA_PREFETCH = int(os.getenv("BULK_METADATA_PREFETCH", "2"))
+# Jobs kept for progress reporting and per-job error details kept for each
+BULK_JOB_HISTORY = int(os.getenv("BULK_JOB_HISTORY", "1000"))
+BULK_JOB_MAX_ERRORS = int(os.getenv("BULK_JOB_MAX_ERRORS", "100"))
+
+# Document ids are derived from the parser's deterministic record_id, so a
+# redelivered or re-uploaded record maps onto the document it already created
+BULK_RECORD_NAMESPACE = UUID("6f1c8e4a-3b7d-5a92-9c0e-2d4f6a8b1c3e")
+
+
+def document_id_for_record(record_id: str) -> UUID:
+    """Return the document id a bulk record with ``record_id`` is stored under."""
+    return uuid5(BULK_RECORD_NAMESPACE, record_id)
+
+
+def map_bulk_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a canonical bulk record (source/asset/ownership/metadata) onto document fields."""
+    asset = record.get("asset") or {}
+    ownership = record.get("ownership") or {}
+    metadata = record.get("metadata") or {}
+    now = datetime.now(timezone.utc)
+    return {
+        "document_id": document_id_for_record(record["record_id"]),
+        "upload_date": now,
+        "last_modified_date": now,
+        "file_name": asset.get("file_name"),
+        "file_size": asset.get("file_size"),
+        "file_type": asset.get("file_type"),
+        "version": asset.get("version"),
+        "checksum": asset.get("checksum"),
+        "storage_path": asset.get("storage_path"),
+        "thumbnail_path": asset.get("thumbnail_path"),
+        "expiration_date": asset.get("expiration_date"),
+        "user_id": ownership.get("uploader_user_id"),
+        "acl": ownership.get("acl"),
+        "tags": metadata.get("tags") or [],
+        "description": metadata.get("description"),
+        "category": metadata.get("category"),
+        "division": metadata.get("division"),
+        "business_unit": metadata.get("business_unit"),
+        "brand_id": metadata.get("brand_id"),
+        "document_type": metadata.get("document_type"),
+    }
+
+
+class BulkJobTracker:
+    """Thread-safe progress of bulk metadata jobs, aggregated from their batch messages.
+
+    Counts are kept per batch and replaced when a batch is redelivered, so retries
+    never double count. Progress is local to this process.
+    """
+
+    def __init__(self, max_jobs: int, max_errors: int) -> None:
+        self._jobs: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_jobs = max_jobs
+        self._max_errors = max_errors
+
+    def record_batch(
+        self,
+        job_id: str,
+        batch_id: Any,
+        *,
+        total_batches: Optional[int],
+        total_records: Optional[int],
+        source_file: Optional[str],
+        validation_errors: int,
+        counts: Dict[str, int],
+        errors: List[Dict[str, Any]],
+    ) -> None:
+        now = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                job = {
+                    "job_id": job_id,
+                    "source_file": source_file,
+                    "total_batches": total_batches,
+                    "total_records": total_records,
+                    "batches": {},
+                    "validation_errors": {},
+                    "errors": {},
+                    "started_at": now,
+                }
+                self._jobs[job_id] = job
+                while len(self._jobs) > self._max_jobs:
+                    self._jobs.popitem(last=False)
+            job["batches"][batch_id] = counts
+            job["validation_errors"][batch_id] = validation_errors
+            job["errors"][batch_id] = errors[: self._max_errors]
+            job["updated_at"] = now
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            totals = {"created": 0, "skipped": 0, "failed": 0}
+            for counts in job["batches"].values():
+                for key in totals:
+                    totals[key] += counts.get(key, 0)
+            batches_done = len(job["batches"])
+            expected = job["total_batches"] or 1
+            if batches_done < expected:
+                status = "in_progress"
+            elif totals["failed"]:
+                status = "completed_with_errors"
+            else:
+                status = "completed"
+            return {
+                "job_id": job_id,
+                "status": status,
+                "source_file": job["source_file"],
+                "batches_processed": batches_done,
+                "total_batches": job["total_batches"],
+                "total_records": job["total_records"],
+                "processed_records": sum(totals.values()),
+                **totals,
+                "validation_errors": sum(job["validation_errors"].values()),
+                "errors": [error for errors in job["errors"].values() for error in errors][: self._max_errors],
+                "started_at": job["started_at"],
+                "updated_at": job["updated_at"],
+            }
+
+
+bulk_job_tracker = BulkJobTracker(BULK_JOB_HISTORY, BULK_JOB_MAX_ERRORS)
+
+
+def ingest_bulk_batch(
+    service: DocumentService,
+    payload: Dict[str, Any],
+    tracker: BulkJobTracker = bulk_job_tracker,
+) -> Dict[str, int]:
+    """Write one ``bulk_metadata_upload`` message and record its progress.
+
+    Records are created with ``skip_existing`` so a redelivered message is a no-op
+    for records it already stored. Database outages raise, leaving the message to
+    be redelivered; per-record problems are reported as failed records instead.
+    """
+    records = payload.get("records") or []
+    documents: List[Dict[str, Any]] = []
+    outcomes: List[Optional[Dict[str, Any]]] = [None] * len(records)
+    positions: List[int] = []
+    for position, record in enumerate(records):
+        try:
+            documents.append(map_bulk_record(record))
+            positions.append(position)
+        except (AttributeError, KeyError, TypeError, ValueError) as exc:
+            outcomes[position] = {"status": "failed", "error": f"Invalid bulk record: {exc}"}
+
+    for position, outcome in zip(positions, service.create_documents(documents, skip_existing=True)):
+        outcomes[position] = outcome
+
+    counts = {"created": 0, "skipped": 0, "failed": 0}
+    errors: List[Dict[str, Any]] = []
+    for record, outcome in zip(records, outcomes):
+        counts[outcome["status"]] += 1
+        if outcome["status"] == "failed":
+            record = record if isinstance(record, dict) else {}
+            errors.append({
+                "record_id": record.get("record_id"),
+                "row_num": (record.get("source") or {}).get("row_num"),
+                "error": outcome["error"],
+            })
+
+    job_id = payload.get("job_id") or "unknown"
+    tracker.record_batch(
+        job_id,
+        payload.get("batch_id", 1),
+        total_batches=payload.get("total_batches"),
+        total_records=payload.get("total_records"),
+        source_file=payload.get("source_file"),
+        validation_errors=len(payload.get("validation_errors") or []),
+        counts=counts,
+        errors=errors,
+    )
+    logger.info(
+        "Bulk job %s batch %s: %s created, %s skipped, %s failed",
+        job_id,
+        payload.get("batch_id", 1),
+        counts["created"],
+        counts["skipped"],
+        counts["failed"],
+    )
+    return counts
+
+
+def decode_bulk_message(body: bytes) -> Optional[Dict[str, Any]]:
+    """Parse a ``bulk_metadata_upload`` message body.
+
+    Returns ``None`` for bodies that are not a JSON object with a list of
+    records; redelivering such a message would never succeed, so it is logged
+    and dropped instead of being retried.
+    """
+    try:
+        payload = json.loads(body)
+    except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+        logger.error("Dropping malformed bulk metadata message: %s", exc)
+        return None
+    if not isinstance(payload, dict):
+        logger.error("Dropping bulk metadata message that is not a JSON object: %s", type(payload).__name__)
+        return None
+    if not isinstance(payload.get("records") or [], list):
+        logger.error("Dropping bulk metadata message whose records are not a list")
+        return None
+    return payload
+
+
+def start_bulk_metadata_workers(
+    service: DocumentService,
+    workers: int = BULK_METADATA_WORKERS,
+    prefetch_count: int = BULK_METADATA_PREFETCH,
+) -> List[threading.Thread]:
+    """Start consumer threads for the bulk metadata queue."""
+
+    def handle_message(ch, method, properties, body) -> None:
+        payload = decode_bulk_message(body)
+        if payload is not None:
+            ingest_bulk_batch(service, payload)
+
+    threads = []
+    for index in range(workers):
+        thread = threading.Thread(
+            target=listen_for_events,
+            args=(BULK_METADATA_QUEUE, handle_message, prefetch_count),
+            name=f"bulk-metadata-worker-{index}",
+            daemon=True,
+        )
+        thread.start()
+        threads.append(thread)
+    logger.info("Started %s bulk metadata workers (prefetch %s)", workers, prefetch_count)
+    return threads
@@ -0,0 +1,464 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Protocol, Tuple
+from uuid import UUID, uuid4
+
+import pika
+from dotenv import load_dotenv
+
+from ..rabbitmq_utils import get_rabbitmq_connection
+from .document_record import DocumentRecord, FrozenMapping
+from .document_repository import DocumentRepository
+
+try:
+    import redis
+except ImportError:  # optional dependency, only needed for the shared tier
+    redis = None
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Read-through cache of the latest revision per document. Writes made by this
+# process invalidate entries immediately; writes made by other replicas arrive
+# through a RabbitMQ fanout, and the TTL bounds staleness if one is lost.
+# Off by default: other replicas may serve a replaced revision for up to the TTL.
+DOCUMENT_CACHE_ENABLED = os.getenv("DOCUMENT_CACHE_ENABLED", "false").lower() == "true"
+DOCUMENT_CACHE_MAX_ENTRIES = int(os.getenv("DOCUMENT_CACHE_MAX_ENTRIES", "10000"))
+DOCUMENT_CACHE_TTL_SECONDS = float(os.getenv("DOCUMENT_CACHE_TTL_SECONDS", "30"))
+# Optional Redis-compatible tier shared by all replicas. Entries are hashes
+# holding the revision next to the encoded row.
+DOCUMENT_CACHE_REDIS_URL = os.getenv("DOCUMENT_CACHE_REDIS_URL")
+DOCUMENT_CACHE_REDIS_PREFIX = os.getenv("DOCUMENT_CACHE_REDIS_PREFIX", "metadata:document:v2:")
+DOCUMENT_CACHE_INVALIDATION_EXCHANGE = os.getenv("DOCUMENT_CACHE_INVALIDATION_EXCHANGE", "document_cache_invalidation")
+
+
+class SharedCacheTier(Protocol):
+    """Protocol for a key/value store shared between replicas.
+
+    Values are versioned by document revision: a value never replaces one with
+    the same or a newer revision, so a slow reader on one replica cannot put
+    back a row that a writer on another replica has already replaced.
+    """
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the stored value or ``None``."""
+
+    def set_if_newer(self, key: str, revision: int, value: bytes, ttl: float) -> bool:
+        """Store a value that expires after ``ttl`` seconds unless a newer revision is stored."""
+
+    def delete(self, keys: List[str]) -> None:
+        """Remove the given keys."""
+
+
+class InMemoryCacheTier(SharedCacheTier):
+    """Process-local stand-in for the shared tier, used for development and tests."""
+
+    def __init__(self) -> None:
+        self._values: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._values.get(key)
+            if item is None or item[2] < time.monotonic():
+                return None
+            return item[1]
+
+    def set_if_newer(self, key: str, revision: int, value: bytes, ttl: float) -> bool:
+        with self._lock:
+            item = self._values.get(key)
+            if item is not None and item[2] >= time.monotonic() and item[0] >= revision:
+                return False
+            self._values[key] = (revision, value, time.monotonic() + ttl)
+            return True
+
+    def delete(self, keys: List[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._values.pop(key, None)
+
+
+class RedisCacheTier(SharedCacheTier):
+    """Shared tier backed by a Redis-compatible server; errors degrade to cache misses."""
+
+    # Compare-and-set on the revision field, atomic on the server
+    _SET_IF_NEWER = """
+local current = tonumber(redis.call('HGET', KEYS[1], 'revision'))
+if current and current >= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'revision', ARGV[1], 'data', ARGV[2])
+redis.call('PEXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+    def __init__(self, url: str) -> None:
+        if redis is None:
+            raise RuntimeError("DOCUMENT_CACHE_REDIS_URL is set but the redis package is not installed")
+        self._client = redis.Redis.from_url(url, socket_timeout=0.05, socket_connect_timeout=0.5)
+        self._set_if_newer = self._client.register_script(self._SET_IF_NEWER)
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return self._client.hget(key, "data")
+        except redis.RedisError as exc:
+            logger.warning("Shared document cache read failed: %s", exc)
+            return None
+
+    def set_if_newer(self, key: str, revision: int, value: bytes, ttl: float) -> bool:
+        try:
+            return bool(self._set_if_newer(keys=[key], args=[revision, value, int(ttl * 1000)]))
+        except redis.RedisError as exc:
+            logger.warning("Shared document cache write failed: %s", exc)
+            return False
+
+    def delete(self, keys: List[str]) -> None:
+        try:
+            self._client.delete(*keys)
+        except redis.RedisError as exc:
+            logger.warning("Shared document cache delete failed: %s", exc)
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, FrozenMapping):
+        return dict(value)
+    if isinstance(value, UUID):
+        return {"__uuid__": str(value)}
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    raise TypeError(f"Cannot encode {type(value).__name__}")
+
+
+def _decode_value(value: Dict[str, Any]) -> Any:
+    if "__uuid__" in value:
+        return UUID(value["__uuid__"])
+    if "__datetime__" in value:
+        return datetime.fromisoformat(value["__datetime__"])
+    return value
+
+
+def encode_record(record: Mapping[str, Any]) -> bytes:
+    return json.dumps(record, default=_encode_value).encode()
+
+
+def decode_record(data: bytes) -> DocumentRecord:
+    return DocumentRecord(json.loads(data, object_hook=_decode_value))
+
+
+class LatestDocumentCache:
+    """Bounded LRU of latest document revisions with a TTL and an optional shared tier.
+
+    A load that overlaps with an invalidation of the same document does not
+    store its result, so a reader can never put back a row a writer just replaced.
+    Across replicas the same is guaranteed by the revision check of the shared
+    tier, which writers fill with the revisions they commit.
+    Entries are immutable ``DocumentRecord`` rows and are returned without copying.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, shared: Optional[SharedCacheTier] = None) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.shared = shared
+        self._entries: OrderedDict[UUID, Any] = OrderedDict()
+        self._loading: Dict[UUID, object] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _shared_key(self, document_id: UUID) -> str:
+        return f"{DOCUMENT_CACHE_REDIS_PREFIX}{document_id}"
+
+    def get_or_load(
+        self,
+        document_id: UUID,
+        loader: Callable[[], Optional[Mapping[str, Any]]],
+    ) -> Optional[Mapping[str, Any]]:
+        """Return the cached latest revision, loading and caching it on a miss."""
+        with self._lock:
+            entry = self._entries.get(document_id)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(document_id)
+                self.hits += 1
+                return entry[0]
+            token = object()
+            self._loading[document_id] = token
+
+        loaded = False
+        try:
+            record = None
+            if self.shared is not None:
+                data = self.shared.get(self._shared_key(document_id))
+                if data is not None:
+                    record = decode_record(data)
+            if record is not None:
+                self._count("shared_hits")
+            else:
+                self._count("misses")
+                record = loader()
+                loaded = True
+        except Exception:
+            with self._lock:
+                if self._loading.get(document_id) is token:
+                    del self._loading[document_id]
+            raise
+
+        with self._lock:
+            current = self._loading.get(document_id) is token
+            if current:
+                del self._loading[document_id]
+                if record:
+                    self._store(document_id, record)
+        if current and loaded and record:
+            self._share(record)
+        return record
+
+    def _share(self, record: Mapping[str, Any]) -> None:
+        if self.shared is not None and record.get("revision") is not None:
+            self.shared.set_if_newer(
+                self._shared_key(record["document_id"]),
+                record["revision"],
+                encode_record(record),
+                self.ttl,
+            )
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _store(self, document_id: UUID, record: Mapping[str, Any]) -> None:
+        # Must be called with the lock held
+        self._entries[document_id] = (record, time.monotonic() + self.ttl)
+        self._entries.move_to_end(document_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def replace(self, records: Iterable[Mapping[str, Any]]) -> None:
+        """Drop the local entries of freshly written rows and share the rows.
+
+        Writing the new revision to the shared tier, rather than deleting the
+        old one, fences out replicas still loading an older revision.
+        """
+        records = list(records)
+        self.invalidate((record["document_id"] for record in records), shared=False)
+        for record in records:
+            self._share(record)
+
+    def invalidate(self, document_ids: Iterable[UUID], *, shared: bool = True) -> None:
+        """Drop cached revisions; ``shared`` also removes them from the shared tier."""
+        document_ids = list(document_ids)
+        with self._lock:
+            for document_id in document_ids:
+                self._entries.pop(document_id, None)
+                self._loading.pop(document_id, None)
+            self.invalidations += len(document_ids)
+        if shared and self.shared is not None and document_ids:
+            self.shared.delete([self._shared_key(document_id) for document_id in document_ids])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._loading.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits + self.shared_hits) / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "ttl_seconds": self.ttl,
+                "shared_tier": self.shared is not None,
+            }
+
+
+class CachedDocumentRepository(DocumentRepository):
+    """Repository decorator serving ``fetch_latest`` from a LatestDocumentCache.
+
+    Every write drops the documents it touched from the local cache, stores the
+    new revisions in the shared tier, and hands their ids to ``on_invalidate`` so
+    other replicas drop them from their local caches too.
+    """
+
+    def __init__(
+        self,
+        repository: DocumentRepository,
+        cache: LatestDocumentCache,
+        on_invalidate: Optional[Callable[[List[UUID]], None]] = None,
+    ) -> None:
+        self._repository = repository
+        self._cache = cache
+        self._on_invalidate = on_invalidate
+
+    def persist(self, metadata: Dict[str, Any]) -> DocumentRecord:
+        record = self._repository.persist(metadata)
+        self._replace([record])
+        return record
+
+    def persist_many(
+        self,
+        records: List[Dict[str, Any]],
+        *,
+        batch_size: Optional[int] = None,
+        skip_existing: bool = False,
+    ) -> List[Dict[str, Any]]:
+        outcomes = self._repository.persist_many(records, batch_size=batch_size, skip_existing=skip_existing)
+        self._replace([outcome["record"] for outcome in outcomes if "record" in outcome])
+        return outcomes
+
+    def persist_revision(self, document_id: UUID, changes: Dict[str, Any]) -> Optional[DocumentRecord]:
+        record = self._repository.persist_revision(document_id, changes)
+        if record:
+            self._replace([record])
+        return record
+
+    def fetch_latest(self, document_id: UUID, include_deleted: bool = False) -> Optional[DocumentRecord]:
+        # The latest revision is cached whether or not it is a deletion
+        record = self._cache.get_or_load(
+            document_id,
+            lambda: self._repository.fetch_latest(document_id, include_deleted=True),
+        )
+        if not record or (record.get("is_deleted") and not include_deleted):
+            return None
+        return record
+
+    def fetch_history(
+        self,
+        document_id: UUID,
+        *,
+        before_revision: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[DocumentRecord]:
+        return self._repository.fetch_history(document_id, before_revision=before_revision, limit=limit)
+
+    def list_current(
+        self,
+        filters: Dict[str, Any],
+        *,
+        tags: Optional[List[str]] = None,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        limit: int = 50,
+    ) -> List[DocumentRecord]:
+        return self._repository.list_current(filters, tags=tags, after=after, limit=limit)
+
+    def _replace(self, records: List[Mapping[str, Any]]) -> None:
+        if not records:
+            return
+        self._cache.replace(records)
+        if self._on_invalidate is not None:
+            self._on_invalidate(list(dict.fromkeys(record["document_id"] for record in records)))
+
+
+class CacheInvalidationBus:
+    """Broadcasts invalidated document ids to every replica through a fanout exchange.
+
+    Publishing only enqueues; a background thread owns the publishing connection,
+    since pika connections must not be shared between threads. Each replica
+    consumes from its own exclusive queue and clears its whole local cache after
+    (re)connecting, as invalidations sent while it was disconnected are lost.
+    """
+
+    def __init__(self, exchange: str, cache: LatestDocumentCache, max_pending: int = 10000) -> None:
+        self.exchange = exchange
+        self.cache = cache
+        self.origin = uuid4().hex
+        self._outbox: queue.Queue = queue.Queue(maxsize=max_pending)
+
+    def publish(self, document_ids: List[UUID]) -> None:
+        try:
+            self._outbox.put_nowait([str(document_id) for document_id in document_ids])
+        except queue.Full:
+            logger.warning("Cache invalidation outbox is full, other replicas rely on the TTL")
+
+    def start(self) -> None:
+        threading.Thread(target=self._run_publisher, name="document-cache-publisher", daemon=True).start()
+        threading.Thread(target=self._run_listener, name="document-cache-listener", daemon=True).start()
+
+    def _run_publisher(self) -> None:
+        # A batch taken from the outbox is kept until it was published, so one
+        # that fails is sent again after reconnecting instead of being lost
+        document_ids: Optional[List[str]] = None
+        while True:
+            try:
+                connection = get_rabbitmq_connection()
+                channel = connection.channel()
+                channel.exchange_declare(exchange=self.exchange, exchange_type="fanout")
+                while True:
+                    if document_ids is None:
+                        try:
+                            document_ids = self._outbox.get(timeout=30)
+                        except queue.Empty:
+                            # Keeps heartbeats flowing while idle
+                            connection.process_data_events(0)
+                            continue
+                        while len(document_ids) < 1000:
+                            try:
+                                document_ids.extend(self._outbox.get_nowait())
+                            except queue.Empty:
+                                break
+                    channel.basic_publish(
+                        exchange=self.exchange,
+                        routing_key="",
+                        body=json.dumps({"origin": self.origin, "document_ids": document_ids}),
+                    )
+                    document_ids = None
+            except Exception as exc:
+                logger.error("Cache invalidation publisher failed: %s, reconnecting in 5 seconds", exc)
+                time.sleep(5)
+
+    def _run_listener(self) -> None:
+        while True:
+            try:
+                connection = get_rabbitmq_connection()
+                channel = connection.channel()
+                channel.exchange_declare(exchange=self.exchange, exchange_type="fanout")
+                result = channel.queue_declare(queue="", exclusive=True)
+                channel.queue_bind(exchange=self.exchange, queue=result.method.queue)
+                self.cache.clear()
+
+                def on_message(ch, method, properties, body):
+                    try:
+                        message = json.loads(body)
+                        if message.get("origin") != self.origin:
+                            # The writer already stored the new revisions in the shared tier
+                            self.cache.invalidate((UUID(value) for value in message["document_ids"]), shared=False)
+                    except (KeyError, TypeError, ValueError) as exc:
+                        logger.error("Ignoring malformed cache invalidation message: %s", exc)
+
+                channel.basic_consume(queue=result.method.queue, on_message_callback=on_message, auto_ack=True)
+                channel.start_consuming()
+            except pika.exceptions.AMQPError as exc:
+                logger.error("Cache invalidation listener lost its connection: %s, reconnecting in 5 seconds", exc)
+                time.sleep(5)
+            except Exception as exc:
+                logger.error("Cache invalidation listener failed: %s, reconnecting in 5 seconds", exc)
+                time.sleep(5)
+
+
+latest_document_cache = LatestDocumentCache(
+    DOCUMENT_CACHE_MAX_ENTRIES,
+    DOCUMENT_CACHE_TTL_SECONDS,
+    RedisCacheTier(DOCUMENT_CACHE_REDIS_URL) if DOCUMENT_CACHE_REDIS_URL else None,
+) if DOCUMENT_CACHE_ENABLED else None
+
+cache_invalidation_bus = CacheInvalidationBus(
+    DOCUMENT_CACHE_INVALIDATION_EXCHANGE,
+    latest_document_cache,
+) if latest_document_cache is not None else None
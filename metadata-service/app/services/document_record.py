@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, Tuple, TypeVar, Union
+from uuid import UUID
+
+# Values that are already immutable and are stored as they are
+_SCALARS = (str, int, float, bool, bytes, UUID, datetime)
+# Exact types checked first, as the isinstance checks are comparatively slow
+_SCALAR_TYPES = frozenset({*_SCALARS, type(None)})
+
+_FrozenT = TypeVar("_FrozenT", bound="FrozenMapping")
+
+
+def freeze(value: Any) -> Any:
+    """Return an immutable equivalent of a JSON-like value.
+
+    Mappings become ``FrozenMapping`` and lists, tuples and sets become tuples,
+    recursively. Values that are already frozen are returned as they are.
+    """
+    if type(value) in _SCALAR_TYPES or isinstance(value, (_SCALARS, FrozenMapping)):
+        return value
+    if isinstance(value, Mapping):
+        return FrozenMapping._wrap({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple, set, frozenset)):
+        # Tag arrays and id lists hold only scalars and need no per-item work
+        if all(type(item) in _SCALAR_TYPES for item in value):
+            return value if type(value) is tuple else tuple(value)
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Inverse of ``freeze``: nested mappings become dicts and tuples become lists."""
+    if isinstance(value, FrozenMapping):
+        return value.to_dict()
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+class FrozenMapping(Mapping):
+    """Read-only mapping whose values are frozen on construction.
+
+    Instances can be shared freely, so copying one (``copy``/``deepcopy``)
+    returns the instance itself.
+    """
+
+    __slots__ = ("_fields",)
+
+    def __init__(self, fields: Union[Mapping, Iterable[Tuple[str, Any]]] = (), **kwargs: Any) -> None:
+        if kwargs:
+            fields = {**dict(fields), **kwargs}
+        items = fields.items() if isinstance(fields, Mapping) else fields
+        self._fields: Dict[str, Any] = {key: freeze(value) for key, value in items}
+
+    @classmethod
+    def _wrap(cls: type[_FrozenT], fields: Dict[str, Any]) -> _FrozenT:
+        """Take ownership of a dict whose values are already frozen."""
+        instance = cls.__new__(cls)
+        instance._fields = fields
+        return instance
+
+    def __getitem__(self, key: str) -> Any:
+        return self._fields[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._fields
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._fields.get(key, default)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, FrozenMapping):
+            return self._fields == other._fields
+        return super().__eq__(other)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._fields!r})"
+
+    def __copy__(self: _FrozenT) -> _FrozenT:
+        return self
+
+    def __deepcopy__(self: _FrozenT, memo: Dict[int, Any]) -> _FrozenT:
+        return self
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return type(self)._wrap, (self._fields,)
+
+    def replace(self: _FrozenT, changes: Union[Mapping, Iterable[Tuple[str, Any]]] = (), **kwargs: Any) -> _FrozenT:
+        """Return a copy with ``changes`` applied; unchanged values are shared, not copied."""
+        fields = dict(self._fields)
+        items = changes.items() if isinstance(changes, Mapping) else changes
+        fields.update((key, freeze(value)) for key, value in items)
+        fields.update((key, freeze(value)) for key, value in kwargs.items())
+        return self._wrap(fields)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a mutable deep copy built from plain dicts and lists."""
+        return {key: thaw(value) for key, value in self._fields.items()}
+
+
+class DocumentRecord(FrozenMapping):
+    """Immutable row of one document metadata revision.
+
+    ``tags`` is a tuple and ``acl`` a ``FrozenMapping``. Repositories build a
+    record once per stored row and every layer above shares it without defensive
+    copies; ``to_dict`` converts it for serialization at the API boundary.
+    """
+
+    __slots__ = ()
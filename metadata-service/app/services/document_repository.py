@@ -1,52 +1,166 @@
 from __future__ import annotations
 
-from copy import deepcopy
-from typing import Any, Dict, List, Optional, Protocol
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Protocol, Tuple
 from uuid import UUID, uuid4
 
+from .document_record import DocumentRecord
+
 
 class DocumentRepository(Protocol):
-    """Protocol describing persistence operations for document metadata."""
+    """Protocol describing persistence operations for document metadata.
+
+    Stored rows are returned as immutable ``DocumentRecord`` instances.
+    """
+
+    def persist(self, metadata: Dict[str, Any]) -> DocumentRecord:
+        """Store a metadata record as the next revision of its document and return the stored row.
+
+        The revision number is allocated by the repository as part of the write.
+        """
+
+    def persist_many(
+        self,
+        records: List[Dict[str, Any]],
+        *,
+        batch_size: Optional[int] = None,
+        skip_existing: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """Store many records like ``persist`` and return one outcome per record, in input order.
+
+        Each outcome holds the stored row under ``"record"`` or a message under ``"error"``.
+        With ``skip_existing``, records for documents that already exist (or appeared
+        earlier in ``records``) are not stored and get ``{"skipped": True}``.
+        """
+
+    def persist_revision(self, document_id: UUID, changes: Dict[str, Any]) -> Optional[DocumentRecord]:
+        """Append a revision copying the latest one with ``changes`` applied.
+
+        Returns ``None`` when the document does not exist or its latest revision is deleted.
+        """
+
+    def fetch_latest(self, document_id: UUID, include_deleted: bool = False) -> Optional[DocumentRecord]:
+        """Return the latest revision for the given document id.
+
+        When the latest revision is a deletion, ``None`` is returned unless ``include_deleted`` is set.
+        """
+
+    def fetch_history(
+        self,
+        document_id: UUID,
+        *,
+        before_revision: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[DocumentRecord]:
+        """Return revisions of the given document ordered from newest to oldest.
 
-    def persist(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
-        """Persist a metadata record and return the stored row."""
+        Only revisions below ``before_revision`` are returned, at most ``limit`` of them.
+        """
 
-    def fetch_latest(self, document_id: UUID, include_deleted: bool = False) -> Optional[Dict[str, Any]]:
-        """Return the latest revision for the given document id."""
+    def list_current(
+        self,
+        filters: Dict[str, Any],
+        *,
+        tags: Optional[List[str]] = None,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        limit: int = 50,
+    ) -> List[DocumentRecord]:
+        """Return latest, non-deleted revisions matching ``filters`` (column equality) and ``tags`` (all present).
 
-    def fetch_history(self, document_id: UUID) -> List[Dict[str, Any]]:
-        """Return all revisions for the given document id ordered from newest to oldest."""
+        Rows are ordered by ``(upload_date, document_id)`` descending, starting after the ``after`` key.
+        """
 
 
 class InMemoryDocumentRepository(DocumentRepository):
-    """Lightweight repository used for unit tests."""
+    """Lightweight repository used for unit tests.
+
+    Records are immutable, so stored rows are handed out without copying.
+    """
 
     def __init__(self) -> None:
-        self._records: List[Dict[str, Any]] = []
+        self._records: List[DocumentRecord] = []
+        # Latest revision per document, mirroring the documents_current projection.
+        self._current: Dict[UUID, DocumentRecord] = {}
+        self._lock = threading.Lock()
+
+    def persist(self, metadata: Dict[str, Any]) -> DocumentRecord:
+        with self._lock:
+            stored = DocumentRecord(
+                metadata,
+                id=metadata.get("id") or uuid4(),
+                revision=self._next_revision(metadata.get("document_id")),
+            )
+            self._records.append(stored)
+            self._current[stored.get("document_id")] = stored
+        return stored
+
+    def persist_many(
+        self,
+        records: List[Dict[str, Any]],
+        *,
+        batch_size: Optional[int] = None,
+        skip_existing: bool = False,
+    ) -> List[Dict[str, Any]]:
+        outcomes: List[Dict[str, Any]] = []
+        for metadata in records:
+            if skip_existing and metadata.get("document_id") in self._current:
+                outcomes.append({"skipped": True})
+            else:
+                outcomes.append({"record": self.persist(metadata)})
+        return outcomes
+
+    def persist_revision(self, document_id: UUID, changes: Dict[str, Any]) -> Optional[DocumentRecord]:
+        with self._lock:
+            latest = self._current.get(document_id)
+            if not latest or latest.get("is_deleted"):
+                return None
+            stored = latest.replace(changes, id=uuid4(), revision=latest.get("revision", 0) + 1)
+            self._records.append(stored)
+            self._current[document_id] = stored
+        return stored
+
+    def _next_revision(self, document_id: UUID) -> int:
+        latest = self._current.get(document_id)
+        return latest.get("revision", 0) + 1 if latest else 1
 
-    def persist(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
-        stored = deepcopy(metadata)
-        stored.setdefault("id", uuid4())
-        self._records.append(stored)
-        return deepcopy(stored)
+    def fetch_latest(self, document_id: UUID, include_deleted: bool = False) -> Optional[DocumentRecord]:
+        record = self._current.get(document_id)
+        if not record or (record.get("is_deleted", False) and not include_deleted):
+            return None
+        return record
 
-    def fetch_latest(self, document_id: UUID, include_deleted: bool = False) -> Optional[Dict[str, Any]]:
-        candidates = [
+    def list_current(
+        self,
+        filters: Dict[str, Any],
+        *,
+        tags: Optional[List[str]] = None,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        limit: int = 50,
+    ) -> List[DocumentRecord]:
+        matches = [
             record
-            for record in self._records
-            if record.get("document_id") == document_id
-            and (include_deleted or not record.get("is_deleted", False))
+            for record in self._current.values()
+            if not record.get("is_deleted", False)
+            and all(record.get(column) == value for column, value in filters.items())
+            and set(tags or []).issubset(record.get("tags") or [])
+            and (after is None or (record["upload_date"], record["document_id"]) < after)
         ]
-        if not candidates:
-            return None
-        candidates.sort(key=lambda record: record.get("revision", 0), reverse=True)
-        return deepcopy(candidates[0])
+        matches.sort(key=lambda record: (record["upload_date"], record["document_id"]), reverse=True)
+        return matches[:limit]
 
-    def fetch_history(self, document_id: UUID) -> List[Dict[str, Any]]:
+    def fetch_history(
+        self,
+        document_id: UUID,
+        *,
+        before_revision: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[DocumentRecord]:
         history = [
-            deepcopy(record)
+            record
             for record in self._records
             if record.get("document_id") == document_id
+            and (before_revision is None or record.get("revision", 0) < before_revision)
         ]
         history.sort(key=lambda record: record.get("revision", 0), reverse=True)
-        return history
+        return history[:limit]
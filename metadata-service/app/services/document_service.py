@@ -1,10 +1,12 @@
 from __future__ import annotations
 
-from copy import deepcopy
+import base64
+import json
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import UUID, uuid4
 
+from .document_record import DocumentRecord, FrozenMapping, freeze
 from .document_repository import DocumentRepository
 
 
@@ -13,7 +15,11 @@ class DocumentNotFoundError(Exception):
 
 
 class DocumentService:
-    """High level operations for document metadata revisions."""
+    """High level operations for document metadata revisions.
+
+    Returned rows are immutable ``DocumentRecord`` instances shared with the
+    repository and its cache; use ``to_dict`` where a mutable copy is needed.
+    """
 
     _ALLOWED_FIELDS = {
         "id",
@@ -60,66 +66,124 @@ class DocumentService:
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
-    def create_document(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
+    def create_document(self, metadata: Dict[str, Any]) -> DocumentRecord:
         record = self._normalize_new_metadata(metadata)
         return self._repository.persist(record)
 
-    def update_document(self, document_id: Any, updates: Dict[str, Any]) -> Dict[str, Any]:
-        doc_id = self._to_uuid(document_id)
-        current = self._repository.fetch_latest(doc_id, include_deleted=False)
-        if not current:
-            raise DocumentNotFoundError(f"Document {doc_id} not found")
-
-        base_record = self._prepare_base_record(current)
-        normalized_updates = self._normalize_updates(updates)
-        base_record.update(normalized_updates)
-        base_record["revision"] = current.get("revision", 0) + 1
-        base_record["is_deleted"] = False
-        base_record["document_id"] = doc_id
-        base_record["upload_date"] = current.get("upload_date")
-        base_record["last_modified_date"] = normalized_updates.get(
-            "last_modified_date",
-            datetime.now(timezone.utc),
+    def create_documents(
+        self,
+        metadata_list: List[Dict[str, Any]],
+        *,
+        batch_size: Optional[int] = None,
+        skip_existing: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """Create many documents and return one outcome per input, in input order.
+
+        Outcomes have a ``status`` of ``"created"`` with the stored ``record`` or
+        ``"failed"`` with an ``error`` message; invalid records never reach the
+        repository and do not affect the rest of the batch. With ``skip_existing``
+        records whose ``document_id`` is already stored are ``"skipped"``, which
+        makes replaying the same input idempotent.
+        """
+        outcomes: List[Optional[Dict[str, Any]]] = [None] * len(metadata_list)
+        valid_indexes: List[int] = []
+        records: List[Dict[str, Any]] = []
+        for index, metadata in enumerate(metadata_list):
+            try:
+                records.append(self._normalize_new_metadata(metadata))
+                valid_indexes.append(index)
+            except (TypeError, ValueError) as exc:
+                outcomes[index] = {"index": index, "status": "failed", "error": str(exc)}
+
+        stored = (
+            self._repository.persist_many(records, batch_size=batch_size, skip_existing=skip_existing)
+            if records
+            else []
         )
+        for index, result in zip(valid_indexes, stored):
+            if "error" in result:
+                outcomes[index] = {"index": index, "status": "failed", "error": result["error"]}
+            elif result.get("skipped"):
+                outcomes[index] = {"index": index, "status": "skipped"}
+            else:
+                outcomes[index] = {"index": index, "status": "created", "record": result["record"]}
+        return outcomes
+
+    def update_document(self, document_id: Any, updates: Dict[str, Any]) -> DocumentRecord:
+        doc_id = self._to_uuid(document_id)
+        changes = self._normalize_updates(updates)
+        missing = [field for field in self._REQUIRED_FIELDS if field in changes and changes[field] is None]
+        if missing:
+            raise ValueError(f"Missing required metadata fields: {', '.join(missing)}")
+        changes.pop("upload_date", None)
+        changes["is_deleted"] = False
+        changes.setdefault("last_modified_date", datetime.now(timezone.utc))
 
-        self._ensure_required_fields(base_record)
-        return self._repository.persist(base_record)
+        record = self._repository.persist_revision(doc_id, changes)
+        if not record:
+            raise DocumentNotFoundError(f"Document {doc_id} not found")
+        return record
 
-    def get_latest_document(self, document_id: Any, *, include_deleted: bool = False) -> Dict[str, Any]:
+    def get_latest_document(self, document_id: Any, *, include_deleted: bool = False) -> DocumentRecord:
         doc_id = self._to_uuid(document_id)
-        if include_deleted:
-            record = self._repository.fetch_latest(doc_id, include_deleted=True)
-            if not record:
-                raise DocumentNotFoundError(f"Document {doc_id} not found")
-            return deepcopy(record)
-
-        latest_any = self._repository.fetch_latest(doc_id, include_deleted=True)
-        if not latest_any or latest_any.get("is_deleted"):
+        record = self._repository.fetch_latest(doc_id, include_deleted=include_deleted)
+        if not record:
             raise DocumentNotFoundError(f"Document {doc_id} not found")
-        return deepcopy(latest_any)
+        return record
 
-    def list_document_history(self, document_id: Any) -> List[Dict[str, Any]]:
+    def list_document_history(
+        self,
+        document_id: Any,
+        *,
+        limit: Optional[int] = None,
+        before_revision: Optional[int] = None,
+    ) -> List[DocumentRecord]:
+        """Return revisions newest first, optionally only those below ``before_revision``."""
+        if limit is not None and limit < 1:
+            raise ValueError("limit must be at least 1")
         doc_id = self._to_uuid(document_id)
-        return [deepcopy(item) for item in self._repository.fetch_history(doc_id)]
+        return self._repository.fetch_history(doc_id, before_revision=before_revision, limit=limit)
 
-    def soft_delete_document(self, document_id: Any) -> Dict[str, Any]:
+    def list_documents(
+        self,
+        filters: Dict[str, Any],
+        *,
+        tags: Optional[List[str]] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[DocumentRecord], Optional[str]]:
+        """Return a page of current documents and the cursor for the next page, if any."""
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        criteria = {key: value for key, value in filters.items() if value is not None}
+        for key in ("user_id", "brand_id"):
+            if key in criteria:
+                criteria[key] = self._to_uuid(criteria[key])
+
+        after = self._decode_cursor(cursor) if cursor else None
+        # One extra row tells whether another page follows without a COUNT query.
+        records = self._repository.list_current(criteria, tags=tags or None, after=after, limit=limit + 1)
+        next_cursor = None
+        if len(records) > limit:
+            records = records[:limit]
+            last = records[-1]
+            next_cursor = self._encode_cursor(last["upload_date"], last["document_id"])
+        return records, next_cursor
+
+    def soft_delete_document(self, document_id: Any) -> DocumentRecord:
         doc_id = self._to_uuid(document_id)
+        record = self._repository.persist_revision(
+            doc_id,
+            {"is_deleted": True, "last_modified_date": datetime.now(timezone.utc)},
+        )
+        if record:
+            return record
+
+        # Nothing was written: either the document is unknown or already deleted.
         current = self._repository.fetch_latest(doc_id, include_deleted=True)
-        if not current:
+        if not current or not current.get("is_deleted"):
             raise DocumentNotFoundError(f"Document {doc_id} not found")
-
-        if current.get("is_deleted"):
-            return deepcopy(current)
-
-        record = self._prepare_base_record(current)
-        record["revision"] = current.get("revision", 0) + 1
-        record["is_deleted"] = True
-        record["document_id"] = doc_id
-        record["upload_date"] = current.get("upload_date")
-        record["last_modified_date"] = datetime.now(timezone.utc)
-
-        self._ensure_required_fields(record)
-        return self._repository.persist(record)
+        return current
 
     # ------------------------------------------------------------------
     # Normalisation helpers
@@ -128,10 +192,8 @@ class DocumentService:
         record = self._prepare_base_record(metadata)
         doc_id = record.get("document_id")
         record["document_id"] = self._to_uuid(doc_id) if doc_id else uuid4()
-
-        latest = self._repository.fetch_latest(record["document_id"], include_deleted=True)
-        next_revision = latest.get("revision", 0) + 1 if latest else 1
-        record["revision"] = next_revision
+        # The repository allocates the revision number when the record is stored.
+        record.pop("revision", None)
 
         if "is_deleted" not in record:
             record["is_deleted"] = False
@@ -156,8 +218,9 @@ class DocumentService:
         *,
         allow_missing_required: bool = False,
     ) -> Dict[str, Any]:
+        # Freezing copies mutable values once; nothing downstream copies them again.
         record = {
-            key: deepcopy(value)
+            key: freeze(value)
             for key, value in payload.items()
             if key in self._ALLOWED_FIELDS
         }
@@ -171,11 +234,11 @@ class DocumentService:
                 record[key] = self._to_datetime(record[key])
 
         if record.get("tags") is None:
-            record["tags"] = []
-        elif not isinstance(record["tags"], list):
-            record["tags"] = list(record["tags"])
+            record["tags"] = ()
+        elif not isinstance(record["tags"], tuple):
+            record["tags"] = tuple(record["tags"])
 
-        if record.get("acl") is not None and not isinstance(record["acl"], dict):
+        if record.get("acl") is not None and not isinstance(record["acl"], FrozenMapping):
             raise ValueError("ACL metadata must be a JSON object")
 
         if not allow_missing_required:
@@ -187,6 +250,20 @@ class DocumentService:
     # ------------------------------------------------------------------
     # Utility helpers
     # ------------------------------------------------------------------
+    @staticmethod
+    def _encode_cursor(upload_date: datetime, document_id: UUID) -> str:
+        payload = json.dumps([upload_date.isoformat(), str(document_id)])
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    @classmethod
+    def _decode_cursor(cls, cursor: str) -> Tuple[datetime, UUID]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            upload_date, document_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            return cls._to_datetime(upload_date), cls._to_uuid(document_id)
+        except (TypeError, ValueError) as exc:
+            raise ValueError("Invalid pagination cursor") from exc
+
     @staticmethod
     def _to_uuid(value: Any) -> Optional[UUID]:
         if value is None or isinstance(value, UUID):
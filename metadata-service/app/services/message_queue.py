@@ -12,7 +12,7 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
-def listen_for_events(queue_name: str, callback):
+def listen_for_events(queue_name: str, callback, prefetch_count: int = 1):
     """Listen for events on the specified queue and process them with the callback function"""
     while True:  # Add reconnection loop
         try:
@@ -23,11 +23,12 @@ def listen_for_events(queue_name: str, callback):
             channel.queue_declare(queue=queue_name, durable=True)
             
             # Set QoS
-            channel.basic_qos(prefetch_count=1)
+            channel.basic_qos(prefetch_count=prefetch_count)
 
             def on_message(ch, method, properties, body):
                 try:
-                    logger.info(f"Received message on {queue_name}: {body.decode()}")
+                    logger.info(f"Received message on {queue_name} ({len(body)} bytes)")
+                    logger.debug(f"Message body: {body.decode()}")
                     callback(ch, method, properties, body)
                     ch.basic_ack(delivery_tag=method.delivery_tag)
                 except Exception as callback_exception:
@@ -2,20 +2,50 @@ from __future__ import annotations
 
 import logging
 import os
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from uuid import UUID
 
 import psycopg2
-from psycopg2.extras import Json, RealDictCursor
+from psycopg2 import errors
+from psycopg2.extras import Json, RealDictCursor, execute_values, register_uuid
+from psycopg2.pool import PoolError, ThreadedConnectionPool
 from dotenv import load_dotenv
 
+from .document_cache import CachedDocumentRepository, cache_invalidation_bus, latest_document_cache
+from .document_record import DocumentRecord, thaw
 from .document_repository import DocumentRepository
 from .document_service import DocumentNotFoundError, DocumentService
 
 load_dotenv()
 
+# Document and user ids are passed around as uuid.UUID
+register_uuid()
+
 logger = logging.getLogger(__name__)
 
+# min_size connections are opened up front and kept; connections opened beyond
+# it during bursts (up to max_size) are closed when they are returned
+POSTGRES_POOL_MIN_SIZE = int(os.getenv("POSTGRES_POOL_MIN_SIZE", "4"))
+POSTGRES_POOL_MAX_SIZE = int(os.getenv("POSTGRES_POOL_MAX_SIZE", "10"))
+# Seconds a caller waits for a free connection before giving up
+POSTGRES_POOL_TIMEOUT = float(os.getenv("POSTGRES_POOL_TIMEOUT", "10"))
+# Connections idle for longer than this are pinged before being handed out
+POSTGRES_POOL_HEALTH_CHECK_SECONDS = float(os.getenv("POSTGRES_POOL_HEALTH_CHECK_SECONDS", "30"))
+POSTGRES_STATEMENT_TIMEOUT_MS = int(os.getenv("POSTGRES_STATEMENT_TIMEOUT_MS", "5000"))
+POSTGRES_CONNECT_TIMEOUT = int(os.getenv("POSTGRES_CONNECT_TIMEOUT", "5"))
+# Attempts at inserting a revision when a concurrent writer takes the same number
+POSTGRES_REVISION_RETRIES = int(os.getenv("POSTGRES_REVISION_RETRIES", "5"))
+# Rows written per statement and transaction by persist_many
+POSTGRES_BULK_BATCH_SIZE = int(os.getenv("POSTGRES_BULK_BATCH_SIZE", "1000"))
+# Store updates as field-level deltas against a full snapshot written every
+# SNAPSHOT_INTERVAL revisions; needs sql/documents_history_compaction.sql
+POSTGRES_HISTORY_COMPACTION = os.getenv("POSTGRES_HISTORY_COMPACTION", "false").lower() == "true"
+POSTGRES_HISTORY_SNAPSHOT_INTERVAL = int(os.getenv("POSTGRES_HISTORY_SNAPSHOT_INTERVAL", "16"))
+
 
 def _connection_kwargs() -> Dict[str, Any]:
     return {
@@ -23,15 +53,147 @@ def _connection_kwargs() -> Dict[str, Any]:
         "database": os.getenv("POSTGRES_DB"),
         "user": os.getenv("POSTGRES_USER"),
         "password": os.getenv("POSTGRES_PASSWORD"),
+        "connect_timeout": POSTGRES_CONNECT_TIMEOUT,
+        "options": f"-c statement_timeout={POSTGRES_STATEMENT_TIMEOUT_MS}",
     }
 
 
-def _get_connection() -> psycopg2.extensions.connection:
-    return psycopg2.connect(**_connection_kwargs())
+class PostgresConnectionPool:
+    """Thread-safe pool of Postgres connections shared by the API and the queue listener.
+
+    ``psycopg2.pool.ThreadedConnectionPool`` raises as soon as it is exhausted, so
+    checkouts are gated by a semaphore and callers wait up to ``timeout`` seconds
+    for a connection instead. Connections that were idle for longer than
+    ``health_check_interval`` are pinged before use and replaced if they are dead.
+    """
+
+    def __init__(
+        self,
+        min_size: int,
+        max_size: int,
+        timeout: float,
+        health_check_interval: float,
+        connection_kwargs: Dict[str, Any],
+    ) -> None:
+        self._pool = ThreadedConnectionPool(min_size, max_size, **connection_kwargs)
+        self._available = threading.BoundedSemaphore(max_size)
+        self._timeout = timeout
+        self._health_check_interval = health_check_interval
+        self._last_used: Dict[int, float] = {}
+
+    def _is_healthy(self, connection: psycopg2.extensions.connection) -> bool:
+        if connection.closed:
+            return False
+        last_used = self._last_used.get(id(connection))
+        if last_used is not None and time.monotonic() - last_used < self._health_check_interval:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            connection.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def getconn(self) -> psycopg2.extensions.connection:
+        if not self._available.acquire(timeout=self._timeout):
+            raise PoolError(f"No Postgres connection available within {self._timeout}s")
+        try:
+            while True:
+                connection = self._pool.getconn()
+                if self._is_healthy(connection):
+                    return connection
+                logger.warning("Discarding broken Postgres connection")
+                self._discard(connection)
+        except Exception:
+            self._available.release()
+            raise
+
+    def putconn(self, connection: psycopg2.extensions.connection) -> None:
+        try:
+            if connection.closed:
+                self._discard(connection)
+            else:
+                self._last_used[id(connection)] = time.monotonic()
+                self._pool.putconn(connection)
+                if connection.closed:
+                    # Surplus connection closed by the pool
+                    self._last_used.pop(id(connection), None)
+        finally:
+            self._available.release()
+
+    def _discard(self, connection: psycopg2.extensions.connection) -> None:
+        self._last_used.pop(id(connection), None)
+        self._pool.putconn(connection, close=True)
+
+    def closeall(self) -> None:
+        self._pool.closeall()
+
+
+_pool: Optional[PostgresConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_connection_pool() -> PostgresConnectionPool:
+    """Return the process-wide pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PostgresConnectionPool(
+                    POSTGRES_POOL_MIN_SIZE,
+                    POSTGRES_POOL_MAX_SIZE,
+                    POSTGRES_POOL_TIMEOUT,
+                    POSTGRES_POOL_HEALTH_CHECK_SECONDS,
+                    _connection_kwargs(),
+                )
+    return _pool
+
+
+def close_connection_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+
+
+@contextmanager
+def _get_connection() -> Iterator[psycopg2.extensions.connection]:
+    """Borrow a pooled connection for one transaction.
+
+    The transaction is committed when the block exits normally and rolled back
+    on error; the connection always goes back to the pool.
+    """
+    pool = get_connection_pool()
+    connection = pool.getconn()
+    try:
+        yield connection
+        connection.commit()
+    except Exception:
+        if not connection.closed:
+            try:
+                connection.rollback()
+            except psycopg2.Error:
+                connection.close()
+        raise
+    finally:
+        pool.putconn(connection)
 
 
 class PostgresDocumentRepository(DocumentRepository):
-    """Concrete repository that persists metadata revisions in Postgres."""
+    """Concrete repository that persists metadata revisions in Postgres.
+
+    Revisions are appended to ``documents``; the latest one of every document is
+    kept in ``documents_current`` by the same statement and serves current reads.
+
+    With ``compact_history``, updates made through ``persist_revision`` are stored as
+    delta rows holding only the fields that differ from the newest full row, and a
+    full row is written again once that snapshot is ``snapshot_interval`` revisions
+    old. History reads then rebuild delta rows in SQL, so the setting has to stay
+    on once delta rows were written. Without it, history is read from the full
+    rows only and the compaction columns are never referenced.
+    """
 
     _INSERT_COLUMNS = [
         "document_id",
@@ -60,89 +222,401 @@ class PostgresDocumentRepository(DocumentRepository):
 
     _RETURNING_COLUMNS = ["id", *_INSERT_COLUMNS]
 
-    def persist(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
-        placeholders = ", ".join(["%s"] * len(self._INSERT_COLUMNS))
+    # Casts for bulk VALUES lists, where Postgres cannot infer types from the target table
+    _COLUMN_TYPES = {
+        "document_id": "uuid",
+        "is_deleted": "boolean",
+        "file_size": "bigint",
+        "upload_date": "timestamptz",
+        "last_modified_date": "timestamptz",
+        "user_id": "uuid",
+        "tags": "text[]",
+        "version": "integer",
+        "acl": "jsonb",
+        "expiration_date": "timestamptz",
+        "brand_id": "uuid",
+    }
+
+    # Columns a delta row leaves NULL and records in ``changes`` when they differ
+    _DATA_COLUMNS = [
+        column for column in _INSERT_COLUMNS if column not in ("document_id", "revision", "is_deleted")
+    ]
+
+    def __init__(
+        self,
+        *,
+        compact_history: bool = POSTGRES_HISTORY_COMPACTION,
+        snapshot_interval: int = POSTGRES_HISTORY_SNAPSHOT_INTERVAL,
+    ) -> None:
+        if snapshot_interval < 1:
+            raise ValueError("snapshot_interval must be at least 1")
+        self._compact_history = compact_history
+        self._snapshot_interval = snapshot_interval
+
+    def persist(self, metadata: Dict[str, Any]) -> DocumentRecord:
+        columns = [column for column in self._INSERT_COLUMNS if column != "revision"]
+        selected = [
+            "COALESCE(MAX(revision), 0) + 1" if column == "revision" else "%s"
+            for column in self._INSERT_COLUMNS
+        ]
         query = (
             f"INSERT INTO documents ({', '.join(self._INSERT_COLUMNS)})"
-            f" VALUES ({placeholders}) RETURNING {', '.join(self._RETURNING_COLUMNS)}"
+            f" SELECT {', '.join(selected)} FROM documents WHERE document_id = %s"
+            f" RETURNING {', '.join(self._RETURNING_COLUMNS)}"
         )
 
-        values = [
+        values = [self._adapt_value(column, metadata.get(column)) for column in columns]
+        values[columns.index("is_deleted")] = metadata.get("is_deleted", False)
+
+        logger.debug("Persisting document metadata with values: %s", values)
+        return self._insert_revision(
             metadata.get("document_id"),
-            metadata.get("revision"),
-            metadata.get("is_deleted", False),
-            metadata.get("file_name"),
-            metadata.get("file_size"),
-            metadata.get("file_type"),
-            metadata.get("upload_date"),
-            metadata.get("last_modified_date"),
-            metadata.get("user_id"),
-            metadata.get("tags"),
-            metadata.get("description"),
-            metadata.get("storage_path"),
-            metadata.get("version"),
-            metadata.get("checksum"),
-            Json(metadata["acl"]) if metadata.get("acl") is not None else None,
-            metadata.get("thumbnail_path"),
-            metadata.get("expiration_date"),
-            metadata.get("category"),
-            metadata.get("division"),
-            metadata.get("business_unit"),
-            metadata.get("brand_id"),
-            metadata.get("document_type"),
+            self._with_projection(query),
+            [*values, metadata.get("document_id")],
+        )
+
+    def persist_revision(self, document_id: UUID, changes: Dict[str, Any]) -> Optional[DocumentRecord]:
+        selected = []
+        params: List[Any] = []
+        for column in self._INSERT_COLUMNS:
+            if column == "revision":
+                selected.append("latest.revision + 1")
+            elif column in changes and column != "document_id":
+                cast = self._COLUMN_TYPES.get(column)
+                selected.append(f"%s::{cast}" if cast else "%s")
+                params.append(self._adapt_value(column, changes[column]))
+            else:
+                selected.append(f"latest.{column}")
+
+        logger.debug("Appending revision to document %s with changes: %s", document_id, changes)
+        if self._compact_history:
+            statement = self._compact_revision_statement(selected)
+            return self._insert_revision(document_id, statement, [document_id, *params, document_id]) or None
+
+        query = (
+            f"INSERT INTO documents ({', '.join(self._INSERT_COLUMNS)})"
+            f" SELECT {', '.join(selected)} FROM documents_current AS latest"
+            f" WHERE latest.document_id = %s AND latest.is_deleted = FALSE"
+            f" RETURNING {', '.join(self._RETURNING_COLUMNS)}"
+        )
+        return self._insert_revision(document_id, self._with_projection(query), [*params, document_id]) or None
+
+    def _compact_revision_statement(self, selected: List[str]) -> str:
+        """Build the statement that appends a revision as a delta row, or as a snapshot when one is due.
+
+        ``selected`` holds one expression per insert column over the ``latest``
+        projection row. The delta is taken against the newest full row of the
+        document. A full row is stored instead when that snapshot is missing or
+        ``snapshot_interval`` or more revisions older, or when the delta would not
+        be smaller than the row. The full revision is upserted into
+        documents_current and returned either way.
+        """
+        candidate = ", ".join(f"{expression} AS {column}" for expression, column in zip(selected, self._INSERT_COLUMNS))
+        stored = ", ".join([
+            "document_id",
+            "revision",
+            "is_deleted",
+            *(f"CASE WHEN base_revision IS NULL THEN {column} END" for column in self._DATA_COLUMNS),
+            "base_revision",
+            "changes",
+        ])
+        full_columns = ", ".join(
+            "inserted.id" if column == "id" else f"staged.{column}" for column in self._RETURNING_COLUMNS
+        )
+        return (
+            "WITH latest AS ("
+            "SELECT * FROM documents_current WHERE document_id = %s AND is_deleted = FALSE"
+            f"), candidate AS (SELECT {candidate} FROM latest"
+            "), base AS ("
+            "SELECT snapshot.* FROM documents AS snapshot"
+            " WHERE snapshot.document_id = %s AND snapshot.changes IS NULL"
+            " ORDER BY snapshot.revision DESC LIMIT 1"
+            "), diffed AS ("
+            "SELECT candidate.*, base.revision AS snapshot_revision, pg_column_size(candidate) AS row_size,"
+            " CASE WHEN base.revision IS NOT NULL THEN ("
+            "SELECT COALESCE(jsonb_object_agg(field.key, field.value), '{}'::jsonb)"
+            " FROM jsonb_each(to_jsonb(candidate) - 'document_id' - 'revision' - 'is_deleted') AS field"
+            " WHERE field.value IS DISTINCT FROM to_jsonb(base) -> field.key"
+            ") END AS delta"
+            f" FROM candidate LEFT JOIN base ON candidate.revision - base.revision < {self._snapshot_interval:d}"
+            "), staged AS ("
+            "SELECT diffed.*,"
+            " CASE WHEN pg_column_size(delta) < row_size THEN snapshot_revision END AS base_revision,"
+            " CASE WHEN pg_column_size(delta) < row_size THEN delta END AS changes"
+            " FROM diffed"
+            f"), inserted AS (INSERT INTO documents ({', '.join(self._INSERT_COLUMNS)}, base_revision, changes)"
+            f" SELECT {stored} FROM staged RETURNING id, document_id, revision"
+            f"), full_rows AS (SELECT {full_columns} FROM inserted JOIN staged USING (document_id, revision)"
+            f"), projected AS ({self._projection_upsert('full_rows')})"
+            f" SELECT {', '.join(self._RETURNING_COLUMNS)} FROM full_rows"
+        )
+
+    def persist_many(
+        self,
+        records: List[Dict[str, Any]],
+        *,
+        batch_size: Optional[int] = None,
+        skip_existing: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """Store many records, one multi-row INSERT and transaction per batch.
+
+        Revisions are numbered in SQL from the documents_current projection, with
+        records for the same document taking consecutive revisions in input order.
+        A batch rejected for its data is retried row by row so one bad record only
+        fails itself; connection and server errors propagate. Returns one
+        ``{"record": ...}``, ``{"error": ...}`` or ``{"skipped": True}`` per input.
+        """
+        batch_size = batch_size or POSTGRES_BULK_BATCH_SIZE
+        outcomes: List[Dict[str, Any]] = []
+        for start in range(0, len(records), batch_size):
+            batch = records[start:start + batch_size]
+            try:
+                rows = self._insert_batch(batch, skip_existing)
+            except (psycopg2.DataError, psycopg2.IntegrityError) as exc:
+                logger.warning("Bulk insert of %s records failed (%s), retrying row by row", len(batch), str(exc).strip())
+                outcomes.extend(self._persist_each(batch, skip_existing))
+                continue
+            outcomes.extend({"record": row} if row else {"skipped": True} for row in rows)
+        return outcomes
+
+    def _insert_batch(self, batch: List[Dict[str, Any]], skip_existing: bool) -> List[Optional[DocumentRecord]]:
+        columns = [column for column in self._INSERT_COLUMNS if column != "revision"]
+        returning = ", ".join(f"inserted.{column}" for column in self._RETURNING_COLUMNS)
+        # With skip_existing only the first record of a document that is not stored yet is inserted
+        condition = " WHERE latest_revision IS NULL AND position = 1" if skip_existing else ""
+        # Bulk writers skip the per-document advisory lock; the unique constraint
+        # catches a race with a concurrent writer and the batch is retried.
+        query = (
+            f"WITH input (ord, {', '.join(columns)}) AS (VALUES %s),"
+            " positioned AS ("
+            "SELECT input.*, latest.revision AS latest_revision,"
+            " ROW_NUMBER() OVER (PARTITION BY input.document_id ORDER BY input.ord) AS position"
+            " FROM input LEFT JOIN documents_current AS latest ON latest.document_id = input.document_id"
+            "), numbered AS ("
+            "SELECT positioned.*, COALESCE(latest_revision, 0) + position AS revision"
+            f" FROM positioned{condition}"
+            "), inserted AS ("
+            f"INSERT INTO documents ({', '.join(self._INSERT_COLUMNS)})"
+            f" SELECT {', '.join(self._INSERT_COLUMNS)} FROM numbered"
+            f" RETURNING {', '.join(self._RETURNING_COLUMNS)}"
+            f"), projected AS ({self._projection_upsert()})"
+            f" SELECT numbered.ord, {returning} FROM inserted"
+            " JOIN numbered USING (document_id, revision)"
+        )
+        template = "(%s, " + ", ".join(
+            f"%s::{self._COLUMN_TYPES[column]}" if column in self._COLUMN_TYPES else "%s"
+            for column in columns
+        ) + ")"
+        values = [
+            [
+                ord_,
+                *(
+                    self._adapt_value(column, metadata.get(column, False if column == "is_deleted" else None))
+                    for column in columns
+                ),
+            ]
+            for ord_, metadata in enumerate(batch)
         ]
 
-        logger.debug("Persisting document metadata with values: %s", values)
+        for attempt in range(1, POSTGRES_REVISION_RETRIES + 1):
+            try:
+                with _get_connection() as connection:
+                    with connection.cursor(cursor_factory=RealDictCursor) as cursor:
+                        rows = execute_values(cursor, query, values, template=template, page_size=len(values), fetch=True)
+                break
+            except errors.UniqueViolation as exc:
+                if exc.diag.constraint_name != "uq_document_revision" or attempt == POSTGRES_REVISION_RETRIES:
+                    raise
+                logger.info("Revision taken by a concurrent writer, retrying batch (attempt %s)", attempt)
+
+        stored: List[Optional[DocumentRecord]] = [None] * len(batch)
+        for row in rows:
+            row = dict(row)
+            stored[row.pop("ord")] = self._convert_row(row)
+        return stored
+
+    def _persist_each(self, batch: List[Dict[str, Any]], skip_existing: bool) -> List[Dict[str, Any]]:
+        outcomes: List[Dict[str, Any]] = []
+        for metadata in batch:
+            try:
+                row = self._insert_batch([metadata], skip_existing)[0]
+            except (psycopg2.DataError, psycopg2.IntegrityError) as exc:
+                outcomes.append({"error": str(exc).strip()})
+                continue
+            outcomes.append({"record": row} if row else {"skipped": True})
+        return outcomes
+
+    def _insert_revision(self, document_id: UUID, query: str, params: List[Any]) -> DocumentRecord:
+        """Run a statement that derives the next revision from the stored ones and returns the new row.
+
+        Writers to the same document queue on a transaction-level advisory lock sent
+        in the same round trip, so the INSERT sees every revision committed before it.
+        The unique constraint still guards writers that bypass the lock, and a
+        collision on it is retried a bounded number of times.
+        """
+        statement = (
+            "SELECT pg_advisory_xact_lock(hashtextextended(%s::text, 0)); "
+            f"{query}"
+        )
+        for attempt in range(1, POSTGRES_REVISION_RETRIES + 1):
+            try:
+                with _get_connection() as connection:
+                    with connection.cursor(cursor_factory=RealDictCursor) as cursor:
+                        cursor.execute(statement, [document_id, *params])
+                        return self._convert_row(cursor.fetchone())
+            except errors.UniqueViolation as exc:
+                if exc.diag.constraint_name != "uq_document_revision" or attempt == POSTGRES_REVISION_RETRIES:
+                    raise
+                logger.info("Revision taken by a concurrent writer, retrying (attempt %s)", attempt)
+
+    def _with_projection(self, insert_query: str) -> str:
+        """Wrap an INSERT into documents so it also upserts the documents_current row."""
+        columns = ", ".join(self._RETURNING_COLUMNS)
+        return (
+            f"WITH inserted AS ({insert_query}), projected AS ({self._projection_upsert()})"
+            f" SELECT {columns} FROM inserted"
+        )
+
+    def _projection_upsert(self, source: str = "inserted") -> str:
+        """Upsert documents_current from the newest row per document of the ``source`` CTE."""
+        columns = ", ".join(self._RETURNING_COLUMNS)
+        assignments = ", ".join(
+            f"{column} = EXCLUDED.{column}" for column in self._RETURNING_COLUMNS if column != "document_id"
+        )
+        return (
+            f"INSERT INTO documents_current ({columns})"
+            f" SELECT DISTINCT ON (document_id) {columns} FROM {source} ORDER BY document_id, revision DESC"
+            f" ON CONFLICT (document_id) DO UPDATE SET {assignments}"
+            f" WHERE documents_current.revision < EXCLUDED.revision"
+        )
+
+    @staticmethod
+    def _adapt_value(column: str, value: Any) -> Any:
+        if value is None:
+            return value
+        if column == "acl":
+            return Json(thaw(value))
+        if column == "tags":
+            # psycopg2 adapts lists to arrays but tuples to row values
+            return list(value)
+        return value
+
+    def fetch_latest(self, document_id: UUID, include_deleted: bool = False) -> Optional[DocumentRecord]:
+        query = f"SELECT {', '.join(self._RETURNING_COLUMNS)} FROM documents_current WHERE document_id = %s"
+        if not include_deleted:
+            query += " AND is_deleted = FALSE"
 
         with _get_connection() as connection:
             with connection.cursor(cursor_factory=RealDictCursor) as cursor:
-                cursor.execute(query, values)
+                cursor.execute(query, (document_id,))
                 row = cursor.fetchone()
-                return self._convert_row(row)
+                return self._convert_row(row) if row else None
 
-    def fetch_latest(self, document_id: UUID, include_deleted: bool = False) -> Optional[Dict[str, Any]]:
-        conditions = ["document_id = %s"]
+    def fetch_history(
+        self,
+        document_id: UUID,
+        *,
+        before_revision: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[DocumentRecord]:
+        page = "FROM documents WHERE document_id = %s"
         params: List[Any] = [document_id]
-        if not include_deleted:
-            conditions.append("is_deleted = FALSE")
-
-        query = (
-            f"SELECT {', '.join(self._RETURNING_COLUMNS)} FROM documents "
-            f"WHERE {' AND '.join(conditions)} ORDER BY revision DESC LIMIT 1"
-        )
+        if before_revision is not None:
+            page += " AND revision < %s"
+            params.append(before_revision)
+        page += " ORDER BY revision DESC"
+        if limit is not None:
+            page += " LIMIT %s"
+            params.append(limit)
+
+        if not self._compact_history:
+            # Every row is a full row, and the compaction columns may not exist
+            query = f"SELECT {', '.join(self._RETURNING_COLUMNS)} {page}"
+        else:
+            # Delta rows are rebuilt by overlaying their changes on the snapshot they reference
+            columns = ["stored.id", "stored.document_id", "stored.revision", "stored.is_deleted"] + [
+                f"CASE WHEN stored.changes IS NULL THEN stored.{column} ELSE rebuilt.{column} END AS {column}"
+                for column in self._DATA_COLUMNS
+            ]
+            # The page is cut before joining snapshots so only its own rows are rebuilt
+            query = (
+                f"SELECT {', '.join(columns)} FROM (SELECT * {page}) AS stored"
+                " LEFT JOIN documents AS base"
+                " ON base.document_id = stored.document_id AND base.revision = stored.base_revision"
+                " LEFT JOIN LATERAL jsonb_populate_record(base, stored.changes) AS rebuilt ON stored.changes IS NOT NULL"
+                " ORDER BY stored.revision DESC"
+            )
 
         with _get_connection() as connection:
             with connection.cursor(cursor_factory=RealDictCursor) as cursor:
                 cursor.execute(query, params)
-                row = cursor.fetchone()
-                return self._convert_row(row) if row else None
+                rows = cursor.fetchall()
+                return [self._convert_row(row) for row in rows]
+
+    _LISTING_FILTERS = {
+        "user_id",
+        "category",
+        "division",
+        "business_unit",
+        "brand_id",
+        "file_type",
+        "document_type",
+    }
+
+    def list_current(
+        self,
+        filters: Dict[str, Any],
+        *,
+        tags: Optional[List[str]] = None,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        limit: int = 50,
+    ) -> List[DocumentRecord]:
+        unknown = set(filters) - self._LISTING_FILTERS
+        if unknown:
+            raise ValueError(f"Unsupported document filters: {', '.join(sorted(unknown))}")
+
+        conditions = ["is_deleted = FALSE"]
+        params: List[Any] = []
+        for column, value in sorted(filters.items()):
+            conditions.append(f"{column} = %s")
+            params.append(value)
+        if tags:
+            conditions.append("tags @> %s")
+            params.append(list(tags))
+        if after is not None:
+            conditions.append("(upload_date, document_id) < (%s, %s)")
+            params.extend(after)
+        params.append(limit)
 
-    def fetch_history(self, document_id: UUID) -> List[Dict[str, Any]]:
         query = (
-            f"SELECT {', '.join(self._RETURNING_COLUMNS)} FROM documents "
-            "WHERE document_id = %s ORDER BY revision DESC"
+            f"SELECT {', '.join(self._RETURNING_COLUMNS)} FROM documents_current "
+            f"WHERE {' AND '.join(conditions)} "
+            "ORDER BY upload_date DESC, document_id DESC LIMIT %s"
         )
 
         with _get_connection() as connection:
             with connection.cursor(cursor_factory=RealDictCursor) as cursor:
-                cursor.execute(query, (document_id,))
-                rows = cursor.fetchall()
-                return [self._convert_row(row) for row in rows]
+                cursor.execute(query, params)
+                return [self._convert_row(row) for row in cursor.fetchall()]
 
     @staticmethod
-    def _convert_row(row: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    def _convert_row(row: Optional[Dict[str, Any]]) -> DocumentRecord:
         if not row:
-            return {}
-        # RealDictCursor returns dict-like rows which we copy to avoid mutation.
-        record = dict(row)
-        # psycopg2 already converts UUID/JSON/ARRAY types, only ensure empty tags default.
+            return DocumentRecord()
+        # psycopg2 already converts UUID/JSON/ARRAY types; freezing turns the fresh
+        # tag list and ACL dict into their immutable forms without another copy.
+        record = DocumentRecord(row)
         if record.get("tags") is None:
-            record["tags"] = []
+            record = record.replace(tags=())
         return record
 
 
 _repository = PostgresDocumentRepository()
-_document_service = DocumentService(_repository)
+_document_service = DocumentService(
+    CachedDocumentRepository(_repository, latest_document_cache, cache_invalidation_bus.publish)
+    if latest_document_cache is not None
+    else _repository
+)
 
 
 # ----------------------------------------------------------------------
@@ -152,38 +626,61 @@ def get_document_service() -> DocumentService:
     return _document_service
 
 
-def save_document_metadata(document_metadata: Dict[str, Any]) -> Dict[str, Any]:
+def save_document_metadata(document_metadata: Dict[str, Any]) -> DocumentRecord:
     logger.info("Saving document metadata for %s", document_metadata.get("document_id"))
     return _document_service.create_document(document_metadata)
 
 
-def update_document_metadata(document_id: Any, updates: Dict[str, Any]) -> Dict[str, Any]:
+def save_documents_metadata(
+    documents_metadata: List[Dict[str, Any]],
+    *,
+    batch_size: Optional[int] = None,
+    skip_existing: bool = False,
+) -> List[Dict[str, Any]]:
+    logger.info("Saving metadata for %s documents", len(documents_metadata))
+    return _document_service.create_documents(
+        documents_metadata,
+        batch_size=batch_size,
+        skip_existing=skip_existing,
+    )
+
+
+def update_document_metadata(document_id: Any, updates: Dict[str, Any]) -> DocumentRecord:
     logger.info("Creating new revision for document %s", document_id)
     return _document_service.update_document(document_id, updates)
 
 
-def get_latest_document_metadata(document_id: Any, *, include_deleted: bool = False) -> Dict[str, Any]:
+def get_latest_document_metadata(document_id: Any, *, include_deleted: bool = False) -> DocumentRecord:
     logger.debug("Fetching latest metadata for document %s", document_id)
     return _document_service.get_latest_document(document_id, include_deleted=include_deleted)
 
 
-def list_document_history(document_id: Any) -> List[Dict[str, Any]]:
+def list_document_history(
+    document_id: Any,
+    *,
+    limit: Optional[int] = None,
+    before_revision: Optional[int] = None,
+) -> List[DocumentRecord]:
     logger.debug("Fetching metadata history for document %s", document_id)
-    return _document_service.list_document_history(document_id)
+    return _document_service.list_document_history(document_id, limit=limit, before_revision=before_revision)
 
 
-def delete_document_metadata(document_id: Any) -> Dict[str, Any]:
+def delete_document_metadata(document_id: Any) -> DocumentRecord:
     logger.info("Soft deleting document %s", document_id)
     return _document_service.soft_delete_document(document_id)
 
 
 __all__ = [
     "DocumentNotFoundError",
+    "PostgresConnectionPool",
     "PostgresDocumentRepository",
+    "close_connection_pool",
     "delete_document_metadata",
+    "get_connection_pool",
     "get_document_service",
     "get_latest_document_metadata",
     "list_document_history",
     "save_document_metadata",
+    "save_documents_metadata",
     "update_document_metadata",
 ]
@@ -0,0 +1,233 @@
+"""
+Revision history benchmark for full and compact (delta) storage
+
+Creates documents with realistic metadata, appends revisions to each through
+DocumentService.update_document, and writes every document twice: once with
+full-row revisions and once with POSTGRES_HISTORY_COMPACTION-style delta rows.
+It reports as JSON, per mode:
+  - bytes stored in documents for the benchmark rows (pg_column_size)
+  - update latency
+  - latency of reading the newest history page and of reading the whole history
+    page by page; the compact-minus-full difference is the reconstruction cost
+
+Connection settings come from the usual POSTGRES_* environment variables, and
+the schema must include sql/documents_current.sql and
+sql/documents_history_compaction.sql. Benchmark documents are deleted afterwards
+unless --keep is given.
+
+Usage:
+    python benchmarks/history_benchmark.py --documents 20 --revisions 200
+    python benchmarks/history_benchmark.py --snapshot-interval 8,16,32 --output history.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List
+
+SERVICE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, SERVICE_ROOT)
+
+# The latest-document cache only gets in the way of measuring storage
+os.environ.setdefault("DOCUMENT_CACHE_ENABLED", "false")
+
+from app.services.document_service import DocumentService  # noqa: E402
+from app.services.postgres_service import PostgresDocumentRepository, _get_connection  # noqa: E402
+
+WORDS = "retail supply chain inventory platform specification release audit quarterly brand".split()
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    return {
+        "p50_ms": round(statistics.median(samples) * 1000, 3),
+        "p99_ms": round(percentile(samples, 0.99) * 1000, 3),
+    }
+
+
+def sample_document(rng: random.Random) -> Dict[str, Any]:
+    now = datetime.now(timezone.utc)
+    document_id = uuid.uuid4()
+    return {
+        "document_id": document_id,
+        "file_name": f"{'-'.join(rng.sample(WORDS, 3))}.pdf",
+        "file_size": rng.randint(10_000, 50_000_000),
+        "file_type": "application/pdf",
+        "upload_date": now,
+        "last_modified_date": now,
+        "user_id": uuid.uuid4(),
+        "tags": rng.sample(WORDS, 6),
+        "description": " ".join(rng.choice(WORDS) for _ in range(40)),
+        "storage_path": f"documents/{document_id}/{uuid.uuid4()}/original.pdf",
+        "version": 1,
+        "checksum": uuid.uuid4().hex * 2,
+        "acl": {"read": [str(uuid.uuid4()) for _ in range(4)], "write": [str(uuid.uuid4())]},
+        "thumbnail_path": f"thumbnails/{document_id}.png",
+        "category": "Technical Documentation",
+        "division": "Engineering",
+        "business_unit": "Platform",
+        "brand_id": uuid.uuid4(),
+        "document_type": "Specification",
+    }
+
+
+def sample_update(rng: random.Random, revision: int) -> Dict[str, Any]:
+    """Typical edits touch one or two fields"""
+    choice = rng.random()
+    if choice < 0.4:
+        update = {"description": " ".join(rng.choice(WORDS) for _ in range(40))}
+    elif choice < 0.6:
+        update = {"tags": rng.sample(WORDS, 6)}
+    elif choice < 0.8:
+        update = {"version": revision, "checksum": uuid.uuid4().hex * 2, "file_size": rng.randint(10_000, 50_000_000)}
+    else:
+        update = {"acl": {"read": [str(uuid.uuid4()) for _ in range(4)], "write": [str(uuid.uuid4())]}}
+    update["last_modified_date"] = datetime.now(timezone.utc) + timedelta(seconds=revision)
+    return update
+
+
+def timed(function: Callable[[], Any], samples: List[float]) -> Any:
+    started = time.perf_counter()
+    result = function()
+    samples.append(time.perf_counter() - started)
+    return result
+
+
+def stored_bytes(document_ids: List[uuid.UUID]) -> Dict[str, int]:
+    with _get_connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT count(*), count(changes), COALESCE(sum(pg_column_size(documents.*)), 0)"
+                " FROM documents WHERE document_id = ANY(%s)",
+                (document_ids,),
+            )
+            rows, delta_rows, size = cursor.fetchone()
+    return {"rows": rows, "delta_rows": delta_rows, "full_rows": rows - delta_rows, "bytes": int(size)}
+
+
+def delete_documents(document_ids: List[uuid.UUID]) -> None:
+    with _get_connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM documents_current WHERE document_id = ANY(%s)", (document_ids,))
+            cursor.execute("DELETE FROM documents WHERE document_id = ANY(%s)", (document_ids,))
+
+
+def run_mode(
+    label: str,
+    service: DocumentService,
+    documents: List[Dict[str, Any]],
+    updates: List[List[Dict[str, Any]]],
+    page_size: int,
+) -> Dict[str, Any]:
+    write_samples: List[float] = []
+    first_page_samples: List[float] = []
+    full_history_samples: List[float] = []
+    document_ids = []
+    histories = []
+    for metadata, document_updates in zip(documents, updates):
+        document_id = uuid.uuid4()
+        document_ids.append(document_id)
+        service.create_document({**metadata, "document_id": document_id})
+        for update in document_updates:
+            timed(lambda: service.update_document(document_id, update), write_samples)
+
+    for document_id in document_ids:
+        timed(lambda: service.list_document_history(document_id, limit=page_size), first_page_samples)
+
+        def read_all() -> List[Dict[str, Any]]:
+            rows: List[Dict[str, Any]] = []
+            before = None
+            while True:
+                page = service.list_document_history(document_id, limit=page_size, before_revision=before)
+                rows.extend(page)
+                if len(page) < page_size:
+                    return rows
+                before = page[-1]["revision"]
+
+        histories.append(timed(read_all, full_history_samples))
+
+    return {
+        "mode": label,
+        "storage": stored_bytes(document_ids),
+        "update": summarize(write_samples),
+        "history_first_page": summarize(first_page_samples),
+        "history_all_pages": summarize(full_history_samples),
+        "_document_ids": document_ids,
+        "_histories": histories,
+    }
+
+
+def comparable(history: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [{key: value for key, value in row.items() if key not in ("id", "document_id")} for row in history]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=20)
+    parser.add_argument("--revisions", type=int, default=200, help="updates appended to each document")
+    parser.add_argument("--snapshot-interval", default="16", help="comma separated list of intervals to compare")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--keep", action="store_true", help="leave benchmark documents in the database")
+    parser.add_argument("--output", help="also write the report to this file")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    documents = [sample_document(rng) for _ in range(args.documents)]
+    updates = [[sample_update(rng, revision) for revision in range(2, args.revisions + 2)] for _ in documents]
+
+    modes = [("full", PostgresDocumentRepository(compact_history=False))]
+    for interval in (int(value) for value in args.snapshot_interval.split(",")):
+        modes.append((f"compact/{interval}", PostgresDocumentRepository(compact_history=True, snapshot_interval=interval)))
+
+    results = []
+    try:
+        for label, repository in modes:
+            results.append(run_mode(label, DocumentService(repository), documents, updates, args.page_size))
+    finally:
+        if not args.keep:
+            for result in results:
+                delete_documents(result["_document_ids"])
+
+    baseline = results[0]
+    expected_histories = baseline["_histories"]
+    for result in results:
+        # Every mode must return the same history the full rows do
+        result["history_matches_full"] = all(
+            comparable(history) == comparable(expected)
+            for history, expected in zip(result.pop("_histories"), expected_histories)
+        )
+        result.pop("_document_ids")
+        result["storage"]["saved_ratio"] = round(1 - result["storage"]["bytes"] / baseline["storage"]["bytes"], 3)
+        result["reconstruction_overhead_ms"] = round(
+            result["history_all_pages"]["p50_ms"] - baseline["history_all_pages"]["p50_ms"], 3
+        )
+
+    report = {
+        "documents": args.documents,
+        "revisions_per_document": args.revisions + 1,
+        "page_size": args.page_size,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as file_out:
+            file_out.write(text + "\n")
+    if not all(result["history_matches_full"] for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
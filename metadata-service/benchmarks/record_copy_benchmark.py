@@ -0,0 +1,129 @@
+"""
+Record copying micro-benchmark for DocumentService hot paths
+
+Compares the former mutable-dict rows, which every layer protected with a
+deepcopy, against immutable DocumentRecord rows shared between layers. Rows
+carry a large ACL JSON object and tag array, which dominate the copying cost.
+Measured per operation, as JSON:
+
+  read      row from the driver -> repository row -> service result
+            (dict + deepcopy vs one DocumentRecord build)
+  cached    cached latest revision returned by the service
+            (deepcopy vs returning the shared record)
+  revision  next revision built from the latest one with a small change
+            (deepcopy of both vs DocumentRecord.replace)
+  boundary  DocumentRecord.to_dict, paid once per row at the API boundary
+
+Runs in-process and needs no database.
+
+Usage:
+    python benchmarks/record_copy_benchmark.py --acl-entries 200 --tags 50
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import timeit
+import uuid
+from copy import deepcopy
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict
+
+SERVICE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, SERVICE_ROOT)
+
+from app.services.document_record import DocumentRecord  # noqa: E402
+
+
+def sample_row(acl_entries: int, tags: int) -> Dict[str, Any]:
+    """A row as RealDictCursor returns it, with JSONB and arrays already decoded"""
+    now = datetime.now(timezone.utc)
+    document_id = uuid.uuid4()
+    return {
+        "id": uuid.uuid4(),
+        "document_id": document_id,
+        "revision": 7,
+        "is_deleted": False,
+        "file_name": "specification.pdf",
+        "file_size": 1_048_576,
+        "file_type": "application/pdf",
+        "upload_date": now,
+        "last_modified_date": now,
+        "user_id": uuid.uuid4(),
+        "tags": [f"tag-{index}" for index in range(tags)],
+        "description": "Platform specification",
+        "storage_path": f"documents/{document_id}/original.pdf",
+        "version": 3,
+        "checksum": uuid.uuid4().hex,
+        "acl": {
+            "read": [str(uuid.uuid4()) for _ in range(acl_entries)],
+            "write": [str(uuid.uuid4()) for _ in range(acl_entries // 10)],
+            "groups": [{"id": str(uuid.uuid4()), "role": "viewer"} for _ in range(acl_entries // 10)],
+        },
+        "thumbnail_path": None,
+        "expiration_date": None,
+        "category": "Technical Documentation",
+        "division": "Engineering",
+        "business_unit": "Platform",
+        "brand_id": uuid.uuid4(),
+        "document_type": "Specification",
+    }
+
+
+def measure(function: Callable[[], Any], number: int, repeat: int) -> float:
+    """Best of ``repeat`` runs, in microseconds per call"""
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--acl-entries", type=int, default=200)
+    parser.add_argument("--tags", type=int, default=50)
+    parser.add_argument("--number", type=int, default=2000, help="calls per timing run")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="also write the report to this file")
+    args = parser.parse_args()
+
+    row = sample_row(args.acl_entries, args.tags)
+    changes = {"description": "Updated", "last_modified_date": datetime.now(timezone.utc)}
+    legacy_latest = deepcopy(row)
+    record = DocumentRecord(row)
+
+    cases = {
+        # _convert_row copied the driver row, the service deep-copied the result
+        "read": (lambda: deepcopy(dict(row)), lambda: DocumentRecord(row)),
+        "cached": (lambda: deepcopy(legacy_latest), lambda: record),
+        "revision": (
+            lambda: {**deepcopy(legacy_latest), **deepcopy(changes), "revision": 8},
+            lambda: record.replace(changes, revision=8),
+        ),
+    }
+
+    results = {}
+    for name, (legacy, frozen) in cases.items():
+        legacy_us = measure(legacy, args.number, args.repeat)
+        frozen_us = measure(frozen, args.number, args.repeat)
+        results[name] = {
+            "deepcopy_us": round(legacy_us, 3),
+            "record_us": round(frozen_us, 3),
+            "speedup": round(legacy_us / frozen_us, 1) if frozen_us else None,
+        }
+    results["boundary"] = {"to_dict_us": round(measure(record.to_dict, args.number, args.repeat), 3)}
+
+    report = {
+        "acl_entries": args.acl_entries,
+        "tags": args.tags,
+        "row_json_bytes": len(json.dumps(row, default=str)),
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as file_out:
+            file_out.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -37,3 +37,7 @@ CREATE INDEX idx_document_file_type ON documents (file_type);
 CREATE INDEX idx_document_document_type ON documents (document_type);
 CREATE INDEX idx_document_latest_active ON documents (document_id, revision DESC)
     WHERE is_deleted = FALSE;
+
+-- The latest revision of each document is projected into documents_current,
+-- see documents_current.sql. Revisions between periodic snapshots can be
+-- stored as field-level deltas, see documents_history_compaction.sql.
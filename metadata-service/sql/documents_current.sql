@@ -0,0 +1,99 @@
+-- Projection holding the latest revision of every document, one row per
+-- document_id. metadata-service upserts it in the same statement that appends
+-- a revision to documents, so current-document reads never scan the history.
+CREATE TABLE IF NOT EXISTS documents_current (
+    document_id UUID PRIMARY KEY,
+    id UUID NOT NULL, -- documents.id of the latest revision
+    revision INTEGER NOT NULL,
+    is_deleted BOOLEAN NOT NULL DEFAULT FALSE,
+    file_name TEXT NOT NULL,
+    file_size BIGINT NOT NULL,
+    file_type TEXT NOT NULL,
+    upload_date TIMESTAMP WITH TIME ZONE NOT NULL, -- listing sort and pagination key
+    last_modified_date TIMESTAMP WITH TIME ZONE,
+    user_id UUID NOT NULL,
+    tags TEXT[],
+    description TEXT,
+    storage_path TEXT NOT NULL,
+    version INTEGER,
+    checksum TEXT NOT NULL,
+    acl JSONB,
+    thumbnail_path TEXT,
+    expiration_date TIMESTAMP WITH TIME ZONE,
+    category TEXT,
+    division TEXT,
+    business_unit TEXT,
+    brand_id UUID,
+    document_type TEXT NOT NULL
+);
+
+-- Listings are ordered and paginated by upload_date, where NULL would sort
+-- first and never match the keyset. Revisions written before the service always
+-- set it fall back to their modification time.
+UPDATE documents_current
+SET upload_date = COALESCE(last_modified_date, NOW())
+WHERE upload_date IS NULL;
+ALTER TABLE documents_current ALTER COLUMN upload_date SET NOT NULL;
+
+-- Backfill from existing revisions. Safe to re-run: rows only move forward to
+-- newer revisions, so running it again after the deploy catches up any writes
+-- made by instances that did not maintain the projection yet.
+INSERT INTO documents_current (
+    document_id, id, revision, is_deleted, file_name, file_size, file_type,
+    upload_date, last_modified_date, user_id, tags, description, storage_path,
+    version, checksum, acl, thumbnail_path, expiration_date, category, division,
+    business_unit, brand_id, document_type
+)
+SELECT DISTINCT ON (document_id)
+    document_id, id, revision, is_deleted, file_name, file_size, file_type,
+    COALESCE(upload_date, last_modified_date, NOW()), last_modified_date, user_id, tags, description, storage_path,
+    version, checksum, acl, thumbnail_path, expiration_date, category, division,
+    business_unit, brand_id, document_type
+FROM documents
+ORDER BY document_id, revision DESC
+ON CONFLICT (document_id) DO UPDATE SET
+    id = EXCLUDED.id,
+    revision = EXCLUDED.revision,
+    is_deleted = EXCLUDED.is_deleted,
+    file_name = EXCLUDED.file_name,
+    file_size = EXCLUDED.file_size,
+    file_type = EXCLUDED.file_type,
+    upload_date = EXCLUDED.upload_date,
+    last_modified_date = EXCLUDED.last_modified_date,
+    user_id = EXCLUDED.user_id,
+    tags = EXCLUDED.tags,
+    description = EXCLUDED.description,
+    storage_path = EXCLUDED.storage_path,
+    version = EXCLUDED.version,
+    checksum = EXCLUDED.checksum,
+    acl = EXCLUDED.acl,
+    thumbnail_path = EXCLUDED.thumbnail_path,
+    expiration_date = EXCLUDED.expiration_date,
+    category = EXCLUDED.category,
+    division = EXCLUDED.division,
+    business_unit = EXCLUDED.business_unit,
+    brand_id = EXCLUDED.brand_id,
+    document_type = EXCLUDED.document_type
+WHERE documents_current.revision < EXCLUDED.revision;
+
+-- Listing indexes over current, non-deleted documents. Every listing is ordered
+-- by (upload_date, document_id) descending and paginated with a keyset on the
+-- same columns, so each filter gets a composite index ending in that key.
+CREATE INDEX IF NOT EXISTS idx_documents_current_listing
+    ON documents_current (upload_date DESC, document_id DESC) WHERE is_deleted = FALSE;
+CREATE INDEX IF NOT EXISTS idx_documents_current_user
+    ON documents_current (user_id, upload_date DESC, document_id DESC) WHERE is_deleted = FALSE;
+CREATE INDEX IF NOT EXISTS idx_documents_current_category
+    ON documents_current (category, upload_date DESC, document_id DESC) WHERE is_deleted = FALSE;
+CREATE INDEX IF NOT EXISTS idx_documents_current_division
+    ON documents_current (division, upload_date DESC, document_id DESC) WHERE is_deleted = FALSE;
+CREATE INDEX IF NOT EXISTS idx_documents_current_business_unit
+    ON documents_current (business_unit, upload_date DESC, document_id DESC) WHERE is_deleted = FALSE;
+CREATE INDEX IF NOT EXISTS idx_documents_current_brand
+    ON documents_current (brand_id, upload_date DESC, document_id DESC) WHERE is_deleted = FALSE;
+CREATE INDEX IF NOT EXISTS idx_documents_current_file_type
+    ON documents_current (file_type, upload_date DESC, document_id DESC) WHERE is_deleted = FALSE;
+CREATE INDEX IF NOT EXISTS idx_documents_current_document_type
+    ON documents_current (document_type, upload_date DESC, document_id DESC) WHERE is_deleted = FALSE;
+CREATE INDEX IF NOT EXISTS idx_documents_current_tags
+    ON documents_current USING GIN (tags) WHERE is_deleted = FALSE;
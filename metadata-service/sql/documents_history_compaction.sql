@@ -0,0 +1,29 @@
+-- Compact revision history. With POSTGRES_HISTORY_COMPACTION enabled,
+-- metadata-service stores a full row only every POSTGRES_HISTORY_SNAPSHOT_INTERVAL
+-- revisions. The revisions in between are stored as "delta" rows: the field
+-- values that differ from that snapshot go in changes, and the data columns are
+-- left NULL. documents_current always holds the full latest revision, and
+-- history reads rebuild delta rows from their snapshot. Apply this migration
+-- before enabling compaction, and keep compaction enabled once delta rows were
+-- written: with it disabled, history reads skip the rebuild and never touch
+-- these columns.
+ALTER TABLE documents
+    ADD COLUMN IF NOT EXISTS base_revision INTEGER, -- snapshot revision a delta row is relative to
+    ADD COLUMN IF NOT EXISTS changes JSONB, -- NULL for full rows
+    ALTER COLUMN file_name DROP NOT NULL,
+    ALTER COLUMN file_size DROP NOT NULL,
+    ALTER COLUMN file_type DROP NOT NULL,
+    ALTER COLUMN user_id DROP NOT NULL,
+    ALTER COLUMN storage_path DROP NOT NULL,
+    ALTER COLUMN checksum DROP NOT NULL,
+    ALTER COLUMN document_type DROP NOT NULL;
+
+-- Full rows keep the guarantees the dropped NOT NULL constraints gave.
+ALTER TABLE documents DROP CONSTRAINT IF EXISTS chk_document_full_or_delta;
+ALTER TABLE documents ADD CONSTRAINT chk_document_full_or_delta CHECK (
+    (changes IS NULL AND base_revision IS NULL
+        AND file_name IS NOT NULL AND file_size IS NOT NULL AND file_type IS NOT NULL
+        AND user_id IS NOT NULL AND storage_path IS NOT NULL AND checksum IS NOT NULL
+        AND document_type IS NOT NULL)
+    OR (changes IS NOT NULL AND base_revision IS NOT NULL)
+);
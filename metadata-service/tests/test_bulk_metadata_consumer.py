@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from pathlib import Path
+from uuid import uuid4
+
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from app.services.bulk_metadata_consumer import (
+    BulkJobTracker,
+    decode_bulk_message,
+    document_id_for_record,
+    ingest_bulk_batch,
+)
+from app.services.document_repository import InMemoryDocumentRepository
+from app.services.document_service import DocumentService
+
+
+def _bulk_record(record_id: str) -> dict:
+    return {
+        "record_id": record_id,
+        "source": {"job_id": "job-1", "batch_id": 1, "row_num": 2},
+        "asset": {
+            "file_name": "manual.pdf",
+            "file_size": 1024,
+            "file_type": "application/pdf",
+            "version": 1,
+            "checksum": "abc123",
+            "storage_path": "/documents/manual.pdf",
+            "thumbnail_path": None,
+            "expiration_date": None,
+        },
+        "ownership": {"uploader_user_id": str(uuid4()), "acl": {"read": [], "write": []}},
+        "metadata": {"tags": ["manual"], "description": "Manual", "document_type": "Manual"},
+    }
+
+
+def test_ingest_bulk_batch_is_idempotent_and_tracks_progress():
+    service = DocumentService(InMemoryDocumentRepository())
+    tracker = BulkJobTracker(max_jobs=10, max_errors=10)
+    invalid = _bulk_record("record-3")
+    invalid["ownership"]["uploader_user_id"] = "user-001"
+    payload = {
+        "job_id": "job-1",
+        "batch_id": 1,
+        "total_batches": 2,
+        "records": [_bulk_record("record-1"), _bulk_record("record-2"), invalid],
+    }
+
+    assert ingest_bulk_batch(service, payload, tracker) == {"created": 2, "skipped": 0, "failed": 1}
+    stored = service.get_latest_document(document_id_for_record("record-1"))
+    assert stored["revision"] == 1
+    assert tracker.get("job-1")["status"] == "in_progress"
+
+    # A redelivered batch leaves the stored documents alone and replaces its counts.
+    assert ingest_bulk_batch(service, payload, tracker) == {"created": 0, "skipped": 2, "failed": 1}
+    assert len(service.list_document_history(document_id_for_record("record-1"))) == 1
+
+    ingest_bulk_batch(service, {**payload, "batch_id": 2, "records": [_bulk_record("record-4")]}, tracker)
+    progress = tracker.get("job-1")
+    assert progress["status"] == "completed_with_errors"
+    assert (progress["created"], progress["skipped"], progress["failed"]) == (1, 2, 1)
+    assert progress["errors"] == [
+        {"record_id": "record-3", "row_num": 2, "error": "badly formed hexadecimal UUID string"}
+    ]
+
+
+def test_decode_bulk_message_drops_payloads_that_cannot_be_ingested():
+    assert decode_bulk_message(b'{"job_id": "job-1", "records": []}') == {"job_id": "job-1", "records": []}
+    assert decode_bulk_message(b"not json") is None
+    assert decode_bulk_message(b'["job-1"]') is None
+    assert decode_bulk_message(b'"job-1"') is None
+    assert decode_bulk_message(b'{"records": {"record_id": "r1"}}') is None
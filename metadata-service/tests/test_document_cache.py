@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from uuid import uuid4
+
+import sys
+import threading
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from app.services import document_cache
+from app.services.document_cache import (
+    CacheInvalidationBus,
+    CachedDocumentRepository,
+    InMemoryCacheTier,
+    LatestDocumentCache,
+)
+from app.services.document_record import DocumentRecord
+from app.services.document_repository import InMemoryDocumentRepository
+from app.services.document_service import DocumentService
+
+
+def _sample_metadata() -> dict:
+    now = datetime.now(timezone.utc)
+    return {
+        "document_id": uuid4(),
+        "file_name": "manual.pdf",
+        "file_size": 1024,
+        "file_type": "application/pdf",
+        "upload_date": now,
+        "last_modified_date": now,
+        "user_id": uuid4(),
+        "tags": ["manual"],
+        "storage_path": "/tmp/manual.pdf",
+        "version": 1,
+        "checksum": "abc123",
+        "acl": {"read": ["team"]},
+        "document_type": "Document",
+    }
+
+
+def test_latest_document_is_cached_and_invalidated_on_write():
+    cache = LatestDocumentCache(max_entries=10, ttl=60)
+    invalidated = []
+    service = DocumentService(CachedDocumentRepository(InMemoryDocumentRepository(), cache, invalidated.extend))
+    created = service.create_document(_sample_metadata())
+    document_id = created["document_id"]
+
+    service.get_latest_document(document_id)
+    service.get_latest_document(document_id)
+    assert cache.stats()["hits"] == 1
+
+    service.update_document(document_id, {"description": "Updated"})
+    assert service.get_latest_document(document_id)["description"] == "Updated"
+    assert invalidated == [document_id, document_id]
+
+    service.soft_delete_document(document_id)
+    assert service.get_latest_document(document_id, include_deleted=True)["is_deleted"] is True
+
+
+def test_load_overlapping_an_invalidation_is_not_cached():
+    cache = LatestDocumentCache(max_entries=10, ttl=60)
+    document_id = uuid4()
+
+    def stale_loader():
+        # A writer commits and invalidates while this read is in flight
+        cache.invalidate([document_id])
+        return {"document_id": document_id, "revision": 1}
+
+    assert cache.get_or_load(document_id, stale_loader)["revision"] == 1
+    assert cache.get_or_load(document_id, lambda: {"document_id": document_id, "revision": 2})["revision"] == 2
+
+
+def test_shared_tier_serves_other_replicas():
+    shared = InMemoryCacheTier()
+    first = LatestDocumentCache(max_entries=10, ttl=60, shared=shared)
+    second = LatestDocumentCache(max_entries=10, ttl=60, shared=shared)
+    record = {"document_id": uuid4(), "revision": 3, "upload_date": datetime.now(timezone.utc), "acl": {"read": []}}
+
+    first.get_or_load(record["document_id"], lambda: record)
+    assert second.get_or_load(record["document_id"], lambda: None) == DocumentRecord(record)
+    assert second.stats()["shared_hits"] == 1
+
+    first.invalidate([record["document_id"]])
+    assert second.get_or_load(record["document_id"], lambda: None) == DocumentRecord(record)  # still in its local tier
+    second.invalidate([record["document_id"]], shared=False)
+    assert second.get_or_load(record["document_id"], lambda: None) is None
+
+
+def test_slow_reader_cannot_put_back_a_replaced_revision_in_the_shared_tier():
+    shared = InMemoryCacheTier()
+    reader = LatestDocumentCache(max_entries=10, ttl=60, shared=shared)
+    writer = LatestDocumentCache(max_entries=10, ttl=60, shared=shared)
+    other = LatestDocumentCache(max_entries=10, ttl=60, shared=shared)
+    document_id = uuid4()
+
+    def stale_loader():
+        # Another replica commits revision 4 while revision 3 is being read
+        writer.replace([{"document_id": document_id, "revision": 4}])
+        return {"document_id": document_id, "revision": 3}
+
+    assert reader.get_or_load(document_id, stale_loader)["revision"] == 3
+    assert other.get_or_load(document_id, lambda: None)["revision"] == 4
+    assert shared.set_if_newer("key", 2, b"new", 60)
+    assert not shared.set_if_newer("key", 2, b"same", 60)
+    assert not shared.set_if_newer("key", 1, b"old", 60)
+    assert shared.get("key") == b"new"
+
+
+def test_invalidation_batch_is_republished_after_a_failed_publish(monkeypatch):
+    published = []
+    delivered = threading.Event()
+
+    class FakeChannel:
+        def __init__(self, fail):
+            self.fail = fail
+
+        def exchange_declare(self, exchange, exchange_type):
+            pass
+
+        def basic_publish(self, exchange, routing_key, body):
+            if self.fail:
+                raise ConnectionError("connection lost")
+            published.append(body)
+            delivered.set()
+
+    failures = iter([True, False])
+
+    def connect():
+        fail = next(failures)
+        return SimpleNamespace(channel=lambda: FakeChannel(fail))
+
+    monkeypatch.setattr(document_cache, "get_rabbitmq_connection", connect)
+    monkeypatch.setattr(document_cache.time, "sleep", lambda seconds: None)
+    bus = CacheInvalidationBus("invalidations", LatestDocumentCache(max_entries=10, ttl=60))
+    document_id = uuid4()
+    bus.publish([document_id])
+
+    threading.Thread(target=bus._run_publisher, daemon=True).start()
+    assert delivered.wait(1)
+    assert [json.loads(body)["document_ids"] for body in published] == [[str(document_id)]]
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 from uuid import uuid4
@@ -99,3 +100,106 @@ def test_soft_delete_document_generates_new_revision():
 
     history = service.list_document_history(created["document_id"])
     assert [item["revision"] for item in history] == [2, 1]
+
+
+def test_concurrent_updates_receive_distinct_revisions():
+    service = _service()
+    created = service.create_document(_sample_metadata())
+
+    def update(index: int) -> int:
+        return service.update_document(created["document_id"], {"description": f"Edit {index}"})["revision"]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        revisions = list(executor.map(update, range(40)))
+
+    assert sorted(revisions) == list(range(2, 42))
+    history = service.list_document_history(created["document_id"])
+    assert [item["revision"] for item in history] == list(range(41, 0, -1))
+
+
+def test_update_document_rejects_soft_deleted_document():
+    service = _service()
+    created = service.create_document(_sample_metadata())
+    service.soft_delete_document(created["document_id"])
+
+    with pytest.raises(DocumentNotFoundError):
+        service.update_document(created["document_id"], {"description": "Updated"})
+
+
+def test_create_documents_reports_outcome_per_record():
+    service = _service()
+    shared = _sample_metadata()
+    invalid = _sample_metadata()
+    invalid["checksum"] = None
+
+    outcomes = service.create_documents([shared, invalid, _sample_metadata(), shared])
+
+    assert [outcome["status"] for outcome in outcomes] == ["created", "failed", "created", "created"]
+    assert "checksum" in outcomes[1]["error"]
+    assert outcomes[0]["record"]["revision"] == 1
+    assert outcomes[3]["record"]["revision"] == 2
+    assert service.get_latest_document(shared["document_id"])["revision"] == 2
+
+
+def test_list_documents_pages_current_documents_with_filters():
+    service = _service()
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    created = []
+    for index in range(5):
+        metadata = _sample_metadata()
+        metadata["upload_date"] = base.replace(day=index + 1)
+        metadata["category"] = "Guides" if index % 2 == 0 else "Reports"
+        created.append(service.create_document(metadata))
+    service.update_document(created[4]["document_id"], {"tags": ["initial", "featured"]})
+    service.soft_delete_document(created[2]["document_id"])
+
+    first, cursor = service.list_documents({"category": "Guides"}, limit=1)
+    assert [item["document_id"] for item in first] == [created[4]["document_id"]]
+    assert first[0]["revision"] == 2
+    assert cursor is not None
+
+    second, cursor = service.list_documents({"category": "Guides"}, limit=1, cursor=cursor)
+    assert [item["document_id"] for item in second] == [created[0]["document_id"]]
+    assert cursor is None
+
+    tagged, _ = service.list_documents({}, tags=["featured"])
+    assert [item["document_id"] for item in tagged] == [created[4]["document_id"]]
+
+    with pytest.raises(ValueError):
+        service.list_documents({}, cursor="not-a-cursor")
+
+
+def test_list_document_history_pages_by_revision():
+    service = _service()
+    created = service.create_document(_sample_metadata())
+    for index in range(4):
+        service.update_document(created["document_id"], {"description": f"Revision {index + 2}"})
+
+    first = service.list_document_history(created["document_id"], limit=2)
+    assert [item["revision"] for item in first] == [5, 4]
+
+    rest = service.list_document_history(created["document_id"], limit=2, before_revision=first[-1]["revision"])
+    assert [item["revision"] for item in rest] == [3, 2]
+    assert rest[0]["description"] == "Revision 3"
+
+    assert len(service.list_document_history(created["document_id"])) == 5
+
+
+def test_records_are_immutable_and_shared_without_copies():
+    service = _service()
+    metadata = _sample_metadata()
+    created = service.create_document(metadata)
+    metadata["tags"].append("mutated")
+    metadata["acl"]["public"] = True
+
+    latest = service.get_latest_document(created["document_id"])
+    assert latest is created
+    assert latest["tags"] == ("initial",)
+    assert latest["acl"]["public"] is False
+    with pytest.raises(TypeError):
+        latest["description"] = "Changed"
+
+    updated = service.update_document(created["document_id"], {"description": "Updated"})
+    assert updated["acl"] is created["acl"]
+    assert latest.to_dict()["tags"] == ["initial"]
+    assert updated.to_dict()["acl"] == {"public": False}
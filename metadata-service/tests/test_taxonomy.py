@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from pathlib import Path
+
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from app.config import CONFIG_DIR, TAXONOMY_FILES, TaxonomyCache
+
+
+def test_taxonomy_cache_reloads_when_a_file_changes(tmp_path: Path):
+    for filename in TAXONOMY_FILES:
+        shutil.copy(CONFIG_DIR / filename, tmp_path / filename)
+    cache = TaxonomyCache(tmp_path, check_interval=0)
+
+    taxonomy = cache.get()
+    assert "Europe" in taxonomy.regions
+    assert "Germany" in taxonomy.countries_by_region["Europe"]
+    assert "de" in taxonomy.languages_by_country["Germany"]
+    assert cache.get() is taxonomy
+
+    path = tmp_path / "categories.json"
+    path.write_text(json.dumps({"categories": ["Datasheets"]}))
+    stat = path.stat()
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+    reloaded = cache.get()
+    assert reloaded is not taxonomy
+    assert reloaded.categories == frozenset({"Datasheets"})
+
+
+def test_taxonomy_cache_keeps_the_previous_snapshot_when_a_file_is_broken(tmp_path: Path):
+    for filename in TAXONOMY_FILES:
+        shutil.copy(CONFIG_DIR / filename, tmp_path / filename)
+    cache = TaxonomyCache(tmp_path, check_interval=0)
+    taxonomy = cache.get()
+
+    path = tmp_path / "categories.json"
+    path.write_text('{"categories": ["Datas')
+    stat = path.stat()
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+    assert cache.get() is taxonomy
+
+    path.unlink()
+    assert cache.get() is taxonomy
+
+    path.write_text(json.dumps({"categories": ["Datasheets"]}))
+    assert cache.get().categories == frozenset({"Datasheets"})
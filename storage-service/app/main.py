@@ -1,18 +1,96 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Header, Response, Body, Request
+from fastapi.responses import JSONResponse, StreamingResponse, FileResponse
+from starlette.requests import ClientDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 from app.services.minio_storage import (
-    upload_file_to_minio, 
-    delete_file_from_minio, 
+    BLOB_SWEEP_INTERVAL_SECONDS,
+    CONFIGURED_BUCKETS,
+    CONTENT_ADDRESSED_STORAGE,
+    create_configured_buckets,
     generate_object_path,
-    get_file_metadata
+    get_file_metadata,
+    sweep_unreferenced_blobs
 )
-from app.services.rabbitmq_utils import send_document_upload_message
+from app.services.storage_backend import AsyncStorageBackend, STORAGE_BACKEND, get_storage_backend
+from app.services.presigned_urls import (
+    presign_upload,
+    presign_download,
+    create_presigned_multipart_upload,
+    complete_presigned_multipart_upload,
+    presigned_url_cache
+)
+from app.services.object_cache import object_cache
+from app.services.admission_control import UploadAdmissionMiddleware, upload_admission
+from app.services.resumable_uploads import (
+    OffsetMismatchError,
+    create_upload_session,
+    get_upload_session,
+    upload_session_part,
+    complete_upload_session,
+    drop_upload_session,
+    abort_upload_session
+)
+from app.services.rabbitmq_utils import (
+    PublishUnconfirmedError,
+    send_document_upload_message,
+    send_document_upload_message_async,
+    upload_event_publisher,
+    confirming_publisher
+)
+from app.utils.s3_utils import parse_range_header, etag_matches
+from email.utils import format_datetime
+import asyncio
 import datetime
-import tempfile
-import os
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Blocking MinIO/S3 calls run on a bounded executor so they never stall the event loop
+storage = AsyncStorageBackend(get_storage_backend())
+
+# Resumable upload sessions currently receiving a chunk on this worker; other
+# workers and instances are not covered (see resumable_uploads.py)
+_active_upload_sessions = set()
+
+async def _sweep_unreferenced_blobs_periodically():
+    """Delete content-addressed blobs whose last reference was released more than the grace period ago"""
+    while True:
+        await asyncio.sleep(BLOB_SWEEP_INTERVAL_SECONDS)
+        for bucket_name in CONFIGURED_BUCKETS:
+            try:
+                deleted = await storage.run(sweep_unreferenced_blobs, bucket_name)
+                if deleted:
+                    logger.info(f"Swept {deleted} unreferenced blobs from {bucket_name}")
+            except Exception as e:
+                logger.warning(f"Blob sweep of {bucket_name} failed: {str(e)}")
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup: create configured buckets so uploads skip the bucket_exists round trip
+    blob_sweeper = None
+    if STORAGE_BACKEND == "minio":
+        try:
+            create_configured_buckets()
+        except Exception as e:
+            logger.warning(f"Could not create configured buckets at startup: {str(e)}")
+        if CONTENT_ADDRESSED_STORAGE:
+            blob_sweeper = asyncio.create_task(_sweep_unreferenced_blobs_periodically())
+    yield
+    if blob_sweeper is not None:
+        blob_sweeper.cancel()
+    # Shutdown: close pooled RabbitMQ connections and the storage executor
+    upload_event_publisher.close()
+    confirming_publisher.close()
+    storage.shutdown()
+
+app = FastAPI(lifespan=lifespan)
+
+# Upload admission control. Middleware added later wraps middleware added
+# earlier, so this must be added before CORS: CORSMiddleware then runs outside
+# it and also sets its headers on the 429 responses of rejected uploads.
+app.add_middleware(UploadAdmissionMiddleware, controller=upload_admission)
 
 # Add CORS middleware
 app.add_middleware(
@@ -23,6 +101,58 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
+def _document_object_path(brand: str, business: str, unit: str, doc_name: str, revision: str, filename: str) -> str:
+    """Build the MinIO object path for a document from its metadata and file name"""
+    file_extension = filename.split('.')[-1] if '.' in filename else ''
+    return generate_object_path(
+        brand=brand,
+        business_unit=f"{business}/{unit}",
+        document_name=doc_name,
+        revision=revision,
+        file_extension=file_extension
+    )
+
+def _invalidate_cached_object(bucket_name: str, object_path: str):
+    """Drop presigned URLs and the disk-cached copy after an object changed or was removed"""
+    presigned_url_cache.invalidate(bucket_name, object_path)
+    if object_cache:
+        object_cache.invalidate(bucket_name, object_path)
+
+def _iter_cached_file(entry, offset: int, length: int, chunk_size: int = 256 * 1024):
+    """Yield a byte range of a cached file, unpinning the cache entry afterwards"""
+    served = 0
+    try:
+        with open(entry.path, "rb") as file_in:
+            file_in.seek(offset)
+            while served < length:
+                chunk = file_in.read(min(chunk_size, length - served))
+                if not chunk:
+                    break
+                served += len(chunk)
+                yield chunk
+    finally:
+        object_cache.release(entry, served)
+
+class _CachedFileResponse(FileResponse):
+    """
+    FileResponse for a pinned cache entry that unpins it however the response ends
+
+    A BackgroundTask would be skipped on client disconnects and cancellation,
+    leaving the entry pinned and unevictable forever.
+    """
+
+    def __init__(self, entry, **kwargs):
+        super().__init__(entry.path, **kwargs)
+        self._entry = entry
+
+    async def __call__(self, scope, receive, send):
+        bytes_served = 0
+        try:
+            await super().__call__(scope, receive, send)
+            bytes_served = self._entry.size
+        finally:
+            object_cache.release(self._entry, bytes_served)
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint for monitoring and load balancing"""
@@ -36,6 +166,17 @@ async def health_check():
         }
     )
 
+@app.get("/metrics")
+async def metrics():
+    """Cache effectiveness and upload admission counters for the storage service"""
+    return JSONResponse(
+        status_code=200,
+        content={
+            "object_cache": object_cache.stats() if object_cache else None,
+            "upload_admission": upload_admission.stats()
+        }
+    )
+
 @app.post("/upload-document")
 async def upload_document(
     file: UploadFile = File(...),
@@ -65,30 +206,14 @@ async def upload_document(
         bucket_name: MinIO bucket name (default: "documents")
     """
     upload_time = datetime.datetime.now()
-    temp_file_path = None
     
     try:
         # Validate required fields
         if not all([brand, business, unit, doc_type, doc_name, doc_date, revision, owner_team]):
             raise HTTPException(status_code=400, detail="All metadata fields are required")
         
-        # Get file extension
-        file_extension = file.filename.split('.')[-1] if '.' in file.filename else ''
-        
         # Generate object path
-        object_path = generate_object_path(
-            brand=brand,
-            business_unit=f"{business}/{unit}",
-            document_name=doc_name,
-            revision=revision,
-            file_extension=file_extension
-        )
-        
-        # Save uploaded file to temporary location
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f".{file_extension}") as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
+        object_path = _document_object_path(brand, business, unit, doc_name, revision, file.filename)
         
         # Prepare metadata
         document_metadata = {
@@ -101,42 +226,509 @@ async def upload_document(
             "revision": revision,
             "owner_team": owner_team,
             "original_filename": file.filename,
-            "file_size": len(content),
             "content_type": file.content_type,
             "upload_timestamp": upload_time.isoformat()
         }
         
-        # Upload to MinIO
-        minio_url = upload_file_to_minio(
-            file_path=temp_file_path,
+        # Stream the upload body to MinIO part by part; size and checksum are
+        # computed in the same pass instead of buffering the whole file
+        upload_result = await storage.upload_stream(
+            stream=file.file,
             bucket_name=bucket_name,
             object_name=object_path,
-            metadata=document_metadata
+            metadata=document_metadata,
+            content_type=file.content_type
         )
+        minio_url = upload_result["minio_url"]
+        document_metadata["file_size"] = upload_result["file_size"]
+        document_metadata["checksum"] = upload_result["checksum"]
+        _invalidate_cached_object(bucket_name, object_path)
         
         # Send RabbitMQ message
-        send_document_upload_message(
+        content = {
+            "message": "Document uploaded successfully",
+            "minio_url": minio_url,
+            "object_path": object_path,
+            "metadata": document_metadata
+        }
+        try:
+            await send_document_upload_message_async(
+                document_metadata=document_metadata,
+                file_path=object_path,
+                upload_time=upload_time
+            )
+        except PublishUnconfirmedError:
+            # The document is stored and its event may still be delivered
+            content["message"] = "Document uploaded; the upload event is not confirmed yet"
+            content["event_status"] = "unconfirmed"
+            return JSONResponse(status_code=202, content=content)
+        
+        return JSONResponse(status_code=200, content=content)
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        await file.close()
+
+def _upload_session_state(session: dict) -> dict:
+    return {
+        "session_id": session["session_id"],
+        "object_path": session["object_name"],
+        "offset": session["offset"],
+        "total_size": session["total_size"],
+        "part_size": session["part_size"]
+    }
+
+def _require_minio_backend(feature: str):
+    # Resumable sessions and presigned URLs talk to MinIO directly, so they
+    # would read and write a different store than the configured backend
+    if STORAGE_BACKEND != "minio":
+        raise HTTPException(
+            status_code=501,
+            detail=f"{feature} are not supported with the {STORAGE_BACKEND} storage backend"
+        )
+
+def _require_direct_object_writes(feature: str):
+    _require_minio_backend(feature)
+    # These uploads write the final object straight to its path, which would
+    # replace a content-addressed reference without releasing its blob
+    if CONTENT_ADDRESSED_STORAGE:
+        raise HTTPException(
+            status_code=501,
+            detail=f"{feature} are not supported with content-addressed storage"
+        )
+
+async def _load_upload_session(bucket_name: str, session_id: str) -> dict:
+    _require_direct_object_writes("Resumable uploads")
+    try:
+        return await storage.run(get_upload_session, bucket_name, session_id)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/uploads")
+async def create_resumable_upload(
+    brand: str = Form(...),
+    business: str = Form(...),
+    unit: str = Form(...),
+    doc_type: str = Form(...),
+    doc_name: str = Form(...),
+    doc_date: str = Form(...),
+    revision: str = Form(...),
+    owner_team: str = Form(...),
+    file_name: str = Form(...),
+    total_size: int = Form(...),
+    content_type: str = Form(default="application/octet-stream"),
+    bucket_name: str = Form(default="documents")
+):
+    """
+    Start a resumable upload session
+    
+    The client then PUTs the file in chunks to /uploads/{session_id}, can ask
+    for the committed offset after a dropped connection, and finalizes with
+    /uploads/{session_id}/complete. Chunks are committed in units of
+    part_size; bytes past the last whole part of a chunk are discarded unless
+    they end the file, so clients resume from the returned offset.
+    
+    Args:
+        brand, business, unit, doc_type, doc_name, doc_date, revision, owner_team:
+            Document metadata, as for /upload-document
+        file_name: Original file name
+        total_size: Size of the whole file in bytes
+        content_type: Content type of the document
+        bucket_name: MinIO bucket name (default: "documents")
+    """
+    _require_direct_object_writes("Resumable uploads")
+    object_path = _document_object_path(brand, business, unit, doc_name, revision, file_name)
+    document_metadata = {
+        "brand": brand,
+        "business": business,
+        "unit": unit,
+        "doc_type": doc_type,
+        "doc_name": doc_name,
+        "doc_date": doc_date,
+        "revision": revision,
+        "owner_team": owner_team,
+        "original_filename": file_name,
+        "content_type": content_type
+    }
+    try:
+        session = await storage.run(
+            create_upload_session, bucket_name, object_path, total_size, content_type, document_metadata
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return JSONResponse(status_code=201, content=_upload_session_state(session))
+
+@app.get("/uploads/{session_id}")
+async def get_resumable_upload(session_id: str, bucket_name: str = "documents"):
+    """Return the committed offset of a resumable upload"""
+    session = await _load_upload_session(bucket_name, session_id)
+    return JSONResponse(status_code=200, content=_upload_session_state(session))
+
+@app.put("/uploads/{session_id}")
+async def upload_resumable_chunk(session_id: str, offset: int, request: Request, bucket_name: str = "documents"):
+    """
+    Append a chunk to a resumable upload
+    
+    Whole parts are committed as they arrive, so a connection dropped mid-chunk
+    keeps everything up to the last complete part. Concurrent chunks for one
+    session are rejected within a worker only: clients must send one chunk at a
+    time, and deployments with several instances should route a session's
+    requests to the same one.
+    
+    Args:
+        session_id: Session id returned by POST /uploads
+        offset: Byte offset of the first byte in the request body; must equal the committed offset
+        bucket_name: MinIO bucket name (default: "documents")
+    """
+    if session_id in _active_upload_sessions:
+        raise HTTPException(status_code=409, detail="A chunk is already being uploaded for this session")
+    _active_upload_sessions.add(session_id)
+    try:
+        session = await _load_upload_session(bucket_name, session_id)
+        if offset != session["offset"]:
+            return JSONResponse(status_code=409, content=_upload_session_state(session))
+        
+        part_size = session["part_size"]
+        buffer = bytearray()
+        try:
+            async for data in request.stream():
+                buffer += data
+                while len(buffer) >= part_size:
+                    part = bytes(buffer[:part_size])
+                    del buffer[:part_size]
+                    await storage.run(upload_session_part, session, session["offset"], part)
+            if buffer and session["offset"] + len(buffer) == session["total_size"]:
+                await storage.run(upload_session_part, session, session["offset"], bytes(buffer))
+        except ClientDisconnect:
+            logger.info(f"Client disconnected from upload session {session_id} at offset {session['offset']}")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        return JSONResponse(status_code=200, content=_upload_session_state(session))
+    finally:
+        _active_upload_sessions.discard(session_id)
+
+@app.post("/uploads/{session_id}/complete")
+async def complete_resumable_upload(
+    session_id: str,
+    checksum: str = Form(default=""),
+    bucket_name: str = Form(default="documents")
+):
+    """
+    Finalize a resumable upload and send the RabbitMQ message
+    
+    The session is only dropped once the event was published, so a request
+    that fails while publishing can be retried and sends the event again.
+    
+    Args:
+        session_id: Session id returned by POST /uploads
+        checksum: Optional SHA-256 computed by the client
+        bucket_name: MinIO bucket name (default: "documents")
+    """
+    upload_time = datetime.datetime.now()
+    session = await _load_upload_session(bucket_name, session_id)
+    try:
+        await storage.run(complete_upload_session, session)
+    except OffsetMismatchError as e:
+        raise HTTPException(status_code=409, detail=f"Upload is incomplete: {str(e)} of {session['total_size']}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    object_path = session["object_name"]
+    _invalidate_cached_object(bucket_name, object_path)
+    document_metadata = {
+        **session["metadata"],
+        "upload_timestamp": upload_time.isoformat(),
+        "file_size": session["total_size"],
+        "checksum": checksum
+    }
+    content = {
+        "message": "Document uploaded successfully",
+        "object_path": object_path,
+        "metadata": document_metadata
+    }
+    status_code = 200
+    try:
+        await send_document_upload_message_async(
             document_metadata=document_metadata,
             file_path=object_path,
             upload_time=upload_time
         )
+    except PublishUnconfirmedError:
+        # The event may still be delivered, so a retry could publish it twice
+        content["message"] = "Document uploaded; the upload event is not confirmed yet"
+        content["event_status"] = "unconfirmed"
+        status_code = 202
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    try:
+        await storage.run(drop_upload_session, session)
+    except Exception as e:
+        # The event is out; a leftover session only allows a redundant retry
+        logger.warning(f"Could not drop upload session {session_id}: {str(e)}")
+    
+    return JSONResponse(status_code=status_code, content=content)
+
+@app.delete("/uploads/{session_id}")
+async def abort_resumable_upload(session_id: str, bucket_name: str = "documents"):
+    """Abort a resumable upload and discard its uploaded parts"""
+    session = await _load_upload_session(bucket_name, session_id)
+    if session.get("etag"):
+        raise HTTPException(status_code=409, detail="Upload is already complete")
+    try:
+        await storage.run(abort_upload_session, session)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return JSONResponse(status_code=200, content={"message": "Upload session aborted"})
+
+@app.post("/presigned-uploads")
+def create_presigned_upload(
+    brand: str = Form(...),
+    business: str = Form(...),
+    unit: str = Form(...),
+    doc_name: str = Form(...),
+    revision: str = Form(...),
+    file_name: str = Form(...),
+    content_type: str = Form(default="application/octet-stream"),
+    part_count: int = Form(default=1),
+    bucket_name: str = Form(default="documents")
+):
+    """
+    Issue presigned URLs so a client can upload a document directly to MinIO
+    
+    With part_count > 1 a multipart upload is started and one URL is returned per
+    part; the client then calls /presigned-uploads/complete with the part ETags.
+    
+    Args:
+        brand: Brand name (e.g., "acme")
+        business: Business name (e.g., "retail")
+        unit: Business unit (e.g., "supply-chain")
+        doc_name: Document name (e.g., "inventory-api")
+        revision: Revision number (e.g., "3")
+        file_name: Original file name, used for the extension
+        content_type: Content type of the document
+        part_count: Number of parts for a multipart upload (default: 1)
+        bucket_name: MinIO bucket name (default: "documents")
+    """
+    _require_direct_object_writes("Presigned uploads")
+    try:
+        object_path = _document_object_path(brand, business, unit, doc_name, revision, file_name)
+        if part_count > 1:
+            upload = create_presigned_multipart_upload(bucket_name, object_path, part_count, content_type)
+            return JSONResponse(status_code=200, content={"object_path": object_path, **upload})
+        upload = presign_upload(bucket_name, object_path)
+        return JSONResponse(status_code=200, content={"object_path": object_path, **upload})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/presigned-uploads/complete")
+def complete_presigned_upload(
+    brand: str = Form(...),
+    business: str = Form(...),
+    unit: str = Form(...),
+    doc_type: str = Form(...),
+    doc_name: str = Form(...),
+    doc_date: str = Form(...),
+    revision: str = Form(...),
+    owner_team: str = Form(...),
+    file_name: str = Form(...),
+    content_type: str = Form(default="application/octet-stream"),
+    checksum: str = Form(default=""),
+    upload_id: str = Form(default=None),
+    parts: str = Form(default=None),
+    bucket_name: str = Form(default="documents")
+):
+    """
+    Record a document uploaded through presigned URLs and send the RabbitMQ message
+    
+    Args:
+        brand, business, unit, doc_type, doc_name, doc_date, revision, owner_team:
+            Document metadata, as for /upload-document
+        file_name: Original file name
+        content_type: Content type of the document
+        checksum: Optional SHA-256 computed by the client (the bytes never pass through this service)
+        upload_id: Multipart upload id, when the upload used part URLs
+        parts: JSON list of {"part_number": int, "etag": str} for a multipart upload
+        bucket_name: MinIO bucket name (default: "documents")
+    """
+    _require_direct_object_writes("Presigned uploads")
+    upload_time = datetime.datetime.now()
+    try:
+        object_path = _document_object_path(brand, business, unit, doc_name, revision, file_name)
+        if upload_id:
+            complete_presigned_multipart_upload(bucket_name, object_path, upload_id, json.loads(parts or "[]"))
+        _invalidate_cached_object(bucket_name, object_path)
+        
+        info = storage.backend.get_object_info(bucket_name, object_path)
+        document_metadata = {
+            "brand": brand,
+            "business": business,
+            "unit": unit,
+            "doc_type": doc_type,
+            "doc_name": doc_name,
+            "doc_date": doc_date,
+            "revision": revision,
+            "owner_team": owner_team,
+            "original_filename": file_name,
+            "content_type": content_type,
+            "upload_timestamp": upload_time.isoformat(),
+            "file_size": info["size"],
+            "checksum": checksum
+        }
+        
+        content = {
+            "message": "Document upload recorded successfully",
+            "object_path": object_path,
+            "metadata": document_metadata
+        }
+        try:
+            send_document_upload_message(
+                document_metadata=document_metadata,
+                file_path=object_path,
+                upload_time=upload_time
+            )
+        except PublishUnconfirmedError:
+            # The document is stored and its event may still be delivered
+            content["message"] = "Document upload recorded; the upload event is not confirmed yet"
+            content["event_status"] = "unconfirmed"
+            return JSONResponse(status_code=202, content=content)
         
+        return JSONResponse(status_code=200, content=content)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/presigned-downloads/{object_path:path}")
+def create_presigned_download(object_path: str, bucket_name: str = "documents"):
+    """
+    Issue a presigned GET URL so a client can read a document directly from MinIO
+    
+    Args:
+        object_path: Object path in MinIO
+        bucket_name: MinIO bucket name (default: "documents")
+    """
+    _require_minio_backend("Presigned downloads")
+    try:
         return JSONResponse(
             status_code=200,
-            content={
-                "message": "Document uploaded successfully",
-                "minio_url": minio_url,
-                "object_path": object_path,
-                "metadata": document_metadata
-            }
+            content=presign_download(bucket_name, object_path, storage.backend.get_object_info)
         )
-        
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        # Clean up temporary file
-        if temp_file_path and os.path.exists(temp_file_path):
-            os.unlink(temp_file_path)
+
+@app.get("/documents/{object_path:path}")
+async def download_document(
+    object_path: str,
+    bucket_name: str = "documents",
+    range_header: str = Header(default=None, alias="Range"),
+    if_none_match: str = Header(default=None),
+    if_range: str = Header(default=None)
+):
+    """
+    Stream a document from MinIO with HTTP Range and conditional request support
+    
+    Args:
+        object_path: Object path in MinIO
+        bucket_name: MinIO bucket name (default: "documents")
+        range_header: Optional single byte range, e.g. "bytes=0-65535"
+        if_none_match: Optional ETag(s); a match returns 304 Not Modified
+        if_range: Optional ETag; the Range is only honoured if it still matches
+    """
+    try:
+        info = await storage.get_object_info(bucket_name, object_path)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    etag = f'"{info["etag"]}"'
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Last-Modified": format_datetime(info["last_modified"], usegmt=True)
+    }
+    
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    
+    size = info["size"]
+    byte_range = None
+    if range_header and (not if_range or if_range == etag):
+        try:
+            byte_range = parse_range_header(range_header, size)
+        except ValueError:
+            headers["Content-Range"] = f"bytes */{size}"
+            return Response(status_code=416, headers=headers)
+    
+    entry = None
+    if object_cache and object_cache.cacheable(size):
+        entry = object_cache.get(bucket_name, object_path, etag)
+        if entry is None and not range_header:
+            # Read-through: stream from the object store and write the cache copy
+            # on the way, so the first byte is not delayed by the fill
+            headers["Content-Length"] = str(size)
+            return StreamingResponse(
+                storage.iterate(object_cache.iter_fill(
+                    bucket_name,
+                    object_path,
+                    etag,
+                    storage.backend.iter_object_chunks(bucket_name, info["object_name"], chunk_size=256 * 1024, codec=info["codec"])
+                )),
+                status_code=200,
+                media_type=info["content_type"],
+                headers=headers
+            )
+    
+    if byte_range:
+        start, end = byte_range
+        length = end - start + 1
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(length)
+        if entry:
+            return StreamingResponse(
+                _iter_cached_file(entry, start, length),
+                status_code=206,
+                media_type=info["content_type"],
+                headers=headers
+            )
+        return StreamingResponse(
+            storage.iter_object_chunks(bucket_name, info["object_name"], offset=start, length=length, codec=info["codec"]),
+            status_code=206,
+            media_type=info["content_type"],
+            headers=headers
+        )
+    
+    if entry:
+        if range_header:
+            # An ignored Range must not be re-interpreted by FileResponse
+            headers["Content-Length"] = str(size)
+            return StreamingResponse(
+                _iter_cached_file(entry, 0, size),
+                status_code=200,
+                media_type=info["content_type"],
+                headers=headers
+            )
+        return _CachedFileResponse(entry, media_type=info["content_type"], headers=headers)
+    
+    headers["Content-Length"] = str(size)
+    return StreamingResponse(
+        storage.iter_object_chunks(bucket_name, info["object_name"], codec=info["codec"]),
+        status_code=200,
+        media_type=info["content_type"],
+        headers=headers
+    )
 
 @app.delete("/delete-document")
 async def delete_document(bucket_name: str, object_path: str):
@@ -148,10 +740,69 @@ async def delete_document(bucket_name: str, object_path: str):
         object_path: Object path in MinIO
     """
     try:
-        delete_file_from_minio(bucket_name, object_path)
+        await storage.delete(bucket_name, object_path)
+        _invalidate_cached_object(bucket_name, object_path)
         return JSONResponse(
             status_code=200,
             content={"message": "Document deleted successfully"}
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/bulk-delete")
+async def bulk_delete_documents(
+    bucket_name: str = Body(default="documents"),
+    object_paths: list[str] = Body(default=None),
+    prefix: str = Body(default=None),
+    stream: bool = False
+):
+    """
+    Delete many documents, either by explicit path or by prefix
+
+    Objects are removed with multi-object delete requests of up to 1000 keys.
+    With stream=true the response is NDJSON: one line per batch with its
+    results and running totals, then a final summary line, so cleanups of very
+    large prefixes report progress as they go.
+    
+    Args:
+        bucket_name: MinIO bucket name (default: "documents")
+        object_paths: Object paths to delete
+        prefix: Delete every object under this prefix instead, e.g. "acme/retail/"
+        stream: Stream per-batch progress as NDJSON instead of a single JSON response
+    """
+    if (object_paths is None) == (prefix is None):
+        raise HTTPException(status_code=400, detail="Provide either object_paths or prefix")
+    if prefix is not None and not prefix.strip("/"):
+        raise HTTPException(status_code=400, detail="Refusing to delete an entire bucket")
+
+    async def delete_batches():
+        async for batch in storage.iter_bulk_delete(bucket_name, object_paths, prefix):
+            for object_path in batch["deleted"]:
+                _invalidate_cached_object(bucket_name, object_path)
+            yield batch
+
+    if stream:
+        async def progress():
+            deleted = failed = 0
+            try:
+                async for batch in delete_batches():
+                    deleted += len(batch["deleted"])
+                    failed += len(batch["errors"])
+                    yield json.dumps({**batch, "total_deleted": deleted, "total_failed": failed}) + "\n"
+                yield json.dumps({"done": True, "total_deleted": deleted, "total_failed": failed}) + "\n"
+            except Exception as e:
+                yield json.dumps({"done": False, "error": str(e), "total_deleted": deleted, "total_failed": failed}) + "\n"
+        return StreamingResponse(progress(), media_type="application/x-ndjson")
+
+    deleted, errors = [], []
+    try:
+        async for batch in delete_batches():
+            deleted.extend(batch["deleted"])
+            errors.extend(batch["errors"])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return JSONResponse(
+        status_code=200 if not errors else 207,
+        content={"deleted": deleted, "errors": errors}
+    )
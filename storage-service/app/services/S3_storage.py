@@ -1,7 +1,9 @@
 import boto3
 import os
-from botocore.exceptions import NoCredentialsError
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import ClientError, NoCredentialsError
 from dotenv import load_dotenv
+from app.utils.s3_utils import HashingReader, iter_batches
 
 load_dotenv()
 
@@ -9,21 +11,123 @@ s3_client = boto3.client(
     's3',
     aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
     aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-    region_name=os.getenv("AWS_DEFAULT_REGION")
+    region_name=os.getenv("AWS_DEFAULT_REGION"),
+    endpoint_url=os.getenv("S3_ENDPOINT_URL")
 )
 
-def upload_file_to_s3(file_path: str, bucket_name: str, s3_key: str) -> str:
+# Multipart settings mirror the MinIO upload engine
+transfer_config = TransferConfig(
+    multipart_threshold=int(os.getenv("S3_PART_SIZE", str(16 * 1024 * 1024))),
+    multipart_chunksize=int(os.getenv("S3_PART_SIZE", str(16 * 1024 * 1024))),
+    max_concurrency=int(os.getenv("S3_UPLOAD_CONCURRENCY", "4"))
+)
+
+def _object_url(bucket_name: str, s3_key: str) -> str:
+    return f"https://{bucket_name}.s3.amazonaws.com/{s3_key}"
+
+def upload_file_to_s3(file_path: str, bucket_name: str, s3_key: str, metadata: dict = None) -> str:
     try:
-        s3_client.upload_file(file_path, bucket_name, s3_key)
-        return f"https://{bucket_name}.s3.amazonaws.com/{s3_key}"
+        extra_args = {"Metadata": {key: str(value) for key, value in (metadata or {}).items()}}
+        s3_client.upload_file(file_path, bucket_name, s3_key, ExtraArgs=extra_args, Config=transfer_config)
+        return _object_url(bucket_name, s3_key)
     except NoCredentialsError:
         raise Exception("AWS credentials not found")
     except Exception as e:
         raise Exception(f"Failed to upload file to S3: {str(e)}")
 
+def upload_stream_to_s3(stream, bucket_name: str, s3_key: str, metadata: dict = None, content_type: str = None) -> dict:
+    try:
+        extra_args = {"Metadata": {key: str(value) for key, value in (metadata or {}).items()}}
+        if content_type:
+            extra_args["ContentType"] = content_type
+        reader = HashingReader(stream)
+        s3_client.upload_fileobj(reader, bucket_name, s3_key, ExtraArgs=extra_args, Config=transfer_config)
+        return {
+            "minio_url": _object_url(bucket_name, s3_key),
+            "file_size": reader.size,
+            "checksum": reader.hexdigest()
+        }
+    except NoCredentialsError:
+        raise Exception("AWS credentials not found")
+    except Exception as e:
+        raise Exception(f"Failed to upload stream to S3: {str(e)}")
+
 def delete_file_from_s3(bucket_name: str, s3_key: str) -> bool:
     try:
         s3_client.delete_object(Bucket=bucket_name, Key=s3_key)
         return True
     except Exception as e:
-        raise Exception(f"Failed to delete file from S3: {str(e)}")
\ No newline at end of file
+        raise Exception(f"Failed to delete file from S3: {str(e)}")
+
+def iter_s3_bulk_delete(bucket_name: str, s3_keys: list = None, prefix: str = None, batch_size: int = 1000):
+    if (s3_keys is None) == (prefix is None):
+        raise ValueError("Provide either object_names or prefix")
+    if prefix is not None:
+        pages = s3_client.get_paginator("list_objects_v2").paginate(Bucket=bucket_name, Prefix=prefix)
+        s3_keys = (item["Key"] for page in pages for item in page.get("Contents", []))
+    try:
+        for batch in iter_batches(s3_keys, min(batch_size, 1000)):
+            response = s3_client.delete_objects(
+                Bucket=bucket_name,
+                Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True}
+            )
+            errors = {error["Key"]: error for error in response.get("Errors", [])}
+            yield {
+                "deleted": [key for key in batch if key not in errors],
+                "errors": [
+                    {"object_name": key, "code": error.get("Code"), "message": error.get("Message")}
+                    for key, error in errors.items()
+                ]
+            }
+    except ClientError as e:
+        raise Exception(f"Failed to bulk delete from S3: {str(e)}")
+
+def get_s3_object_info(bucket_name: str, s3_key: str) -> dict:
+    try:
+        head = s3_client.head_object(Bucket=bucket_name, Key=s3_key)
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            raise FileNotFoundError(f"Object {s3_key} not found in {bucket_name}")
+        raise Exception(f"Failed to stat object in S3: {str(e)}")
+    return {
+        "object_name": s3_key,
+        "size": head["ContentLength"],
+        "etag": head["ETag"].strip('"'),
+        "content_type": head.get("ContentType") or "application/octet-stream",
+        "last_modified": head["LastModified"],
+        "codec": None
+    }
+
+def iter_s3_object_chunks(bucket_name: str, s3_key: str, offset: int = 0, length: int = 0, chunk_size: int = 64 * 1024, codec: str = None):
+    # Objects written through S3 are never compressed, so codec is always None
+    request = {"Bucket": bucket_name, "Key": s3_key}
+    if offset or length:
+        end = str(offset + length - 1) if length else ""
+        request["Range"] = f"bytes={offset}-{end}"
+    body = s3_client.get_object(**request)["Body"]
+    try:
+        for chunk in body.iter_chunks(chunk_size):
+            yield chunk
+    finally:
+        body.close()
+
+class S3StorageBackend:
+    """StorageBackend implementation backed by the module-level boto3 client"""
+
+    def upload_stream(self, stream, bucket_name: str, object_name: str, metadata: dict = None, content_type: str = None) -> dict:
+        return upload_stream_to_s3(stream, bucket_name, object_name, metadata, content_type)
+
+    def upload_file(self, file_path: str, bucket_name: str, object_name: str, metadata: dict = None) -> str:
+        return upload_file_to_s3(file_path, bucket_name, object_name, metadata)
+
+    def delete(self, bucket_name: str, object_name: str) -> bool:
+        return delete_file_from_s3(bucket_name, object_name)
+
+    def iter_bulk_delete(self, bucket_name: str, object_names: list = None, prefix: str = None):
+        return iter_s3_bulk_delete(bucket_name, object_names, prefix)
+
+    def get_object_info(self, bucket_name: str, object_name: str) -> dict:
+        return get_s3_object_info(bucket_name, object_name)
+
+    def iter_object_chunks(self, bucket_name: str, object_name: str, offset: int = 0, length: int = 0, chunk_size: int = 64 * 1024, codec: str = None):
+        return iter_s3_object_chunks(bucket_name, object_name, offset, length, chunk_size, codec)
@@ -0,0 +1,199 @@
+import os
+import asyncio
+import logging
+from collections import deque
+from fastapi.responses import JSONResponse
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Budgets for upload request bodies being received at the same time per worker.
+# Requests over budget wait in a FIFO queue; when the queue is full or the wait
+# times out they get 429 with Retry-After.
+UPLOAD_MAX_CONCURRENT = int(os.getenv("UPLOAD_MAX_CONCURRENT", "16"))
+UPLOAD_MAX_INFLIGHT_BYTES = int(os.getenv("UPLOAD_MAX_INFLIGHT_BYTES", str(1024 * 1024 * 1024)))
+UPLOAD_QUEUE_MAX_LENGTH = int(os.getenv("UPLOAD_QUEUE_MAX_LENGTH", "64"))
+UPLOAD_QUEUE_TIMEOUT_SECONDS = float(os.getenv("UPLOAD_QUEUE_TIMEOUT_SECONDS", "30"))
+UPLOAD_RETRY_AFTER_SECONDS = int(os.getenv("UPLOAD_RETRY_AFTER_SECONDS", "5"))
+# Charged for requests without a Content-Length (chunked transfer encoding)
+UPLOAD_UNKNOWN_SIZE_BYTES = int(os.getenv("UPLOAD_UNKNOWN_SIZE_BYTES", str(64 * 1024 * 1024)))
+
+# (method, path prefix) of the routes that receive upload bodies
+ADMISSION_CONTROLLED_ROUTES = (
+    ("POST", "/upload-document"),
+    ("PUT", "/uploads/"),
+)
+
+
+class AdmissionRejected(Exception):
+    """Raised when an upload cannot be admitted within the queue limits"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.retry_after = retry_after
+
+
+class UploadAdmissionController:
+    """
+    Admits uploads against a concurrency budget and an in-flight bytes budget
+
+    Waiting requests are served strictly in arrival order, so a large upload
+    at the head of the queue is not starved by smaller ones behind it. A
+    single request larger than the byte budget is charged the whole budget and
+    admitted once nothing else is in flight. All methods must be called from
+    the event loop thread.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_inflight_bytes: int,
+        max_queue_length: int,
+        queue_timeout: float,
+        retry_after: int
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_inflight_bytes = max_inflight_bytes
+        self.max_queue_length = max_queue_length
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._waiters = deque()
+        self.in_flight = 0
+        self.in_flight_bytes = 0
+        self.admitted = 0
+        self.queued = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+
+    def _fits(self, charge: int) -> bool:
+        if self.in_flight >= self.max_concurrent:
+            return False
+        return self.in_flight == 0 or self.in_flight_bytes + charge <= self.max_inflight_bytes
+
+    def _admit(self, charge: int):
+        self.in_flight += 1
+        self.in_flight_bytes += charge
+        self.admitted += 1
+
+    def _grant_waiters(self):
+        while self._waiters:
+            charge, future = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()
+                continue
+            if not self._fits(charge):
+                return
+            self._waiters.popleft()
+            self._admit(charge)
+            future.set_result(None)
+
+    async def acquire(self, size: int) -> int:
+        """
+        Wait for room for an upload of `size` bytes
+
+        Returns:
+            The charge to pass to release() once the upload has finished
+
+        Raises:
+            AdmissionRejected: If the queue is full or the wait timed out
+        """
+        charge = min(max(size, 0), self.max_inflight_bytes)
+        if not self._waiters and self._fits(charge):
+            self._admit(charge)
+            return charge
+        if len(self._waiters) >= self.max_queue_length:
+            self.rejected_queue_full += 1
+            raise AdmissionRejected("Upload queue is full", self.retry_after)
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = (charge, future)
+        self._waiters.append(waiter)
+        self.queued += 1
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+            return charge
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # Admitted just as the wait ended; hand the slot back
+                self.release(charge)
+            else:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                # Leaving the head of the queue may unblock the next waiter
+                self._grant_waiters()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.rejected_timeout += 1
+            raise AdmissionRejected("Timed out waiting for upload capacity", self.retry_after)
+
+    def release(self, charge: int):
+        self.in_flight -= 1
+        self.in_flight_bytes -= charge
+        self._grant_waiters()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "in_flight_bytes": self.in_flight_bytes,
+            "queue_depth": sum(1 for _, future in self._waiters if not future.done()),
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "max_concurrent": self.max_concurrent,
+            "max_inflight_bytes": self.max_inflight_bytes
+        }
+
+
+class UploadAdmissionMiddleware:
+    """
+    ASGI middleware applying an UploadAdmissionController to upload routes
+
+    It runs before FastAPI parses the multipart body, so rejected or queued
+    requests have not yet been spooled to memory or the temp directory.
+    """
+
+    def __init__(self, app, controller: UploadAdmissionController):
+        self.app = app
+        self.controller = controller
+
+    def _applies(self, scope) -> bool:
+        return any(
+            scope["method"] == method and scope["path"].startswith(path)
+            for method, path in ADMISSION_CONTROLLED_ROUTES
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._applies(scope):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        size = int(content_length) if content_length and content_length.isdigit() else UPLOAD_UNKNOWN_SIZE_BYTES
+        try:
+            charge = await self.controller.acquire(size)
+        except AdmissionRejected as e:
+            logger.warning(f"Rejected upload {scope['path']}: {str(e)}")
+            response = JSONResponse(
+                status_code=429,
+                content={"detail": str(e)},
+                headers={"Retry-After": str(e.retry_after)}
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(charge)
+
+
+upload_admission = UploadAdmissionController(
+    max_concurrent=UPLOAD_MAX_CONCURRENT,
+    max_inflight_bytes=UPLOAD_MAX_INFLIGHT_BYTES,
+    max_queue_length=UPLOAD_QUEUE_MAX_LENGTH,
+    queue_timeout=UPLOAD_QUEUE_TIMEOUT_SECONDS,
+    retry_after=UPLOAD_RETRY_AFTER_SECONDS
+)
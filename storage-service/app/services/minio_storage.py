@@ -1,29 +1,478 @@
 import os
+import io
+import time
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import certifi
+import urllib3
 from minio import Minio
+from minio.commonconfig import ComposeSource
+from minio.datatypes import Part
+from minio.deleteobjects import DeleteObject
 from minio.error import S3Error
+from minio.helpers import genheaders
 from dotenv import load_dotenv
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
+from app.utils.s3_utils import HashingReader, iter_batches
+from app.utils.compression import (
+    ZSTD_CODEC,
+    CompressingReader,
+    PrefixedReader,
+    compression_ratio,
+    guess_content_type,
+    is_compressible_type,
+    iter_decompressed,
+    zstandard
+)
 
 load_dotenv()
 
-# Initialize MinIO client
+logger = logging.getLogger(__name__)
+
+# Multipart upload settings. The part size bounds the memory held per in-flight
+# part, the concurrency bounds the number of parts uploaded at the same time.
+UPLOAD_PART_SIZE = int(os.getenv("MINIO_PART_SIZE", str(16 * 1024 * 1024)))
+UPLOAD_CONCURRENCY = int(os.getenv("MINIO_UPLOAD_CONCURRENCY", "4"))
+# Parts of a single upload in flight at once. Kept below UPLOAD_CONCURRENCY so
+# one large upload cannot occupy the whole shared pool and starve the others.
+UPLOAD_PARTS_PER_UPLOAD = min(
+    UPLOAD_CONCURRENCY,
+    int(os.getenv("MINIO_UPLOAD_PARTS_PER_UPLOAD", str(max(1, UPLOAD_CONCURRENCY // 2))))
+)
+UPLOAD_PART_RETRIES = int(os.getenv("MINIO_PART_RETRIES", "3"))
+
+# Content-addressed layout: blobs are stored once under their SHA-256 and the
+# human-readable object paths become zero-byte references to them
+CONTENT_ADDRESSED_STORAGE = os.getenv("MINIO_CONTENT_ADDRESSED", "false").lower() == "true"
+BLOB_PREFIX = "blobs/sha256"
+BLOB_STAGING_PREFIX = "blobs/staging"
+REFERENCE_PREFIX = "refs/sha256"
+BLOB_CHECKSUM_METADATA_KEY = "blob-sha256"
+# Blobs whose last reference was released get a tombstone and are only deleted
+# by sweep_unreferenced_blobs once the tombstone is older than the grace period
+BLOB_TOMBSTONE_PREFIX = "blobs/tombstones"
+BLOB_TRASH_PREFIX = "blobs/trash"
+BLOB_DELETE_GRACE_SECONDS = int(os.getenv("MINIO_BLOB_DELETE_GRACE_SECONDS", "3600"))
+BLOB_SWEEP_INTERVAL_SECONDS = int(os.getenv("MINIO_BLOB_SWEEP_INTERVAL_SECONDS", "600"))
+
+# State of resumable upload sessions, kept next to the documents (see
+# resumable_uploads.py); bulk deletes never match it
+UPLOAD_SESSION_PREFIX = ".upload-sessions"
+
+# Buckets created at startup, and how long a bucket is trusted to exist before
+# bucket_exists is called again
+CONFIGURED_BUCKETS = [name.strip() for name in os.getenv("MINIO_BUCKETS", "documents").split(",") if name.strip()]
+BUCKET_CACHE_TTL_SECONDS = int(os.getenv("MINIO_BUCKET_CACHE_TTL_SECONDS", "300"))
+
+# S3 multi-object delete accepts at most 1000 keys per request
+DELETE_BATCH_SIZE = 1000
+
+# Optional zstd compression of text-like documents. The decision is made per
+# object from its content type and a compressibility probe of the first bytes.
+COMPRESSION_ENABLED = os.getenv("MINIO_COMPRESSION", "false").lower() == "true"
+COMPRESSION_LEVEL = int(os.getenv("MINIO_COMPRESSION_LEVEL", "3"))
+COMPRESSION_PROBE_BYTES = int(os.getenv("MINIO_COMPRESSION_PROBE_BYTES", str(64 * 1024)))
+# Minimum fraction of the probe that compression must save
+COMPRESSION_MIN_SAVINGS = float(os.getenv("MINIO_COMPRESSION_MIN_SAVINGS", "0.2"))
+CODEC_METADATA_KEY = "storage-codec"
+UNCOMPRESSED_SIZE_METADATA_KEY = "uncompressed-size"
+
+# Initialize MinIO client; the connection pool is sized so parallel part
+# uploads do not queue behind each other for a socket
 minio_client = Minio(
     os.getenv("MINIO_ENDPOINT", "minio:9000"),
     access_key=os.getenv("MINIO_ACCESS_KEY", "minioadmin"),
     secret_key=os.getenv("MINIO_SECRET_KEY", "minioadmin"),
-    secure=False  # Set to True if using HTTPS
+    secure=False,  # Set to True if using HTTPS
+    http_client=urllib3.PoolManager(
+        timeout=urllib3.Timeout(connect=300, read=300),
+        maxsize=max(10, UPLOAD_CONCURRENCY * 2),
+        cert_reqs="CERT_REQUIRED",
+        ca_certs=os.environ.get("SSL_CERT_FILE") or certifi.where(),
+        retries=urllib3.Retry(
+            total=5,
+            backoff_factor=0.2,
+            status_forcelist=[500, 502, 503, 504]
+        )
+    )
+)
+
+# Shared pool for part uploads, so concurrent requests cannot spawn unbounded threads
+_part_upload_executor = ThreadPoolExecutor(
+    max_workers=UPLOAD_CONCURRENCY,
+    thread_name_prefix="minio-part-upload"
 )
 
+class BucketRegistry:
+    """Process-wide record of buckets known to exist, each trusted for a TTL"""
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._known = {}
+        self._lock = threading.Lock()
+
+    def is_known(self, bucket_name: str) -> bool:
+        with self._lock:
+            confirmed_at = self._known.get(bucket_name)
+            if confirmed_at is None:
+                return False
+            if time.monotonic() - confirmed_at >= self.ttl:
+                del self._known[bucket_name]
+                return False
+            return True
+
+    def mark_known(self, bucket_name: str):
+        with self._lock:
+            self._known[bucket_name] = time.monotonic()
+
+    def invalidate(self, bucket_name: str):
+        with self._lock:
+            self._known.pop(bucket_name, None)
+
+bucket_registry = BucketRegistry(BUCKET_CACHE_TTL_SECONDS)
+
+if COMPRESSION_ENABLED and zstandard is None:
+    logger.warning("MINIO_COMPRESSION is enabled but the zstandard package is not installed; storing uncompressed")
+    COMPRESSION_ENABLED = False
+
 def ensure_bucket_exists(bucket_name: str):
     """Ensure the bucket exists, create it if it doesn't"""
+    if bucket_registry.is_known(bucket_name):
+        return
     try:
         if not minio_client.bucket_exists(bucket_name):
             minio_client.make_bucket(bucket_name)
             print(f"Created bucket: {bucket_name}")
+        bucket_registry.mark_known(bucket_name)
     except S3Error as e:
         raise Exception(f"Error ensuring bucket exists: {str(e)}")
 
+def create_configured_buckets():
+    """Create the buckets listed in MINIO_BUCKETS and seed the bucket registry"""
+    for bucket_name in CONFIGURED_BUCKETS:
+        ensure_bucket_exists(bucket_name)
+
+def _call_with_bucket_check(bucket_name: str, operation):
+    """
+    Run a MinIO call, recreating the bucket once if MinIO reports it missing
+
+    The bucket registry can be stale when a bucket is removed out of band; the
+    failed call invalidates the entry so the retry goes through ensure_bucket_exists.
+    """
+    try:
+        return operation()
+    except S3Error as e:
+        if e.code != "NoSuchBucket":
+            raise
+        bucket_registry.invalidate(bucket_name)
+        ensure_bucket_exists(bucket_name)
+        return operation()
+
+def _read_part(stream, size: int) -> bytes:
+    """Read up to size bytes from a stream, tolerating short reads"""
+    chunks = []
+    remaining = size
+    while remaining > 0:
+        chunk = stream.read(remaining)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+def _upload_part_with_retry(bucket_name: str, object_name: str, upload_id: str, part_number: int, data: bytes) -> Part:
+    """Upload a single part, retrying only that part on failure"""
+    for attempt in range(1, UPLOAD_PART_RETRIES + 1):
+        try:
+            etag = minio_client._upload_part(bucket_name, object_name, data, None, upload_id, part_number)
+            return Part(part_number, etag)
+        except Exception as e:
+            if attempt == UPLOAD_PART_RETRIES:
+                raise
+            logger.warning(f"Retrying part {part_number} of {object_name} after error: {str(e)}")
+            time.sleep(0.5 * 2 ** (attempt - 1))
+
+def multipart_upload(stream, bucket_name: str, object_name: str, metadata: dict = None, content_type: str = None) -> str:
+    """
+    Upload a stream to MinIO, splitting it into parts uploaded concurrently
+
+    Parts are read sequentially from the stream and uploaded on a shared,
+    bounded thread pool. At most UPLOAD_PARTS_PER_UPLOAD parts of one upload
+    are in flight (and held in memory) at a time, so concurrent uploads each
+    get a share of the pool. A failed part is retried on its own; if it keeps failing the
+    multipart upload is aborted. Objects that fit in a single part are sent
+    with one PUT.
+    
+    Args:
+        stream: File-like object with a read() method
+        bucket_name: MinIO bucket name
+        object_name: Object name in MinIO
+        metadata: Optional user metadata (string values)
+        content_type: Optional content type of the object
+    
+    Returns:
+        ETag of the uploaded object
+    """
+    first_part = _read_part(stream, UPLOAD_PART_SIZE)
+    next_part = _read_part(stream, UPLOAD_PART_SIZE) if len(first_part) == UPLOAD_PART_SIZE else b""
+    if not next_part:
+        result = _call_with_bucket_check(bucket_name, lambda: minio_client.put_object(
+            bucket_name,
+            object_name,
+            io.BytesIO(first_part),
+            len(first_part),
+            content_type=content_type or "application/octet-stream",
+            metadata=metadata
+        ))
+        return result.etag
+
+    headers = genheaders(metadata, None, None, None, False)
+    headers["Content-Type"] = content_type or "application/octet-stream"
+    upload_id = _call_with_bucket_check(
+        bucket_name,
+        lambda: minio_client._create_multipart_upload(bucket_name, object_name, headers)
+    )
+
+    in_flight = threading.BoundedSemaphore(UPLOAD_PARTS_PER_UPLOAD)
+    futures = []
+
+    def submit(part_number: int, data: bytes):
+        in_flight.acquire()
+        future = _part_upload_executor.submit(
+            _upload_part_with_retry, bucket_name, object_name, upload_id, part_number, data
+        )
+        future.add_done_callback(lambda _: in_flight.release())
+        futures.append(future)
+
+    try:
+        submit(1, first_part)
+        part_number = 2
+        data = next_part
+        while data:
+            if any(f.done() and f.exception() for f in futures):
+                break
+            submit(part_number, data)
+            part_number += 1
+            data = _read_part(stream, UPLOAD_PART_SIZE)
+
+        parts = [future.result() for future in futures]
+        result = minio_client._complete_multipart_upload(bucket_name, object_name, upload_id, parts)
+        return result.etag
+    except Exception:
+        for future in futures:
+            future.cancel()
+        try:
+            minio_client._abort_multipart_upload(bucket_name, object_name, upload_id)
+        except Exception as abort_error:
+            logger.warning(f"Failed to abort multipart upload {upload_id}: {str(abort_error)}")
+        raise
+
+def _stream_size(stream):
+    """Return the number of bytes left in a seekable stream, or None if it cannot be known"""
+    try:
+        if not stream.seekable():
+            return None
+        position = stream.tell()
+        end = stream.seek(0, io.SEEK_END)
+        stream.seek(position)
+        return end - position
+    except (AttributeError, OSError, ValueError):
+        return None
+
+def _maybe_compress(stream, size: int, content_type: str):
+    """
+    Wrap a stream in a zstd compressor when the content is worth compressing
+
+    The uncompressed size is recorded with the codec so reads can report the
+    original Content-Length, which is why streams of unknown size are stored
+    as they are.
+    
+    Args:
+        stream: File-like object positioned at the start of the data
+        size: Uncompressed size in bytes, or None if unknown
+        content_type: Content type of the object
+    
+    Returns:
+        (reader, metadata) where metadata holds the codec entries to store on the object
+    """
+    if not COMPRESSION_ENABLED or size is None or not is_compressible_type(content_type):
+        return stream, {}
+    probe = _read_part(stream, COMPRESSION_PROBE_BYTES)
+    reader = PrefixedReader(probe, stream)
+    if compression_ratio(probe, COMPRESSION_LEVEL) > 1 - COMPRESSION_MIN_SAVINGS:
+        return reader, {}
+    return CompressingReader(reader, COMPRESSION_LEVEL), {
+        CODEC_METADATA_KEY: ZSTD_CODEC,
+        UNCOMPRESSED_SIZE_METADATA_KEY: str(size)
+    }
+
+def _object_url(bucket_name: str, object_name: str) -> str:
+    return f"http://{os.getenv('MINIO_ENDPOINT', 'minio:9000')}/{bucket_name}/{object_name}"
+
+def _is_missing_object_error(error: S3Error) -> bool:
+    return error.code in ("NoSuchKey", "NoSuchObject", "NotFound", "ResourceNotFound")
+
+def _compute_file_checksum(file_path: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as file_stream:
+        for chunk in iter(lambda: file_stream.read(1024 * 1024), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+def blob_object_name(checksum: str) -> str:
+    """Return the object name of the content-addressed blob for a SHA-256 checksum"""
+    return f"{BLOB_PREFIX}/{checksum[:2]}/{checksum}"
+
+def _reference_marker_name(checksum: str, object_name: str) -> str:
+    object_hash = hashlib.sha256(object_name.encode("utf-8")).hexdigest()
+    return f"{REFERENCE_PREFIX}/{checksum}/{object_hash}"
+
+def get_blob_reference_count(bucket_name: str, checksum: str) -> int:
+    """
+    Count the object paths that reference a blob
+
+    Every reference owns one zero-byte marker object under
+    refs/sha256/<checksum>/, so the count is derived from a listing instead of
+    a read-modify-write counter that concurrent uploads could corrupt.
+    """
+    markers = minio_client.list_objects(bucket_name, prefix=f"{REFERENCE_PREFIX}/{checksum}/")
+    return sum(1 for _ in markers)
+
+def get_referenced_checksum(bucket_name: str, object_name: str) -> str:
+    """
+    Return the blob checksum an object path points to, or None for a regular object
+
+    Raises S3Error when the object does not exist.
+    """
+    stat = minio_client.stat_object(bucket_name, object_name)
+    return stat.metadata.get(f"x-amz-meta-{BLOB_CHECKSUM_METADATA_KEY}")
+
+def _blob_exists(bucket_name: str, checksum: str) -> bool:
+    try:
+        minio_client.stat_object(bucket_name, blob_object_name(checksum))
+        return True
+    except S3Error as e:
+        if _is_missing_object_error(e):
+            return False
+        raise
+
+def _store_reference(bucket_name: str, object_name: str, checksum: str, metadata: dict, content_type: str, create_blob):
+    """
+    Point object_name at the blob for checksum, creating the blob if needed
+
+    The reference marker is written before the blob is checked. A sweep that
+    counted references before the marker existed re-counts after deleting the
+    blob and restores it, and a sweep that deletes later than that is seen by
+    the check here, which then recreates the blob.
+    """
+    try:
+        previous_checksum = get_referenced_checksum(bucket_name, object_name)
+    except S3Error as e:
+        if not _is_missing_object_error(e):
+            raise
+        previous_checksum = None
+
+    minio_client.put_object(
+        bucket_name,
+        _reference_marker_name(checksum, object_name),
+        io.BytesIO(b""),
+        0,
+        metadata={"object_name": object_name}
+    )
+
+    if not _blob_exists(bucket_name, checksum):
+        create_blob(blob_object_name(checksum))
+
+    reference_metadata = dict(metadata or {})
+    reference_metadata[BLOB_CHECKSUM_METADATA_KEY] = checksum
+    minio_client.put_object(
+        bucket_name,
+        object_name,
+        io.BytesIO(b""),
+        0,
+        content_type=content_type or "application/octet-stream",
+        metadata=reference_metadata
+    )
+
+    if previous_checksum and previous_checksum != checksum:
+        _release_reference(bucket_name, object_name, previous_checksum)
+
+def _release_reference(bucket_name: str, object_name: str, checksum: str):
+    """Drop one reference to a blob and schedule the blob for deletion once nothing points to it"""
+    minio_client.remove_object(bucket_name, _reference_marker_name(checksum, object_name))
+    if get_blob_reference_count(bucket_name, checksum) == 0:
+        _write_tombstone(bucket_name, checksum)
+
+def _tombstone_name(checksum: str) -> str:
+    return f"{BLOB_TOMBSTONE_PREFIX}/{checksum}"
+
+def _write_tombstone(bucket_name: str, checksum: str):
+    """Mark a blob as unreferenced; the blob is kept until a sweep finds it still unreferenced"""
+    minio_client.put_object(bucket_name, _tombstone_name(checksum), io.BytesIO(b""), 0)
+
+def _copy_object(bucket_name: str, source_name: str, target_name: str):
+    """
+    Server-side copy that keeps the content type and user metadata
+
+    Sources over 5 GiB are copied by a multipart compose, which does not carry
+    metadata over by itself, so it is always passed explicitly.
+    """
+    stat = minio_client.stat_object(bucket_name, source_name)
+    metadata = {
+        key[len("x-amz-meta-"):]: value for key, value in stat.metadata.items()
+        if key.lower().startswith("x-amz-meta-")
+    }
+    metadata["Content-Type"] = stat.content_type or "application/octet-stream"
+    minio_client.compose_object(bucket_name, target_name, [ComposeSource(bucket_name, source_name)], metadata=metadata)
+
+def _delete_unreferenced_blob(bucket_name: str, checksum: str) -> bool:
+    """
+    Delete a blob, restoring it if a reference appeared while it was being deleted
+
+    The blob is copied aside first. A writer whose marker exists when the
+    references are counted again after the delete gets the blob copied back;
+    any later writer finds the blob missing and uploads it again itself.
+    """
+    blob_name = blob_object_name(checksum)
+    trash_name = f"{BLOB_TRASH_PREFIX}/{checksum}"
+    try:
+        _copy_object(bucket_name, blob_name, trash_name)
+    except S3Error as e:
+        if _is_missing_object_error(e):
+            return False
+        raise
+    try:
+        minio_client.remove_object(bucket_name, blob_name)
+        if get_blob_reference_count(bucket_name, checksum) > 0:
+            logger.info(f"Blob {checksum} was referenced again while being deleted, restoring it")
+            _copy_object(bucket_name, trash_name, blob_name)
+            return False
+    finally:
+        minio_client.remove_object(bucket_name, trash_name)
+    logger.info(f"Removed unreferenced blob {checksum} from {bucket_name}")
+    return True
+
+def sweep_unreferenced_blobs(bucket_name: str, grace_seconds: int = BLOB_DELETE_GRACE_SECONDS) -> int:
+    """
+    Delete blobs whose tombstone is older than grace_seconds and that are still unreferenced
+
+    Returns:
+        Number of blobs deleted
+    """
+    deleted = 0
+    now = datetime.now(timezone.utc)
+    for tombstone in minio_client.list_objects(bucket_name, prefix=f"{BLOB_TOMBSTONE_PREFIX}/"):
+        if (now - tombstone.last_modified).total_seconds() < grace_seconds:
+            continue
+        checksum = tombstone.object_name.rsplit("/", 1)[-1]
+        if get_blob_reference_count(bucket_name, checksum) == 0 and _delete_unreferenced_blob(bucket_name, checksum):
+            deleted += 1
+        minio_client.remove_object(bucket_name, tombstone.object_name)
+    return deleted
+
 def upload_file_to_minio(file_path: str, bucket_name: str, object_name: str, metadata: dict = None) -> str:
     """
     Upload a file to MinIO with metadata
@@ -47,23 +496,117 @@ def upload_file_to_minio(file_path: str, bucket_name: str, object_name: str, met
             for key, value in metadata.items():
                 minio_metadata[key] = str(value)
         
-        # Upload file
-        minio_client.fput_object(
-            bucket_name,
-            object_name,
-            file_path,
-            metadata=minio_metadata
-        )
+        file_size = os.path.getsize(file_path)
+        content_type = guess_content_type(object_name)
+        
+        if CONTENT_ADDRESSED_STORAGE:
+            # Hash locally first so duplicate content is never uploaded again
+            checksum = _compute_file_checksum(file_path)
+
+            def create_blob(blob_name: str):
+                with open(file_path, "rb") as file_stream:
+                    data, codec_metadata = _maybe_compress(file_stream, file_size, content_type)
+                    multipart_upload(data, bucket_name, blob_name, codec_metadata, content_type)
+
+            _store_reference(bucket_name, object_name, checksum, minio_metadata, content_type, create_blob)
+            return _object_url(bucket_name, blob_object_name(checksum))
+        
+        # Upload file in parallel parts
+        with open(file_path, "rb") as file_stream:
+            data, codec_metadata = _maybe_compress(file_stream, file_size, content_type)
+            multipart_upload(data, bucket_name, object_name, {**minio_metadata, **codec_metadata})
         
         # Return the object URL
-        return f"http://{os.getenv('MINIO_ENDPOINT', 'minio:9000')}/{bucket_name}/{object_name}"
+        return _object_url(bucket_name, object_name)
         
     except S3Error as e:
+        if e.code == "NoSuchBucket":
+            bucket_registry.invalidate(bucket_name)
         raise Exception(f"Failed to upload file to MinIO: {str(e)}")
 
+def upload_stream_to_minio(
+    stream,
+    bucket_name: str,
+    object_name: str,
+    metadata: dict = None,
+    content_type: str = None
+) -> dict:
+    """
+    Upload a stream of unknown length to MinIO as a multipart upload
+
+    The stream is read one part at a time, so memory use is bounded by
+    UPLOAD_PART_SIZE * UPLOAD_CONCURRENCY regardless of the object size. The
+    size and SHA-256 checksum are computed in the same pass.
+    
+    Args:
+        stream: File-like object with a read() method
+        bucket_name: MinIO bucket name
+        object_name: Object name in MinIO (folder structure)
+        metadata: Optional metadata dictionary
+        content_type: Optional content type of the object
+    
+    Returns:
+        Dictionary with the object URL, file size and SHA-256 checksum
+    """
+    try:
+        # Ensure bucket exists
+        ensure_bucket_exists(bucket_name)
+        
+        # Prepare metadata
+        minio_metadata = {}
+        if metadata:
+            for key, value in metadata.items():
+                minio_metadata[key] = str(value)
+        
+        # Measured before wrapping; the checksum is always of the uncompressed data
+        size = _stream_size(stream)
+        reader = HashingReader(stream)
+        data, codec_metadata = _maybe_compress(reader, size, content_type)
+        if not CONTENT_ADDRESSED_STORAGE:
+            multipart_upload(data, bucket_name, object_name, {**minio_metadata, **codec_metadata}, content_type)
+            return {
+                "minio_url": _object_url(bucket_name, object_name),
+                "file_size": reader.size,
+                "checksum": reader.hexdigest()
+            }
+
+        # The checksum is only known once the stream is consumed, so the data
+        # is staged first and promoted to its blob name with a server-side copy
+        staging_name = f"{BLOB_STAGING_PREFIX}/{uuid.uuid4()}"
+        multipart_upload(data, bucket_name, staging_name, codec_metadata, content_type)
+        checksum = reader.hexdigest()
+        try:
+            def create_blob(blob_name: str):
+                # Passed explicitly, as composing sources over 5 GiB drops metadata
+                minio_client.compose_object(
+                    bucket_name,
+                    blob_name,
+                    [ComposeSource(bucket_name, staging_name)],
+                    metadata={**codec_metadata, "Content-Type": content_type or "application/octet-stream"}
+                )
+
+            _store_reference(bucket_name, object_name, checksum, minio_metadata, content_type, create_blob)
+        finally:
+            minio_client.remove_object(bucket_name, staging_name)
+        
+        return {
+            "minio_url": _object_url(bucket_name, blob_object_name(checksum)),
+            "file_size": reader.size,
+            "checksum": checksum
+        }
+        
+    except S3Error as e:
+        if e.code == "NoSuchBucket":
+            bucket_registry.invalidate(bucket_name)
+        raise Exception(f"Failed to upload stream to MinIO: {str(e)}")
+
 def delete_file_from_minio(bucket_name: str, object_name: str) -> bool:
     """
     Delete a file from MinIO
+
+    With content-addressed storage enabled, deleting a reference only marks
+    the underlying blob for deletion once its reference count reaches zero;
+    sweep_unreferenced_blobs removes it after the grace period.
     
     Args:
         bucket_name: MinIO bucket name
@@ -73,11 +616,183 @@ def delete_file_from_minio(bucket_name: str, object_name: str) -> bool:
         True if successful
     """
     try:
+        if CONTENT_ADDRESSED_STORAGE:
+            try:
+                checksum = get_referenced_checksum(bucket_name, object_name)
+            except S3Error as e:
+                if not _is_missing_object_error(e):
+                    raise
+                checksum = None
+            minio_client.remove_object(bucket_name, object_name)
+            if checksum:
+                _release_reference(bucket_name, object_name, checksum)
+            return True
         minio_client.remove_object(bucket_name, object_name)
         return True
     except S3Error as e:
         raise Exception(f"Failed to delete file from MinIO: {str(e)}")
 
+def _is_internal_object(object_name: str) -> bool:
+    """True for blobs, staging objects, tombstones and reference markers of content-addressed storage"""
+    return object_name.startswith((
+        f"{BLOB_PREFIX}/",
+        f"{BLOB_STAGING_PREFIX}/",
+        f"{BLOB_TOMBSTONE_PREFIX}/",
+        f"{BLOB_TRASH_PREFIX}/",
+        f"{REFERENCE_PREFIX}/"
+    ))
+
+def _is_upload_session_object(object_name: str) -> bool:
+    return object_name.startswith(f"{UPLOAD_SESSION_PREFIX}/")
+
+def _remove_batch(bucket_name: str, object_names: list) -> dict:
+    """Multi-object delete; returns {object_name: (code, message)} for the keys that failed"""
+    errors = minio_client.remove_objects(bucket_name, [DeleteObject(name) for name in object_names])
+    return {error.name: (error.code, error.message) for error in errors}
+
+def _referenced_checksum_or_none(bucket_name: str, object_name: str):
+    try:
+        return get_referenced_checksum(bucket_name, object_name)
+    except S3Error as e:
+        if not _is_missing_object_error(e):
+            raise
+        return None
+
+def _delete_reference_batch(bucket_name: str, object_names: list) -> dict:
+    """Delete a batch of references, then their markers, and tombstone any blob left unreferenced"""
+    checksums = dict(zip(object_names, _part_upload_executor.map(
+        lambda name: _referenced_checksum_or_none(bucket_name, name), object_names
+    )))
+    errors = _remove_batch(bucket_name, object_names)
+    released = {name: checksum for name, checksum in checksums.items() if checksum and name not in errors}
+    if released:
+        _remove_batch(bucket_name, [_reference_marker_name(checksum, name) for name, checksum in released.items()])
+        for checksum in set(released.values()):
+            if get_blob_reference_count(bucket_name, checksum) == 0:
+                _write_tombstone(bucket_name, checksum)
+    return errors
+
+def iter_bulk_delete(bucket_name: str, object_names: list = None, prefix: str = None, batch_size: int = DELETE_BATCH_SIZE):
+    """
+    Delete many objects with multi-object delete requests, one batch at a time
+
+    Objects are either given explicitly or listed lazily under a prefix, so a
+    prefix with millions of objects is never held in memory. Resumable upload
+    session state is never deleted: prefix listings skip it and explicit names
+    are reported as errors. With content-addressed storage enabled, references
+    are released the same way as delete_file_from_minio and internal
+    blob/marker objects are never matched.
+
+    Args:
+        bucket_name: MinIO bucket name
+        object_names: Object names to delete
+        prefix: Delete every object under this prefix instead
+        batch_size: Keys per multi-object delete request (at most 1000)
+
+    Yields:
+        One dictionary per batch with the deleted object names and the
+        per-object errors ({"object_name", "code", "message"})
+    """
+    if (object_names is None) == (prefix is None):
+        raise ValueError("Provide either object_names or prefix")
+    if prefix is not None:
+        object_names = (
+            item.object_name for item in minio_client.list_objects(bucket_name, prefix=prefix, recursive=True)
+            if not _is_upload_session_object(item.object_name)
+        )
+    try:
+        for batch in iter_batches(object_names, min(batch_size, DELETE_BATCH_SIZE)):
+            errors = {name: ("InternalObject", "Upload session state cannot be deleted directly") for name in batch if _is_upload_session_object(name)}
+            if CONTENT_ADDRESSED_STORAGE:
+                errors.update({name: ("InternalObject", "Blob storage objects cannot be deleted directly") for name in batch if _is_internal_object(name)})
+            batch = [name for name in batch if name not in errors]
+            if batch and CONTENT_ADDRESSED_STORAGE:
+                errors.update(_delete_reference_batch(bucket_name, batch))
+            elif batch:
+                errors.update(_remove_batch(bucket_name, batch))
+            yield {
+                "deleted": [name for name in batch if name not in errors],
+                "errors": [
+                    {"object_name": name, "code": code, "message": message}
+                    for name, (code, message) in errors.items()
+                ]
+            }
+    except S3Error as e:
+        raise Exception(f"Failed to bulk delete from MinIO: {str(e)}")
+
+def get_object_info(bucket_name: str, object_name: str) -> dict:
+    """
+    Stat an object, resolving content-addressed references to their blob
+    
+    Args:
+        bucket_name: MinIO bucket name
+        object_name: Object name in MinIO
+    
+    Returns:
+        Dictionary with the data object name, size, etag, content type, last
+        modified time and storage codec. For compressed objects the size is the
+        uncompressed size.
+    
+    Raises:
+        FileNotFoundError: If the object does not exist
+    """
+    try:
+        stat = minio_client.stat_object(bucket_name, object_name)
+        content_type = stat.content_type
+        checksum = stat.metadata.get(f"x-amz-meta-{BLOB_CHECKSUM_METADATA_KEY}")
+        data_object_name = object_name
+        if checksum:
+            data_object_name = blob_object_name(checksum)
+            stat = minio_client.stat_object(bucket_name, data_object_name)
+        codec = stat.metadata.get(f"x-amz-meta-{CODEC_METADATA_KEY}")
+        size = int(stat.metadata.get(f"x-amz-meta-{UNCOMPRESSED_SIZE_METADATA_KEY}")) if codec else stat.size
+        return {
+            "object_name": data_object_name,
+            "size": size,
+            "etag": stat.etag,
+            "content_type": content_type or "application/octet-stream",
+            "last_modified": stat.last_modified,
+            "codec": codec
+        }
+    except S3Error as e:
+        if _is_missing_object_error(e):
+            raise FileNotFoundError(f"Object {object_name} not found in {bucket_name}")
+        raise Exception(f"Failed to stat object in MinIO: {str(e)}")
+
+def iter_object_chunks(bucket_name: str, object_name: str, offset: int = 0, length: int = 0, chunk_size: int = 64 * 1024, codec: str = None):
+    """
+    Yield an object (or a byte range of it) from MinIO in fixed-size chunks
+
+    The HTTP response is streamed and released when iteration ends, so the
+    object is never held in memory as a whole. Compressed objects are
+    decompressed on the fly; offsets and lengths refer to the uncompressed data.
+    
+    Args:
+        bucket_name: MinIO bucket name
+        object_name: Data object name in MinIO (already resolved from references)
+        offset: Start byte offset
+        length: Number of bytes to read; 0 reads to the end of the object
+        chunk_size: Size of the chunks yielded
+        codec: Storage codec reported by get_object_info, if any
+    """
+    if codec and codec != ZSTD_CODEC:
+        raise Exception(f"Unsupported storage codec: {codec}")
+    if codec and zstandard is None:
+        raise Exception("Object is zstd-compressed but the zstandard package is not installed")
+    if codec:
+        response = minio_client.get_object(bucket_name, object_name)
+    else:
+        response = minio_client.get_object(bucket_name, object_name, offset=offset, length=length)
+    try:
+        chunks = response.stream(chunk_size)
+        if codec:
+            chunks = iter_decompressed(chunks, offset, length)
+        for chunk in chunks:
+            yield chunk
+    finally:
+        response.close()
+        response.release_conn()
+
 def generate_object_path(brand: str, business_unit: str, document_name: str, revision: str, file_extension: str) -> str:
     """
     Generate object path in the format: <brand>/<business unit>/<document name>-<revision>.<extension>
@@ -119,3 +834,24 @@ def get_file_metadata(file_path: str) -> dict:
         }
     except Exception as e:
         raise Exception(f"Failed to get file metadata: {str(e)}")
+
+class MinioStorageBackend:
+    """StorageBackend implementation backed by the module-level MinIO client"""
+
+    def upload_stream(self, stream, bucket_name: str, object_name: str, metadata: dict = None, content_type: str = None) -> dict:
+        return upload_stream_to_minio(stream, bucket_name, object_name, metadata, content_type)
+
+    def upload_file(self, file_path: str, bucket_name: str, object_name: str, metadata: dict = None) -> str:
+        return upload_file_to_minio(file_path, bucket_name, object_name, metadata)
+
+    def delete(self, bucket_name: str, object_name: str) -> bool:
+        return delete_file_from_minio(bucket_name, object_name)
+
+    def iter_bulk_delete(self, bucket_name: str, object_names: list = None, prefix: str = None):
+        return iter_bulk_delete(bucket_name, object_names, prefix)
+
+    def get_object_info(self, bucket_name: str, object_name: str) -> dict:
+        return get_object_info(bucket_name, object_name)
+
+    def iter_object_chunks(self, bucket_name: str, object_name: str, offset: int = 0, length: int = 0, chunk_size: int = 64 * 1024, codec: str = None):
+        return iter_object_chunks(bucket_name, object_name, offset, length, chunk_size, codec)
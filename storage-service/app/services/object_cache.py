@@ -0,0 +1,199 @@
+import os
+import shutil
+import hashlib
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Read-through disk cache for hot objects. Entries are keyed by object path and
+# ETag, so a new revision never serves stale bytes even before invalidation.
+OBJECT_CACHE_ENABLED = os.getenv("OBJECT_CACHE_ENABLED", "false").lower() == "true"
+OBJECT_CACHE_DIR = os.getenv("OBJECT_CACHE_DIR", "/tmp/storage-service-cache")
+OBJECT_CACHE_MAX_BYTES = int(os.getenv("OBJECT_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+# Larger objects are always streamed from the object store
+OBJECT_CACHE_MAX_OBJECT_BYTES = int(os.getenv("OBJECT_CACHE_MAX_OBJECT_BYTES", str(64 * 1024 * 1024)))
+
+
+class CacheEntry:
+    def __init__(self, etag: str, path: str, size: int):
+        self.etag = etag
+        self.path = path
+        self.size = size
+        self.readers = 0
+        self.discarded = False
+
+
+class ObjectDiskCache:
+    """
+    LRU cache of whole objects on local disk, bounded by total bytes
+
+    Files are only deleted once no response is reading them: `get` pins an
+    entry and the caller must `release` it when the response has been sent.
+    Pinned entries are skipped by eviction, so the cache can briefly exceed
+    `max_bytes` under heavy concurrent reads.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, max_object_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_object_bytes = max_object_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.evictions = 0
+        # The index lives in memory, so files left by a previous process are unknown
+        self._objects_directory = os.path.join(directory, "objects")
+        shutil.rmtree(self._objects_directory, ignore_errors=True)
+        os.makedirs(self._objects_directory, exist_ok=True)
+
+    def _file_path(self, bucket_name: str, object_name: str) -> str:
+        # Unique per fill, so a discarded file still being served is never overwritten
+        digest = hashlib.sha256(f"{bucket_name}/{object_name}".encode()).hexdigest()
+        return os.path.join(self._objects_directory, f"{digest}-{uuid.uuid4().hex}")
+
+    def cacheable(self, size: int) -> bool:
+        return 0 < size <= min(self.max_object_bytes, self.max_bytes)
+
+    def get(self, bucket_name: str, object_name: str, etag: str):
+        """Return a pinned CacheEntry for the current ETag, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get((bucket_name, object_name))
+            if entry is None or entry.etag != etag:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((bucket_name, object_name))
+            entry.readers += 1
+            self.hits += 1
+            return entry
+
+    def release(self, entry: CacheEntry, bytes_served: int = 0):
+        """Unpin an entry once its response is finished"""
+        with self._lock:
+            entry.readers -= 1
+            self.bytes_saved += bytes_served
+            if entry.discarded and entry.readers == 0:
+                self._remove_file(entry.path)
+            self._evict()
+
+    def iter_fill(self, bucket_name: str, object_name: str, etag: str, chunks):
+        """
+        Pass chunks through while writing them to the cache
+
+        The first chunk reaches the caller as soon as it was read, and the object
+        is only cached once the last chunk was consumed. A caller that stops
+        early (e.g. a client disconnect) leaves nothing behind, and a failing
+        cache write only stops the caching, never the stream.
+
+        Args:
+            bucket_name: Bucket name
+            object_name: Object path
+            etag: ETag of the object version being written
+            chunks: Iterable of bytes with the full object content
+
+        Yields:
+            The chunks, unchanged
+        """
+        path = self._file_path(bucket_name, object_name)
+        temp_path = f"{path}.part"
+        size = 0
+        try:
+            file_out = open(temp_path, "wb")
+        except OSError as e:
+            logger.warning(f"Could not cache {object_name}: {str(e)}")
+            file_out = None
+        try:
+            for chunk in chunks:
+                if file_out is not None:
+                    try:
+                        file_out.write(chunk)
+                    except OSError as e:
+                        logger.warning(f"Could not cache {object_name}: {str(e)}")
+                        file_out.close()
+                        file_out = None
+                        self._remove_file(temp_path)
+                size += len(chunk)
+                yield chunk
+            if file_out is None:
+                return
+            file_out.close()
+            file_out = None
+            os.replace(temp_path, path)
+        except BaseException:
+            if file_out is not None:
+                file_out.close()
+            self._remove_file(temp_path)
+            raise
+        self._insert(bucket_name, object_name, CacheEntry(etag, path, size))
+
+    def _insert(self, bucket_name: str, object_name: str, entry: CacheEntry):
+        with self._lock:
+            previous = self._entries.pop((bucket_name, object_name), None)
+            if previous is not None:
+                self._discard(previous)
+            self._entries[(bucket_name, object_name)] = entry
+            self._size += entry.size
+            self._evict()
+
+    def invalidate(self, bucket_name: str, object_name: str):
+        """Drop the cached copy of an object after it was overwritten or deleted"""
+        with self._lock:
+            entry = self._entries.pop((bucket_name, object_name), None)
+            if entry is not None:
+                self._discard(entry)
+
+    def _discard(self, entry: CacheEntry):
+        # Must be called with the lock held
+        self._size -= entry.size
+        entry.discarded = True
+        # A file still being served goes once the last reader releases it
+        if entry.readers == 0:
+            self._remove_file(entry.path)
+
+    def _evict(self):
+        # Must be called with the lock held
+        for key in list(self._entries):
+            if self._size <= self.max_bytes:
+                break
+            entry = self._entries[key]
+            if entry.readers:
+                continue
+            del self._entries[key]
+            self._size -= entry.size
+            self._remove_file(entry.path)
+            self.evictions += 1
+
+    def _remove_file(self, path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "bytes_saved": self.bytes_saved,
+                "bytes_cached": self._size,
+                "max_bytes": self.max_bytes,
+                "entries": len(self._entries),
+                "evictions": self.evictions
+            }
+
+
+object_cache = ObjectDiskCache(
+    OBJECT_CACHE_DIR,
+    OBJECT_CACHE_MAX_BYTES,
+    OBJECT_CACHE_MAX_OBJECT_BYTES
+) if OBJECT_CACHE_ENABLED else None
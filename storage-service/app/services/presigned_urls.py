@@ -0,0 +1,226 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+from minio import Minio
+from minio.datatypes import Part
+from minio.error import S3Error
+from minio.helpers import genheaders
+from dotenv import load_dotenv
+from app.services.minio_storage import minio_client, ensure_bucket_exists, get_object_info
+
+load_dotenv()
+
+PRESIGNED_URL_EXPIRY_SECONDS = int(os.getenv("PRESIGNED_URL_EXPIRY_SECONDS", "900"))
+# Cached URLs are handed out only while they still have most of their lifetime left
+PRESIGNED_URL_CACHE_TTL_SECONDS = int(os.getenv("PRESIGNED_URL_CACHE_TTL_SECONDS", "300"))
+PRESIGNED_URL_CACHE_MAX_ENTRIES = int(os.getenv("PRESIGNED_URL_CACHE_MAX_ENTRIES", "10000"))
+
+# Presigned URLs embed the host they were signed for, so they are signed against
+# the endpoint clients can reach. Signing is a local HMAC computation; passing the
+# region avoids a bucket-location lookup against MinIO.
+presign_client = Minio(
+    os.getenv("MINIO_PUBLIC_ENDPOINT", os.getenv("MINIO_ENDPOINT", "minio:9000")),
+    access_key=os.getenv("MINIO_ACCESS_KEY", "minioadmin"),
+    secret_key=os.getenv("MINIO_SECRET_KEY", "minioadmin"),
+    secure=os.getenv("MINIO_PUBLIC_SECURE", "false").lower() == "true",
+    region=os.getenv("MINIO_REGION", "us-east-1")
+)
+
+
+class PresignedUrlCache:
+    """
+    Short-lived, bounded LRU cache of presigned URLs keyed by operation and object
+
+    Entries are served for at most `ttl` seconds after signing, which must be
+    shorter than the URL expiry so callers always get a URL with time left on it.
+    """
+
+    def __init__(self, ttl: int, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return (url, signed_at) for a key, or None if missing or stale"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[1] >= self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, url: str) -> tuple:
+        entry = (url, time.monotonic())
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, bucket_name: str, object_name: str):
+        """Drop every cached URL for an object"""
+        with self._lock:
+            for key in [key for key in self._entries if key[1] == bucket_name and key[2] == object_name]:
+                del self._entries[key]
+
+
+presigned_url_cache = PresignedUrlCache(
+    ttl=min(PRESIGNED_URL_CACHE_TTL_SECONDS, PRESIGNED_URL_EXPIRY_SECONDS // 2),
+    max_entries=PRESIGNED_URL_CACHE_MAX_ENTRIES
+)
+
+
+def _signed_url(method: str, bucket_name: str, object_name: str, extra_query_params: dict = None, response_headers: dict = None, cache: bool = True) -> dict:
+    """Sign a URL, reusing a cached one when `cache` is set"""
+    key = (
+        method,
+        bucket_name,
+        object_name,
+        tuple(sorted((extra_query_params or {}).items())),
+        tuple(sorted((response_headers or {}).items()))
+    )
+    entry = presigned_url_cache.get(key) if cache else None
+    if entry is None:
+        url = presign_client.get_presigned_url(
+            method,
+            bucket_name,
+            object_name,
+            expires=timedelta(seconds=PRESIGNED_URL_EXPIRY_SECONDS),
+            response_headers=response_headers,
+            extra_query_params=extra_query_params
+        )
+        entry = presigned_url_cache.put(key, url) if cache else (url, time.monotonic())
+    url, signed_at = entry
+    return {
+        "url": url,
+        "expires_in": int(PRESIGNED_URL_EXPIRY_SECONDS - (time.monotonic() - signed_at))
+    }
+
+
+def presign_download(bucket_name: str, object_name: str, object_info=get_object_info) -> dict:
+    """
+    Issue a presigned GET URL for an object
+
+    Content-addressed references are resolved to their blob; the URL then
+    overrides the response content type with the one recorded on the reference.
+    Compressed objects are served with a Content-Encoding naming their codec.
+    Resolution only happens on a cache miss.
+
+    Args:
+        bucket_name: MinIO bucket name
+        object_name: Object path in MinIO
+        object_info: Stat function of the configured storage backend
+
+    Returns:
+        Dictionary with the URL and the number of seconds it stays valid
+    """
+    key = ("GET", bucket_name, object_name, (), ())
+    entry = presigned_url_cache.get(key)
+    if entry is None:
+        info = object_info(bucket_name, object_name)
+        response_headers = {}
+        if info["object_name"] != object_name:
+            response_headers["response-content-type"] = info["content_type"]
+        if info["codec"]:
+            # Presigned reads bypass this service, so the client has to decode
+            response_headers["response-content-encoding"] = info["codec"]
+        url = presign_client.get_presigned_url(
+            "GET",
+            bucket_name,
+            info["object_name"],
+            expires=timedelta(seconds=PRESIGNED_URL_EXPIRY_SECONDS),
+            response_headers=response_headers or None
+        )
+        entry = presigned_url_cache.put(key, url)
+    url, signed_at = entry
+    return {
+        "url": url,
+        "expires_in": int(PRESIGNED_URL_EXPIRY_SECONDS - (time.monotonic() - signed_at))
+    }
+
+
+def presign_upload(bucket_name: str, object_name: str) -> dict:
+    """
+    Issue a presigned PUT URL for a single-request upload
+
+    Args:
+        bucket_name: MinIO bucket name
+        object_name: Object path in MinIO
+
+    Returns:
+        Dictionary with the URL and the number of seconds it stays valid
+    """
+    ensure_bucket_exists(bucket_name)
+    return _signed_url("PUT", bucket_name, object_name)
+
+
+def create_presigned_multipart_upload(bucket_name: str, object_name: str, part_count: int, content_type: str = None) -> dict:
+    """
+    Start a multipart upload and presign a PUT URL for each part
+
+    Args:
+        bucket_name: MinIO bucket name
+        object_name: Object path in MinIO
+        part_count: Number of parts the client will upload
+        content_type: Optional content type of the final object
+
+    Returns:
+        Dictionary with the upload id and the presigned part URLs
+    """
+    if part_count < 1 or part_count > 10000:
+        raise ValueError("part_count must be between 1 and 10000")
+    try:
+        ensure_bucket_exists(bucket_name)
+        headers = genheaders(None, None, None, None, False)
+        headers["Content-Type"] = content_type or "application/octet-stream"
+        upload_id = minio_client._create_multipart_upload(bucket_name, object_name, headers)
+    except S3Error as e:
+        raise Exception(f"Failed to create multipart upload: {str(e)}")
+
+    parts = []
+    for part_number in range(1, part_count + 1):
+        # Part URLs include the unique upload id and are never asked for again,
+        # so caching them would only evict reusable download URLs
+        signed = _signed_url(
+            "PUT",
+            bucket_name,
+            object_name,
+            extra_query_params={"partNumber": str(part_number), "uploadId": upload_id},
+            cache=False
+        )
+        parts.append({"part_number": part_number, **signed})
+    return {"upload_id": upload_id, "parts": parts}
+
+
+def complete_presigned_multipart_upload(bucket_name: str, object_name: str, upload_id: str, parts: list) -> str:
+    """
+    Complete a multipart upload whose parts were sent through presigned URLs
+
+    Args:
+        bucket_name: MinIO bucket name
+        object_name: Object path in MinIO
+        upload_id: Upload id returned by create_presigned_multipart_upload
+        parts: List of {"part_number": int, "etag": str} in any order
+
+    Returns:
+        ETag of the completed object
+    """
+    ordered = sorted(parts, key=lambda part: int(part["part_number"]))
+    try:
+        result = minio_client._complete_multipart_upload(
+            bucket_name,
+            object_name,
+            upload_id,
+            [Part(int(part["part_number"]), str(part["etag"]).strip('"')) for part in ordered]
+        )
+    except S3Error as e:
+        raise Exception(f"Failed to complete multipart upload: {str(e)}")
+    presigned_url_cache.invalidate(bucket_name, object_name)
+    return result.etag
@@ -1,7 +1,14 @@
 import pika
 import os
 import json
+import time
+import queue
+import asyncio
+import functools
 import logging
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future
 from dotenv import load_dotenv
 from datetime import datetime
 
@@ -10,32 +17,35 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _rabbitmq_hosts() -> list:
+    # Try Docker host first, then localhost if that fails
+    return [
+        os.getenv("RABBITMQ_HOST", "rabbitmq"),  # Try Docker service name first
+        "localhost"  # Fallback to localhost
+    ]
+
+def _connection_parameters(host: str) -> pika.ConnectionParameters:
+    # Get environment variables with fallbacks
+    credentials = pika.PlainCredentials(
+        os.getenv("RABBITMQ_USER", "admin"),
+        os.getenv("RABBITMQ_PASSWORD", "password")
+    )
+    return pika.ConnectionParameters(
+        host=host,
+        port=5672,
+        credentials=credentials,
+        connection_attempts=3,
+        retry_delay=5,
+        heartbeat=600
+    )
+
 def get_rabbitmq_connection():
     """Create a RabbitMQ connection that works in both local and Docker environments"""
     try:
-        # Get environment variables with fallbacks
-        rabbitmq_user = os.getenv("RABBITMQ_USER", "admin")
-        rabbitmq_password = os.getenv("RABBITMQ_PASSWORD", "password")
-        
-        # Try Docker host first, then localhost if that fails
-        hosts_to_try = [
-            os.getenv("RABBITMQ_HOST", "rabbitmq"),  # Try Docker service name first
-            "localhost"  # Fallback to localhost
-        ]
-        
         last_exception = None
-        for host in hosts_to_try:
+        for host in _rabbitmq_hosts():
             try:
-                credentials = pika.PlainCredentials(rabbitmq_user, rabbitmq_password)
-                parameters = pika.ConnectionParameters(
-                    host=host,
-                    port=5672,
-                    credentials=credentials,
-                    connection_attempts=3,
-                    retry_delay=5,
-                    heartbeat=600
-                )
-                connection = pika.BlockingConnection(parameters)
+                connection = pika.BlockingConnection(_connection_parameters(host))
                 logger.info(f"Successfully connected to RabbitMQ at {host}")
                 return connection
             except Exception as e:
@@ -50,6 +60,399 @@ def get_rabbitmq_connection():
         logger.error(f"Error establishing connection: {str(e)}")
         raise
 
+# Upload event topology
+UPLOAD_EXCHANGE_NAME = "document_uploads"
+UPLOAD_QUEUE_NAME = "document_upload_queue"
+PUBLISHER_POOL_SIZE = int(os.getenv("RABBITMQ_PUBLISHER_POOL_SIZE", "4"))
+
+class _PublisherChannel:
+    """A pooled channel together with the connection it belongs to"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.channel = connection.channel()
+
+    @property
+    def is_open(self) -> bool:
+        return self.connection.is_open and self.channel.is_open
+
+    def close(self):
+        try:
+            if self.connection.is_open:
+                self.connection.close()
+        except Exception as e:
+            logger.warning(f"Error closing RabbitMQ connection: {str(e)}")
+
+class RabbitMQPublisher:
+    """
+    Long-lived publisher with a pool of channels, safe to use from worker threads
+
+    pika's BlockingConnection is not thread-safe, so each pooled channel owns its
+    connection and is checked out by one thread at a time; callers block while
+    every channel is busy. Channels are opened lazily and reopened transparently
+    when the broker drops them. The exchange, queue and binding are declared once
+    rather than on every publish.
+    """
+
+    def __init__(self, pool_size: int = PUBLISHER_POOL_SIZE, connection_factory=None):
+        self._connection_factory = connection_factory or get_rabbitmq_connection
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        for _ in range(pool_size):
+            self._pool.put(None)
+        self._topology_declared = False
+        self._topology_lock = threading.Lock()
+
+    def _declare_topology(self, channel):
+        with self._topology_lock:
+            if self._topology_declared:
+                return
+            channel.exchange_declare(exchange=UPLOAD_EXCHANGE_NAME, exchange_type='direct', durable=True)
+            channel.queue_declare(queue=UPLOAD_QUEUE_NAME, durable=True)
+            channel.queue_bind(exchange=UPLOAD_EXCHANGE_NAME, queue=UPLOAD_QUEUE_NAME, routing_key=UPLOAD_QUEUE_NAME)
+            self._topology_declared = True
+
+    def _open_channel(self) -> _PublisherChannel:
+        publisher_channel = _PublisherChannel(self._connection_factory())
+        self._declare_topology(publisher_channel.channel)
+        return publisher_channel
+
+    def publish(self, routing_key: str, body: str, exchange: str = UPLOAD_EXCHANGE_NAME):
+        """
+        Publish a persistent JSON message, reconnecting once if the channel was lost
+        
+        Args:
+            routing_key: Routing key of the message
+            body: Serialized JSON message body
+            exchange: Exchange to publish to
+        """
+        publisher_channel = self._pool.get()
+        try:
+            for attempt in (1, 2):
+                try:
+                    if publisher_channel is None or not publisher_channel.is_open:
+                        publisher_channel = self._open_channel()
+                    publisher_channel.channel.basic_publish(
+                        exchange=exchange,
+                        routing_key=routing_key,
+                        body=body,
+                        properties=pika.BasicProperties(
+                            delivery_mode=2,  # Make message persistent
+                            content_type='application/json'
+                        )
+                    )
+                    return
+                except pika.exceptions.AMQPError as e:
+                    if publisher_channel is not None:
+                        publisher_channel.close()
+                        publisher_channel = None
+                    # The broker may have been reset; redeclare on the next channel
+                    with self._topology_lock:
+                        self._topology_declared = False
+                    if attempt == 2:
+                        raise
+                    logger.warning(f"RabbitMQ channel lost, reconnecting: {str(e)}")
+        finally:
+            self._pool.put(publisher_channel)
+
+    def close(self):
+        """Close every pooled connection"""
+        while True:
+            try:
+                publisher_channel = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            if publisher_channel is not None:
+                publisher_channel.close()
+
+upload_event_publisher = RabbitMQPublisher()
+
+# Publisher confirms: when enabled, an upload event counts as sent only once
+# the broker has confirmed it
+PUBLISHER_CONFIRMS = os.getenv("RABBITMQ_PUBLISHER_CONFIRMS", "false").lower() == "true"
+CONFIRM_TIMEOUT_SECONDS = float(os.getenv("RABBITMQ_CONFIRM_TIMEOUT_SECONDS", "30"))
+MAX_UNCONFIRMED_MESSAGES = int(os.getenv("RABBITMQ_MAX_UNCONFIRMED_MESSAGES", "1000"))
+RECONNECT_DELAY_SECONDS = 5
+
+class PublishUnconfirmedError(TimeoutError):
+    """
+    The broker did not confirm a message within the confirm timeout
+
+    The message may already be on the wire and can still be delivered, so the
+    outcome is unknown rather than failed.
+    """
+
+class ConfirmingPublisher:
+    """
+    Pipelined publisher with broker confirms, safe to use from any thread
+
+    A dedicated thread owns a pika SelectConnection in confirm mode. Callers
+    enqueue messages and receive a Future; queued messages are flushed to the
+    channel in batches from the I/O loop without waiting for earlier confirms,
+    and the broker's cumulative (multiple=True) acks resolve every Future up to
+    the acknowledged delivery tag at once. At most max_unconfirmed messages are
+    in flight; further publishers wait up to the confirm timeout for a slot,
+    and publish_async does so without blocking the event loop. If the
+    connection drops, unconfirmed and unsent Futures fail, freeing their slots,
+    and the thread reconnects.
+    """
+
+    def __init__(self, connection_factory=None, max_unconfirmed: int = MAX_UNCONFIRMED_MESSAGES):
+        self._connection_factory = connection_factory or self._select_connection
+        self._in_flight = threading.BoundedSemaphore(max_unconfirmed)
+        self._lock = threading.Lock()
+        self._outbox = deque()
+        self._flush_scheduled = False
+        self._ready = False
+        # Only touched from the I/O loop thread
+        self._pending = OrderedDict()
+        self._next_delivery_tag = 1
+        self._connection = None
+        self._channel = None
+        self._host_index = 0
+        self._stopping = False
+        self._thread = None
+
+    # ------------------------------------------------------------------
+    # Caller side
+    # ------------------------------------------------------------------
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="rabbitmq-confirming-publisher", daemon=True)
+            self._thread.start()
+
+    def publish(self, routing_key: str, body: str, exchange: str = UPLOAD_EXCHANGE_NAME, timeout: float = CONFIRM_TIMEOUT_SECONDS) -> Future:
+        """
+        Queue a persistent JSON message for publishing
+        
+        Args:
+            routing_key: Routing key of the message
+            body: Serialized JSON message body
+            exchange: Exchange to publish to
+            timeout: Seconds to wait for an in-flight slot
+        
+        Returns:
+            Future resolved with the delivery tag once the broker acks the message
+        
+        Raises:
+            PublishUnconfirmedError: If no slot was freed within the timeout
+        """
+        if not self._in_flight.acquire(timeout=timeout):
+            raise PublishUnconfirmedError(f"No publish slot became free within {timeout} seconds")
+        return self._enqueue(exchange, routing_key, body)
+
+    async def publish_async(self, routing_key: str, body: str, exchange: str = UPLOAD_EXCHANGE_NAME, timeout: float = CONFIRM_TIMEOUT_SECONDS) -> Future:
+        """
+        Like publish, but waits for an in-flight slot off the event loop
+
+        Returns:
+            Future resolved with the delivery tag once the broker acks the message
+        
+        Raises:
+            PublishUnconfirmedError: If no slot was freed within the timeout
+        """
+        if not self._in_flight.acquire(blocking=False):
+            loop = asyncio.get_running_loop()
+            acquired = loop.run_in_executor(None, functools.partial(self._in_flight.acquire, timeout=timeout))
+            try:
+                got_slot = await asyncio.shield(acquired)
+            except asyncio.CancelledError:
+                # The executor thread may still take the slot; hand it back
+                acquired.add_done_callback(lambda done: done.result() and self._in_flight.release())
+                raise
+            if not got_slot:
+                raise PublishUnconfirmedError(f"No publish slot became free within {timeout} seconds")
+        return self._enqueue(exchange, routing_key, body)
+
+    def _enqueue(self, exchange: str, routing_key: str, body: str) -> Future:
+        """Queue a message whose in-flight slot the caller already holds"""
+        self.start()
+        future = Future()
+        future.add_done_callback(lambda _: self._in_flight.release())
+        with self._lock:
+            self._outbox.append((exchange, routing_key, body, future))
+            schedule = self._ready and not self._flush_scheduled
+            if schedule:
+                self._flush_scheduled = True
+            connection = self._connection
+        if schedule:
+            try:
+                connection.ioloop.add_callback_threadsafe(self._flush)
+            except Exception:
+                # The loop is going away; the outbox is flushed after reconnecting
+                with self._lock:
+                    self._flush_scheduled = False
+        return future
+
+    def close(self):
+        """Stop the I/O loop and fail anything still waiting to be sent"""
+        self._stopping = True
+        connection = self._connection
+        if connection is not None:
+            try:
+                connection.ioloop.add_callback_threadsafe(self._close_connection)
+            except Exception as e:
+                logger.warning(f"Error closing confirming publisher: {str(e)}")
+        self._fail_outbox(pika.exceptions.AMQPConnectionError("Publisher closed"))
+
+    def _fail_outbox(self, error: Exception):
+        """Fail messages that were never sent, which frees their in-flight slots"""
+        with self._lock:
+            outbox, self._outbox = self._outbox, deque()
+        for _, _, _, future in outbox:
+            if not future.done():
+                future.set_exception(error)
+
+    # ------------------------------------------------------------------
+    # I/O loop side
+    # ------------------------------------------------------------------
+    def _select_connection(self, on_open, on_open_error, on_close):
+        hosts = _rabbitmq_hosts()
+        host = hosts[self._host_index % len(hosts)]
+        self._host_index += 1
+        return pika.SelectConnection(
+            _connection_parameters(host),
+            on_open_callback=on_open,
+            on_open_error_callback=on_open_error,
+            on_close_callback=on_close
+        )
+
+    def _run(self):
+        while not self._stopping:
+            try:
+                self._connection = self._connection_factory(
+                    self._on_connection_open,
+                    self._on_connection_error,
+                    self._on_connection_closed
+                )
+                self._connection.ioloop.start()
+            except Exception as e:
+                logger.error(f"Confirming publisher loop failed: {str(e)}")
+                self._reset(e)
+            if not self._stopping:
+                time.sleep(RECONNECT_DELAY_SECONDS)
+
+    def _on_connection_open(self, connection):
+        logger.info("Confirming publisher connected to RabbitMQ")
+        connection.channel(on_open_callback=self._on_channel_open)
+
+    def _on_connection_error(self, connection, error):
+        logger.warning(f"Confirming publisher failed to connect: {str(error)}")
+        self._reset(error)
+        connection.ioloop.stop()
+
+    def _on_connection_closed(self, connection, reason):
+        if not self._stopping:
+            logger.warning(f"Confirming publisher connection closed: {str(reason)}")
+        self._reset(reason)
+        connection.ioloop.stop()
+
+    def _on_channel_open(self, channel):
+        self._channel = channel
+        channel.add_on_close_callback(self._on_channel_closed)
+        channel.exchange_declare(
+            exchange=UPLOAD_EXCHANGE_NAME,
+            exchange_type='direct',
+            durable=True,
+            callback=lambda _: channel.queue_declare(
+                queue=UPLOAD_QUEUE_NAME,
+                durable=True,
+                callback=lambda _: channel.queue_bind(
+                    queue=UPLOAD_QUEUE_NAME,
+                    exchange=UPLOAD_EXCHANGE_NAME,
+                    routing_key=UPLOAD_QUEUE_NAME,
+                    callback=lambda _: channel.confirm_delivery(
+                        self._on_delivery_confirmation,
+                        callback=lambda _: self._on_channel_ready()
+                    )
+                )
+            )
+        )
+
+    def _on_channel_ready(self):
+        self._next_delivery_tag = 1
+        with self._lock:
+            self._ready = True
+            self._flush_scheduled = True
+        self._flush()
+
+    def _on_channel_closed(self, channel, reason):
+        self._reset(reason)
+        if self._connection is not None and self._connection.is_open:
+            self._connection.close()
+
+    def _close_connection(self):
+        if self._connection is not None and self._connection.is_open:
+            self._connection.close()
+        elif self._connection is not None:
+            self._connection.ioloop.stop()
+
+    def _reset(self, reason):
+        with self._lock:
+            self._ready = False
+            self._flush_scheduled = False
+        self._channel = None
+        # Messages already handed to the broker have an unknown outcome
+        pending, self._pending = self._pending, OrderedDict()
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(pika.exceptions.AMQPConnectionError(f"Connection lost before confirm: {reason}"))
+        # Messages queued while disconnected would otherwise hold their slots
+        # until a connection succeeds, so publishers fail fast during outages
+        self._fail_outbox(pika.exceptions.AMQPConnectionError(f"Not connected to RabbitMQ: {reason}"))
+
+    def _flush(self):
+        with self._lock:
+            self._flush_scheduled = False
+            if not self._ready:
+                return
+            batch, self._outbox = self._outbox, deque()
+        properties = pika.BasicProperties(
+            delivery_mode=2,  # Make message persistent
+            content_type='application/json'
+        )
+        for exchange, routing_key, body, future in batch:
+            if future.cancelled():
+                # The caller gave up waiting before the message was sent
+                continue
+            delivery_tag = self._next_delivery_tag
+            self._next_delivery_tag += 1
+            self._pending[delivery_tag] = future
+            try:
+                self._channel.basic_publish(exchange=exchange, routing_key=routing_key, body=body, properties=properties)
+            except Exception as e:
+                self._pending.pop(delivery_tag, None)
+                future.set_exception(e)
+
+    def _on_delivery_confirmation(self, frame):
+        method = frame.method
+        acked = isinstance(method, pika.spec.Basic.Ack)
+        if method.multiple:
+            confirmed = []
+            while self._pending and next(iter(self._pending)) <= method.delivery_tag:
+                confirmed.append(self._pending.popitem(last=False))
+        else:
+            future = self._pending.pop(method.delivery_tag, None)
+            confirmed = [(method.delivery_tag, future)] if future else []
+        for delivery_tag, future in confirmed:
+            if future.done():
+                continue
+            if acked:
+                future.set_result(delivery_tag)
+            else:
+                future.set_exception(Exception(f"Message {delivery_tag} was rejected by the broker"))
+
+confirming_publisher = ConfirmingPublisher()
+
+def _document_upload_message(document_metadata: dict, file_path: str, upload_time: datetime) -> str:
+    return json.dumps({
+        "event_type": "document_uploaded",
+        "timestamp": upload_time.isoformat(),
+        "file_path": file_path,
+        "metadata": document_metadata
+    })
+
 def send_document_upload_message(document_metadata: dict, file_path: str, upload_time: datetime):
     """
     Send a RabbitMQ message when a document is uploaded
@@ -59,43 +462,62 @@ def send_document_upload_message(document_metadata: dict, file_path: str, upload
         file_path: Path to the uploaded file in MinIO
         upload_time: Timestamp when the upload occurred
     """
-    connection = None
     try:
-        connection = get_rabbitmq_connection()
-        channel = connection.channel()
-        
-        # Declare the exchange and queue
-        exchange_name = "document_uploads"
-        queue_name = "document_upload_queue"
-        
-        channel.exchange_declare(exchange=exchange_name, exchange_type='direct', durable=True)
-        channel.queue_declare(queue=queue_name, durable=True)
-        channel.queue_bind(exchange=exchange_name, queue=queue_name, routing_key=queue_name)
+        message = _document_upload_message(document_metadata, file_path, upload_time)
         
-        # Prepare the message
-        message = {
-            "event_type": "document_uploaded",
-            "timestamp": upload_time.isoformat(),
-            "file_path": file_path,
-            "metadata": document_metadata
-        }
-        
-        # Publish the message
-        channel.basic_publish(
-            exchange=exchange_name,
-            routing_key=queue_name,
-            body=json.dumps(message),
-            properties=pika.BasicProperties(
-                delivery_mode=2,  # Make message persistent
-                content_type='application/json'
-            )
-        )
+        if PUBLISHER_CONFIRMS:
+            # Block until the broker confirms the message
+            future = confirming_publisher.publish(routing_key=UPLOAD_QUEUE_NAME, body=message)
+            try:
+                future.result(CONFIRM_TIMEOUT_SECONDS)
+            except TimeoutError:
+                # Not cancelled: the message may already be on its way to the broker
+                raise PublishUnconfirmedError(f"Upload message for {file_path} was not confirmed in time")
+        else:
+            # Publish the message on a pooled channel
+            upload_event_publisher.publish(routing_key=UPLOAD_QUEUE_NAME, body=message)
         
         logger.info(f"Sent document upload message for file: {file_path}")
         
+    except PublishUnconfirmedError as e:
+        logger.warning(f"RabbitMQ message unconfirmed: {str(e)}")
+        raise
+    except Exception as e:
+        logger.error(f"Failed to send RabbitMQ message: {str(e)}")
+        raise
+
+async def send_document_upload_message_async(document_metadata: dict, file_path: str, upload_time: datetime):
+    """
+    Send a RabbitMQ upload message from async code
+    
+    With publisher confirms enabled the coroutine waits for the broker's confirm
+    without blocking the event loop, so many requests share one batch of confirms.
+    When no confirm arrives within RABBITMQ_CONFIRM_TIMEOUT_SECONDS it raises
+    PublishUnconfirmedError: the message is unconfirmed, not failed, and may
+    still be delivered.
+    
+    Args:
+        document_metadata: Dictionary containing document metadata
+        file_path: Path to the uploaded file in MinIO
+        upload_time: Timestamp when the upload occurred
+    """
+    if not PUBLISHER_CONFIRMS:
+        # The pooled publisher blocks on socket I/O, so keep it off the event loop
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, send_document_upload_message, document_metadata, file_path, upload_time)
+        return
+    try:
+        message = _document_upload_message(document_metadata, file_path, upload_time)
+        future = await confirming_publisher.publish_async(routing_key=UPLOAD_QUEUE_NAME, body=message)
+        try:
+            # Shielded so a timeout does not cancel a message that may already be sent
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), CONFIRM_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            raise PublishUnconfirmedError(f"Upload message for {file_path} was not confirmed in time")
+        logger.info(f"Sent document upload message for file: {file_path}")
+    except PublishUnconfirmedError as e:
+        logger.warning(f"RabbitMQ message unconfirmed: {str(e)}")
+        raise
     except Exception as e:
         logger.error(f"Failed to send RabbitMQ message: {str(e)}")
         raise
-    finally:
-        if connection and not connection.is_closed:
-            connection.close()
@@ -0,0 +1,195 @@
+import io
+import os
+import json
+import uuid
+from datetime import datetime
+from minio.datatypes import Part
+from minio.error import S3Error
+from minio.helpers import genheaders
+from dotenv import load_dotenv
+from app.services.minio_storage import (
+    minio_client,
+    ensure_bucket_exists,
+    UPLOAD_SESSION_PREFIX,
+    _is_missing_object_error,
+    _upload_part_with_retry
+)
+
+load_dotenv()
+
+# Session state lives next to the documents (under UPLOAD_SESSION_PREFIX) so
+# any storage-service instance can resume an upload once the previous writer is
+# gone. Sessions are saved with plain overwrites, so chunks of one session must
+# not be sent to two instances at the same time; the chunk endpoint only
+# serializes requests within one worker. Every chunk is committed as one
+# multipart part, so the part size (at least the 5 MiB S3 minimum) is the
+# resume granularity.
+RESUMABLE_PART_SIZE = max(int(os.getenv("RESUMABLE_PART_SIZE", str(8 * 1024 * 1024))), 5 * 1024 * 1024)
+MAX_UPLOAD_PARTS = 10000
+
+
+class OffsetMismatchError(Exception):
+    """Raised when a chunk does not start at the session's committed offset"""
+
+    def __init__(self, offset: int):
+        super().__init__(f"Upload is at offset {offset}")
+        self.offset = offset
+
+
+def _session_object_name(session_id: str) -> str:
+    return f"{UPLOAD_SESSION_PREFIX}/{session_id}.json"
+
+
+def _save_session(session: dict):
+    body = json.dumps(session).encode()
+    minio_client.put_object(
+        session["bucket_name"],
+        _session_object_name(session["session_id"]),
+        io.BytesIO(body),
+        len(body),
+        content_type="application/json"
+    )
+
+
+def create_upload_session(bucket_name: str, object_name: str, total_size: int, content_type: str = None, metadata: dict = None) -> dict:
+    """
+    Start a resumable upload backed by a MinIO multipart upload
+
+    Args:
+        bucket_name: MinIO bucket name
+        object_name: Object path the upload completes to
+        total_size: Size of the whole file in bytes
+        content_type: Optional content type of the final object
+        metadata: Optional document metadata, stored on the object and sent on finalize
+
+    Returns:
+        The session dictionary
+    """
+    if total_size < 1:
+        raise ValueError("total_size must be positive")
+    if -(-total_size // RESUMABLE_PART_SIZE) > MAX_UPLOAD_PARTS:
+        raise ValueError(f"total_size exceeds {MAX_UPLOAD_PARTS} parts of {RESUMABLE_PART_SIZE} bytes")
+    try:
+        ensure_bucket_exists(bucket_name)
+        headers = genheaders({key: str(value) for key, value in (metadata or {}).items()}, None, None, None, False)
+        headers["Content-Type"] = content_type or "application/octet-stream"
+        upload_id = minio_client._create_multipart_upload(bucket_name, object_name, headers)
+        session = {
+            "session_id": uuid.uuid4().hex,
+            "bucket_name": bucket_name,
+            "object_name": object_name,
+            "upload_id": upload_id,
+            "total_size": total_size,
+            "part_size": RESUMABLE_PART_SIZE,
+            "offset": 0,
+            "parts": [],
+            "content_type": content_type,
+            "metadata": metadata or {},
+            "created_at": datetime.now().isoformat()
+        }
+        _save_session(session)
+        return session
+    except S3Error as e:
+        raise Exception(f"Failed to create upload session: {str(e)}")
+
+
+def get_upload_session(bucket_name: str, session_id: str) -> dict:
+    """
+    Load a session's committed state
+
+    Raises:
+        FileNotFoundError: If the session does not exist or was already finalized
+    """
+    try:
+        response = minio_client.get_object(bucket_name, _session_object_name(session_id))
+        try:
+            return json.loads(response.read())
+        finally:
+            response.close()
+            response.release_conn()
+    except S3Error as e:
+        if _is_missing_object_error(e):
+            raise FileNotFoundError(f"Upload session {session_id} not found")
+        raise Exception(f"Failed to load upload session: {str(e)}")
+
+
+def upload_session_part(session: dict, offset: int, data: bytes) -> dict:
+    """
+    Commit one part of a resumable upload at the given offset
+
+    A part must be exactly `part_size` bytes, except the one that ends the
+    file. Once the part is stored the session offset advances and is saved.
+
+    Args:
+        session: Session dictionary from create/get_upload_session
+        offset: Byte offset the part starts at
+        data: Part content
+
+    Returns:
+        The updated session dictionary
+    """
+    if offset != session["offset"]:
+        raise OffsetMismatchError(session["offset"])
+    end = offset + len(data)
+    if end > session["total_size"]:
+        raise ValueError("Chunk extends past the declared total_size")
+    if len(data) != session["part_size"] and end != session["total_size"]:
+        raise ValueError(f"Parts must be {session['part_size']} bytes except the last one")
+
+    part_number = len(session["parts"]) + 1
+    try:
+        part = _upload_part_with_retry(session["bucket_name"], session["object_name"], session["upload_id"], part_number, data)
+    except S3Error as e:
+        raise Exception(f"Failed to upload part {part_number}: {str(e)}")
+    session["parts"].append({"part_number": part_number, "etag": part.etag, "size": len(data)})
+    session["offset"] = end
+    _save_session(session)
+    return session
+
+
+def complete_upload_session(session: dict) -> str:
+    """
+    Assemble the uploaded parts into the final object
+
+    The session is kept, marked as completed, until `drop_upload_session` is
+    called, so a caller that fails after this point (e.g. while publishing the
+    upload event) can retry the completion. Completing again only returns the
+    recorded ETag.
+
+    Returns:
+        ETag of the completed object
+    """
+    if session.get("etag"):
+        return session["etag"]
+    if session["offset"] != session["total_size"]:
+        raise OffsetMismatchError(session["offset"])
+    try:
+        result = minio_client._complete_multipart_upload(
+            session["bucket_name"],
+            session["object_name"],
+            session["upload_id"],
+            [Part(part["part_number"], part["etag"]) for part in session["parts"]]
+        )
+        session["etag"] = result.etag
+        _save_session(session)
+        return result.etag
+    except S3Error as e:
+        raise Exception(f"Failed to complete upload session: {str(e)}")
+
+
+def drop_upload_session(session: dict):
+    """Delete the state of a finished session"""
+    try:
+        minio_client.remove_object(session["bucket_name"], _session_object_name(session["session_id"]))
+    except S3Error as e:
+        raise Exception(f"Failed to drop upload session: {str(e)}")
+
+
+def abort_upload_session(session: dict):
+    """Abort the multipart upload, discarding its parts, and drop the session"""
+    try:
+        minio_client._abort_multipart_upload(session["bucket_name"], session["object_name"], session["upload_id"])
+    except S3Error as e:
+        if e.code != "NoSuchUpload":
+            raise Exception(f"Failed to abort upload session: {str(e)}")
+    drop_upload_session(session)
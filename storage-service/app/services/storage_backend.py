@@ -0,0 +1,106 @@
+import os
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Iterator, Optional, Protocol
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Which object store backs the service ("minio" or "s3")
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "minio").lower()
+# Upper bound on blocking object-store calls running at once per worker
+STORAGE_IO_CONCURRENCY = int(os.getenv("STORAGE_IO_CONCURRENCY", "32"))
+
+
+class StorageBackend(Protocol):
+    """Blocking object-store operations shared by the MinIO and S3 implementations"""
+
+    def upload_stream(self, stream, bucket_name: str, object_name: str, metadata: dict = None, content_type: str = None) -> dict:
+        """Upload a stream; returns the object URL, file size and SHA-256 checksum"""
+
+    def upload_file(self, file_path: str, bucket_name: str, object_name: str, metadata: dict = None) -> str:
+        """Upload a local file; returns the object URL"""
+
+    def delete(self, bucket_name: str, object_name: str) -> bool:
+        """Delete an object"""
+
+    def iter_bulk_delete(self, bucket_name: str, object_names: list = None, prefix: str = None) -> Iterator[dict]:
+        """Delete objects by name or prefix in batches, yielding per-batch deleted names and errors"""
+
+    def get_object_info(self, bucket_name: str, object_name: str) -> dict:
+        """Return object_name, size, etag, content_type, last_modified and codec; raises FileNotFoundError"""
+
+    def iter_object_chunks(self, bucket_name: str, object_name: str, offset: int = 0, length: int = 0, chunk_size: int = 64 * 1024, codec: str = None) -> Iterator[bytes]:
+        """Yield an object, or a byte range of its uncompressed content, in chunks"""
+
+
+class AsyncStorageBackend:
+    """
+    Async facade over a blocking StorageBackend
+
+    Every call runs on a dedicated thread pool with `max_concurrency` workers, so
+    a slow object-store request only occupies one worker and never the event
+    loop; calls beyond the limit wait for a free worker instead of piling up
+    threads.
+    """
+
+    def __init__(self, backend: StorageBackend, max_concurrency: int = STORAGE_IO_CONCURRENCY):
+        self.backend = backend
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="storage-io")
+
+    async def run(self, function, *args, **kwargs):
+        """Run any blocking call on the storage thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(function, *args, **kwargs))
+
+    async def upload_stream(self, stream, bucket_name: str, object_name: str, metadata: dict = None, content_type: str = None) -> dict:
+        return await self.run(self.backend.upload_stream, stream, bucket_name, object_name, metadata, content_type)
+
+    async def upload_file(self, file_path: str, bucket_name: str, object_name: str, metadata: dict = None) -> str:
+        return await self.run(self.backend.upload_file, file_path, bucket_name, object_name, metadata)
+
+    async def delete(self, bucket_name: str, object_name: str) -> bool:
+        return await self.run(self.backend.delete, bucket_name, object_name)
+
+    async def iter_bulk_delete(self, bucket_name: str, object_names: list = None, prefix: str = None) -> AsyncIterator[dict]:
+        """Yield per-batch delete results, running each batch on the storage thread pool"""
+        batches = await self.run(self.backend.iter_bulk_delete, bucket_name, object_names, prefix)
+        async for batch in self.iterate(batches):
+            yield batch
+
+    async def get_object_info(self, bucket_name: str, object_name: str) -> dict:
+        return await self.run(self.backend.get_object_info, bucket_name, object_name)
+
+    async def iter_object_chunks(self, bucket_name: str, object_name: str, offset: int = 0, length: int = 0, chunk_size: int = 256 * 1024, codec: str = None) -> AsyncIterator[bytes]:
+        """Yield chunks of an object, fetching each one on the storage thread pool"""
+        chunks = await self.run(self.backend.iter_object_chunks, bucket_name, object_name, offset, length, chunk_size, codec)
+        async for chunk in self.iterate(chunks):
+            yield chunk
+
+    async def iterate(self, iterator):
+        """Drive a blocking generator from the event loop, one item per executor call"""
+        sentinel = object()
+        try:
+            while True:
+                item = await self.run(next, iterator, sentinel)
+                if item is sentinel:
+                    break
+                yield item
+        finally:
+            await self.run(iterator.close)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+def get_storage_backend(name: Optional[str] = None) -> StorageBackend:
+    """Return the configured blocking backend; the S3 client is only imported when selected"""
+    name = (name or STORAGE_BACKEND).lower()
+    if name == "s3":
+        from app.services.S3_storage import S3StorageBackend
+        return S3StorageBackend()
+    if name == "minio":
+        from app.services.minio_storage import MinioStorageBackend
+        return MinioStorageBackend()
+    raise ValueError(f"Unknown storage backend: {name}")
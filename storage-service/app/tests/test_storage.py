@@ -0,0 +1,427 @@
+import sys
+import asyncio
+import inspect
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+import pika
+import pytest
+from minio import Minio
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from app.services import minio_storage
+from app.services.admission_control import AdmissionRejected, UploadAdmissionController
+from app.services.object_cache import ObjectDiskCache
+from app.services import rabbitmq_utils
+from app.services.rabbitmq_utils import ConfirmingPublisher, PublishUnconfirmedError
+from app.services import resumable_uploads
+from app.services.resumable_uploads import OffsetMismatchError, upload_session_part
+from app.services.storage_backend import AsyncStorageBackend
+from app.utils.compression import CompressingReader, PrefixedReader, is_compressible_type, iter_decompressed, zstandard
+from app.utils.s3_utils import etag_matches, iter_batches, parse_range_header
+
+
+def test_parse_range_header_handles_closed_open_and_suffix_ranges():
+    assert parse_range_header("bytes=0-99", 1000) == (0, 99)
+    assert parse_range_header("bytes=900-", 1000) == (900, 999)
+    assert parse_range_header("bytes=-100", 1000) == (900, 999)
+    assert parse_range_header("bytes=500-5000", 1000) == (500, 999)
+
+
+def test_parse_range_header_ignores_malformed_and_multi_ranges():
+    assert parse_range_header(None, 1000) is None
+    assert parse_range_header("items=0-1", 1000) is None
+    assert parse_range_header("bytes=0-1,5-9", 1000) is None
+    assert parse_range_header("bytes=9-1", 1000) is None
+
+
+def test_parse_range_header_rejects_unsatisfiable_range():
+    with pytest.raises(ValueError):
+        parse_range_header("bytes=1000-", 1000)
+
+
+def test_etag_matches_uses_weak_comparison():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc", "def"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"def"', '"abc"')
+
+
+def test_iter_batches_splits_lazily_into_bounded_lists():
+    assert list(iter_batches(iter(range(5)), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(iter_batches([], 1000)) == []
+
+
+def test_async_storage_backend_streams_chunks_and_closes_source():
+    closed = []
+
+    class FakeBackend:
+        def iter_object_chunks(self, bucket_name, object_name, offset=0, length=0, chunk_size=64 * 1024, codec=None):
+            try:
+                yield b"ab"
+                yield b"cd"
+            finally:
+                closed.append(object_name)
+
+    async def collect():
+        storage = AsyncStorageBackend(FakeBackend(), max_concurrency=2)
+        try:
+            return [chunk async for chunk in storage.iter_object_chunks("documents", "a.pdf")]
+        finally:
+            storage.shutdown()
+
+    assert asyncio.run(collect()) == [b"ab", b"cd"]
+    assert closed == ["a.pdf"]
+
+
+def test_object_disk_cache_evicts_lru_and_keeps_pinned_files(tmp_path):
+    cache = ObjectDiskCache(str(tmp_path), max_bytes=20, max_object_bytes=20)
+    for object_name in ("a.txt", "b.txt"):
+        b"".join(cache.iter_fill("documents", object_name, "e1", [b"0123456789"]))
+    pinned = cache.get("documents", "b.txt", "e1")
+    b"".join(cache.iter_fill("documents", "c.txt", "e1", [b"0123456789"]))
+
+    assert cache.get("documents", "a.txt", "e1") is None
+    assert cache.get("documents", "b.txt", "e2") is None
+    cache.invalidate("documents", "b.txt")
+    with open(pinned.path, "rb") as file_in:
+        assert file_in.read() == b"0123456789"
+    cache.release(pinned)
+    assert not Path(pinned.path).exists()
+
+    hit = cache.get("documents", "c.txt", "e1")
+    cache.release(hit, hit.size)
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["bytes_saved"], stats["evictions"]) == (2, 2, 10, 1)
+
+
+def test_object_disk_cache_iter_fill_caches_only_complete_streams(tmp_path):
+    cache = ObjectDiskCache(str(tmp_path), max_bytes=20, max_object_bytes=20)
+    aborted = cache.iter_fill("documents", "a.txt", "e1", [b"01234", b"56789"])
+    assert next(aborted) == b"01234"
+    aborted.close()
+    assert cache.get("documents", "a.txt", "e1") is None
+    assert list(Path(tmp_path, "objects").iterdir()) == []
+
+    assert b"".join(cache.iter_fill("documents", "a.txt", "e1", [b"01234", b"56789"])) == b"0123456789"
+    entry = cache.get("documents", "a.txt", "e1")
+    assert entry.readers == 1 and entry.size == 10
+    cache.release(entry, entry.size)
+
+
+def test_is_compressible_type_accepts_text_formats_only():
+    assert is_compressible_type("text/csv")
+    assert is_compressible_type("application/xml; charset=utf-8")
+    assert is_compressible_type("application/atom+xml")
+    assert not is_compressible_type("application/pdf")
+    assert not is_compressible_type(None)
+
+
+@pytest.mark.skipif(zstandard is None, reason="zstandard is not installed")
+def test_compressed_stream_round_trips_and_serves_ranges():
+    data = b"".join(b"%d,widget,acme\n" % i for i in range(5000))
+    source = io.BytesIO(data)
+    reader = CompressingReader(PrefixedReader(source.read(100), source), level=3, input_chunk_size=4096)
+    compressed = b"".join(iter(lambda: reader.read(1000), b""))
+    assert len(compressed) < len(data)
+
+    chunks = [compressed[i:i + 512] for i in range(0, len(compressed), 512)]
+    assert b"".join(iter_decompressed(chunks)) == data
+    assert b"".join(iter_decompressed(chunks, offset=30000, length=100)) == data[30000:30100]
+
+
+def test_upload_session_part_rejects_out_of_order_and_partial_chunks():
+    session = {"offset": 10, "total_size": 100, "part_size": 10, "parts": []}
+    with pytest.raises(OffsetMismatchError) as error:
+        upload_session_part(session, 0, b"x" * 10)
+    assert error.value.offset == 10
+    with pytest.raises(ValueError):
+        upload_session_part(session, 10, b"x" * 5)
+    with pytest.raises(ValueError):
+        upload_session_part(session, 10, b"x" * 95)
+
+
+def test_complete_upload_session_can_be_retried_until_the_session_is_dropped(monkeypatch):
+    class FakeMinio:
+        def __init__(self):
+            self.completed = 0
+            self.saved = []
+            self.removed = []
+
+        def _complete_multipart_upload(self, bucket_name, object_name, upload_id, parts):
+            self.completed += 1
+            return SimpleNamespace(etag="e1")
+
+        def put_object(self, bucket_name, object_name, data, length, content_type=None):
+            self.saved.append(object_name)
+
+        def remove_object(self, bucket_name, object_name):
+            self.removed.append(object_name)
+
+    client = FakeMinio()
+    monkeypatch.setattr(resumable_uploads, "minio_client", client)
+    session = {
+        "session_id": "s1",
+        "bucket_name": "documents",
+        "object_name": "a.pdf",
+        "upload_id": "u1",
+        "offset": 10,
+        "total_size": 10,
+        "parts": [{"part_number": 1, "etag": "p1", "size": 10}]
+    }
+
+    assert resumable_uploads.complete_upload_session(session) == "e1"
+    assert resumable_uploads.complete_upload_session(session) == "e1"
+    assert client.completed == 1
+    assert client.saved == [".upload-sessions/s1.json"] and client.removed == []
+    resumable_uploads.drop_upload_session(session)
+    assert client.removed == [".upload-sessions/s1.json"]
+
+
+def test_bulk_delete_never_removes_upload_session_state(monkeypatch):
+    class FakeMinio:
+        def __init__(self):
+            self.objects = {".upload-sessions/s1.json", ".old/a.pdf", "b.pdf"}
+
+        def list_objects(self, bucket_name, prefix=None, recursive=False):
+            return [SimpleNamespace(object_name=name) for name in sorted(self.objects) if name.startswith(prefix)]
+
+        def remove_objects(self, bucket_name, delete_objects):
+            for delete_object in delete_objects:
+                self.objects.discard(delete_object.name)
+            return []
+
+    client = FakeMinio()
+    monkeypatch.setattr(minio_storage, "minio_client", client)
+    monkeypatch.setattr(minio_storage, "CONTENT_ADDRESSED_STORAGE", False)
+
+    results = list(minio_storage.iter_bulk_delete("documents", prefix="."))
+    assert [result["deleted"] for result in results] == [[".old/a.pdf"]]
+    results = list(minio_storage.iter_bulk_delete("documents", object_names=[".upload-sessions/s1.json", "b.pdf"]))
+    assert results[0]["deleted"] == ["b.pdf"]
+    assert [error["object_name"] for error in results[0]["errors"]] == [".upload-sessions/s1.json"]
+    assert client.objects == {".upload-sessions/s1.json"}
+
+
+def test_upload_admission_queues_in_order_and_times_out():
+    async def scenario():
+        controller = UploadAdmissionController(
+            max_concurrent=4, max_inflight_bytes=100, max_queue_length=1, queue_timeout=0.05, retry_after=3
+        )
+        first = await controller.acquire(80)
+        waiting = asyncio.ensure_future(controller.acquire(50))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected):
+            await controller.acquire(10)
+        assert controller.stats()["queue_depth"] == 1
+
+        controller.release(first)
+        second = await waiting
+        assert controller.in_flight_bytes == 50
+
+        third = await controller.acquire(40)
+        with pytest.raises(AdmissionRejected) as error:
+            await controller.acquire(20)
+        assert error.value.retry_after == 3
+        controller.release(second)
+        controller.release(third)
+        return controller.stats()
+
+    stats = asyncio.run(scenario())
+    assert (stats["in_flight"], stats["admitted"], stats["rejected_queue_full"], stats["rejected_timeout"]) == (0, 3, 1, 1)
+
+
+class FakeMultipartMinio:
+    """Records the private multipart calls multipart_upload makes"""
+
+    def __init__(self, failing_part: int = None):
+        self.failing_part = failing_part
+        self.uploaded = {}
+        self.completed = None
+        self.aborted = False
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def _create_multipart_upload(self, bucket_name, object_name, headers):
+        assert headers["Content-Type"] == "text/plain"
+        return "upload-1"
+
+    def _upload_part(self, bucket_name, object_name, data, headers, upload_id, part_number):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            # Later parts finish first, so results arrive out of order
+            time.sleep(0.02 / part_number)
+            if part_number == self.failing_part:
+                raise ConnectionError("part upload failed")
+            self.uploaded[part_number] = data
+            return f"etag-{part_number}"
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _complete_multipart_upload(self, bucket_name, object_name, upload_id, parts):
+        self.completed = [(part.part_number, part.etag) for part in parts]
+        return SimpleNamespace(etag="final")
+
+    def _abort_multipart_upload(self, bucket_name, object_name, upload_id):
+        self.aborted = True
+
+
+@pytest.fixture
+def small_parts(monkeypatch):
+    monkeypatch.setattr(minio_storage, "UPLOAD_PART_SIZE", 4)
+    monkeypatch.setattr(minio_storage, "UPLOAD_PARTS_PER_UPLOAD", 2)
+    monkeypatch.setattr(minio_storage, "UPLOAD_PART_RETRIES", 1)
+    # More workers than the per-upload limit, so the limit is what is tested
+    executor = ThreadPoolExecutor(max_workers=4)
+    monkeypatch.setattr(minio_storage, "_part_upload_executor", executor)
+    yield
+    executor.shutdown(wait=True)
+
+
+def test_multipart_upload_completes_parts_in_order_within_the_per_upload_limit(monkeypatch, small_parts):
+    client = FakeMultipartMinio()
+    monkeypatch.setattr(minio_storage, "minio_client", client)
+    data = bytes(range(26))
+
+    assert minio_storage.multipart_upload(io.BytesIO(data), "documents", "a.txt", content_type="text/plain") == "final"
+    assert client.completed == [(number, f"etag-{number}") for number in range(1, 8)]
+    assert b"".join(client.uploaded[number] for number in range(1, 8)) == data
+    assert client.max_in_flight == 2
+    assert not client.aborted
+
+
+def test_multipart_upload_aborts_when_a_part_keeps_failing(monkeypatch, small_parts):
+    client = FakeMultipartMinio(failing_part=3)
+    monkeypatch.setattr(minio_storage, "minio_client", client)
+
+    with pytest.raises(ConnectionError):
+        minio_storage.multipart_upload(io.BytesIO(bytes(40)), "documents", "a.txt", content_type="text/plain")
+    assert client.aborted
+    assert client.completed is None
+
+
+def test_private_minio_multipart_helpers_keep_the_signatures_used():
+    # multipart_upload, resumable and presigned uploads call these positionally
+    expected = {
+        "_create_multipart_upload": ["self", "bucket_name", "object_name", "headers"],
+        "_upload_part": ["self", "bucket_name", "object_name", "data", "headers", "upload_id", "part_number"],
+        "_complete_multipart_upload": ["self", "bucket_name", "object_name", "upload_id", "parts", "ssec"],
+        "_abort_multipart_upload": ["self", "bucket_name", "object_name", "upload_id"],
+    }
+    for name, parameters in expected.items():
+        assert list(inspect.signature(getattr(Minio, name)).parameters) == parameters, name
+
+
+def test_bucket_registry_forgets_buckets_after_the_ttl():
+    registry = minio_storage.BucketRegistry(ttl=60)
+    registry.mark_known("documents")
+    assert registry.is_known("documents")
+    registry.invalidate("documents")
+    assert not registry.is_known("documents")
+
+    expired = minio_storage.BucketRegistry(ttl=0)
+    expired.mark_known("documents")
+    assert not expired.is_known("documents")
+
+
+def test_blob_deleted_during_a_concurrent_upload_is_restored(monkeypatch):
+    checksum = "ab" * 32
+    blob_name = minio_storage.blob_object_name(checksum)
+    marker_name = minio_storage._reference_marker_name(checksum, "a.pdf")
+
+    class FakeMinio:
+        def __init__(self):
+            self.objects = {blob_name: b"data"}
+
+        def stat_object(self, bucket_name, object_name):
+            if object_name not in self.objects:
+                raise minio_storage.S3Error("NoSuchKey", "missing", object_name, None, None, None)
+            return SimpleNamespace(metadata={"x-amz-meta-storage-codec": "zstd"}, content_type="text/plain")
+
+        def compose_object(self, bucket_name, object_name, sources, metadata=None):
+            assert metadata == {"storage-codec": "zstd", "Content-Type": "text/plain"}
+            self.objects[object_name] = self.objects[sources[0].object_name]
+
+        def remove_object(self, bucket_name, object_name):
+            self.objects.pop(object_name, None)
+            if object_name == blob_name:
+                # A writer adds its reference marker while the blob is being deleted
+                self.objects[marker_name] = b""
+
+        def list_objects(self, bucket_name, prefix=None):
+            return [SimpleNamespace(object_name=name) for name in self.objects if name.startswith(prefix)]
+
+    client = FakeMinio()
+    monkeypatch.setattr(minio_storage, "minio_client", client)
+
+    assert not minio_storage._delete_unreferenced_blob("documents", checksum)
+    assert client.objects[blob_name] == b"data"
+    assert not any(name.startswith(minio_storage.BLOB_TRASH_PREFIX) for name in client.objects)
+
+
+def _connecting_broker():
+    """Connection factory whose connection never opens until the publisher closes it"""
+    closed = threading.Event()
+
+    def factory(on_open, on_open_error, on_close):
+        ioloop = SimpleNamespace(start=closed.wait, stop=closed.set, add_callback_threadsafe=lambda _: closed.set())
+        return SimpleNamespace(ioloop=ioloop, is_open=False)
+
+    return factory
+
+
+def test_publish_async_waits_for_an_in_flight_slot_without_blocking_the_loop():
+    publisher = ConfirmingPublisher(connection_factory=_connecting_broker(), max_unconfirmed=1)
+    first = publisher.publish("uploads", "{}")
+
+    async def scenario():
+        waiting = asyncio.ensure_future(publisher.publish_async("uploads", "{}"))
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        first.set_result(1)
+        return await asyncio.wait_for(waiting, 1)
+
+    try:
+        second = asyncio.run(scenario())
+        assert not second.done()
+    finally:
+        publisher.close()
+
+
+def test_publish_gives_up_on_a_slot_after_the_timeout():
+    publisher = ConfirmingPublisher(connection_factory=_connecting_broker(), max_unconfirmed=1)
+    publisher.publish("uploads", "{}")
+    try:
+        with pytest.raises(PublishUnconfirmedError):
+            publisher.publish("uploads", "{}", timeout=0.05)
+        with pytest.raises(PublishUnconfirmedError):
+            asyncio.run(publisher.publish_async("uploads", "{}", timeout=0.05))
+    finally:
+        publisher.close()
+
+
+def test_messages_queued_during_an_outage_fail_and_free_their_slots(monkeypatch):
+    monkeypatch.setattr(rabbitmq_utils, "RECONNECT_DELAY_SECONDS", 0.01)
+
+    def unavailable_broker(on_open, on_open_error, on_close):
+        raise ConnectionError("broker unavailable")
+
+    publisher = ConfirmingPublisher(connection_factory=unavailable_broker, max_unconfirmed=1)
+    try:
+        first = publisher.publish("uploads", "{}")
+        with pytest.raises(pika.exceptions.AMQPConnectionError):
+            first.result(1)
+        assert publisher._in_flight.acquire(timeout=1)
+    finally:
+        publisher.close()
@@ -0,0 +1,122 @@
+import mimetypes
+
+try:
+    import zstandard
+except ImportError:  # optional dependency, compression is skipped without it
+    zstandard = None
+
+ZSTD_CODEC = "zstd"
+
+# Formats that are stored as plain text; zip-based office formats (docx, xlsx)
+# are already deflate-compressed and are not listed here
+COMPRESSIBLE_CONTENT_TYPES = {
+    "application/json",
+    "application/xml",
+    "application/csv",
+    "application/x-ndjson",
+    "application/yaml",
+    "application/x-yaml",
+    "application/sql",
+    "application/rtf",
+    "image/svg+xml",
+}
+
+
+def guess_content_type(object_name: str) -> str:
+    """Guess a content type from an object name, defaulting to application/octet-stream"""
+    return mimetypes.guess_type(object_name)[0] or "application/octet-stream"
+
+
+def is_compressible_type(content_type: str) -> bool:
+    """True for text-like content types worth probing for compression"""
+    if not content_type:
+        return False
+    media_type = content_type.split(";")[0].strip().lower()
+    return (
+        media_type.startswith("text/")
+        or media_type in COMPRESSIBLE_CONTENT_TYPES
+        or media_type.endswith(("+xml", "+json"))
+    )
+
+
+def compression_ratio(sample: bytes, level: int) -> float:
+    """Compressed size of a sample divided by its original size"""
+    if not sample:
+        return 1.0
+    return len(zstandard.ZstdCompressor(level=level).compress(sample)) / len(sample)
+
+
+class PrefixedReader:
+    """File-like reader that replays bytes already read from a stream before the rest of it"""
+
+    def __init__(self, prefix: bytes, stream):
+        self._prefix = prefix
+        self._stream = stream
+
+    def read(self, size: int = -1) -> bytes:
+        if not self._prefix:
+            return self._stream.read(size)
+        if size is None or size < 0:
+            data, self._prefix = self._prefix + self._stream.read(), b""
+            return data
+        data, self._prefix = self._prefix[:size], self._prefix[size:]
+        return data
+
+
+class CompressingReader:
+    """
+    File-like reader that yields the zstd-compressed form of a stream
+
+    Input is pulled from the wrapped stream only as compressed output is
+    requested, so memory use stays bounded by the read size.
+    """
+
+    def __init__(self, stream, level: int, input_chunk_size: int = 1024 * 1024):
+        self._stream = stream
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        self._input_chunk_size = input_chunk_size
+        self._buffer = bytearray()
+        self._finished = False
+
+    def read(self, size: int = -1) -> bytes:
+        while not self._finished and (size is None or size < 0 or len(self._buffer) < size):
+            chunk = self._stream.read(self._input_chunk_size)
+            if chunk:
+                self._buffer += self._compressor.compress(chunk)
+            else:
+                self._buffer += self._compressor.flush()
+                self._finished = True
+        if size is None or size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+
+def iter_decompressed(chunks, offset: int = 0, length: int = 0):
+    """
+    Decompress a zstd stream chunk by chunk, optionally returning only a byte range
+
+    Compressed data cannot be seeked into, so a range is served by
+    decompressing from the start and discarding the first `offset` bytes.
+
+    Args:
+        chunks: Iterable of compressed bytes
+        offset: Start offset in the decompressed data
+        length: Number of decompressed bytes to return; 0 returns the rest
+    """
+    decompressor = zstandard.ZstdDecompressor().decompressobj()
+    remaining = length or None
+    for chunk in chunks:
+        data = decompressor.decompress(chunk)
+        if offset:
+            skipped = min(offset, len(data))
+            data = data[skipped:]
+            offset -= skipped
+        if remaining is not None:
+            data = data[:remaining]
+            remaining -= len(data)
+        if data:
+            yield data
+        if remaining == 0:
+            return
@@ -0,0 +1,92 @@
+import hashlib
+from itertools import islice
+
+
+class HashingReader:
+    """
+    File-like wrapper that computes the size and SHA-256 of a stream while it is read
+
+    The wrapped stream is consumed exactly once, so callers can hand this reader
+    straight to an object store client and read `size` / `hexdigest()` afterwards
+    without a second pass over the data.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._sha256 = hashlib.sha256()
+        self.size = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._stream.read(size)
+        if chunk:
+            self._sha256.update(chunk)
+            self.size += len(chunk)
+        return chunk
+
+    def hexdigest(self) -> str:
+        """Return the SHA-256 of everything read so far"""
+        return self._sha256.hexdigest()
+
+
+def parse_range_header(range_header: str, object_size: int):
+    """
+    Parse a single-range HTTP Range header against an object size
+
+    Args:
+        range_header: Value of the Range header, e.g. "bytes=0-1023", "bytes=-500"
+        object_size: Total size of the object in bytes
+
+    Returns:
+        (start, end) inclusive byte offsets, or None when the header should be
+        ignored (missing, malformed, or a multi-range request)
+
+    Raises:
+        ValueError: If the range is syntactically valid but cannot be satisfied
+    """
+    if not range_header or not range_header.startswith("bytes="):
+        return None
+    spec = range_header[len("bytes="):].strip()
+    if "," in spec or "-" not in spec:
+        return None
+
+    start_text, end_text = (part.strip() for part in spec.split("-", 1))
+    if not start_text and not end_text:
+        return None
+    if (start_text and not start_text.isdigit()) or (end_text and not end_text.isdigit()):
+        return None
+
+    if not start_text:
+        # Suffix range: the last N bytes
+        suffix_length = int(end_text)
+        if suffix_length == 0 or object_size == 0:
+            raise ValueError("Unsatisfiable range")
+        return max(object_size - suffix_length, 0), object_size - 1
+
+    start = int(start_text)
+    if end_text and int(end_text) < start:
+        return None
+    if start >= object_size:
+        raise ValueError("Unsatisfiable range")
+    end = int(end_text) if end_text else object_size - 1
+    return start, min(end, object_size - 1)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Return True if an If-None-Match header matches the given (quoted) ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # If-None-Match uses weak comparison
+    return any(candidate.removeprefix("W/") == etag.removeprefix("W/") for candidate in candidates)
+
+
+def iter_batches(iterable, size: int):
+    """Yield lists of up to `size` items from an iterable without materialising it"""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
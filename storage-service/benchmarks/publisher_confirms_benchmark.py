@@ -0,0 +1,215 @@
+"""
+Publisher confirm benchmark against an in-process stand-in broker
+
+Compares two ways of getting a broker confirm for every upload event:
+
+  sync-pool   a pool of channels, each waiting for the confirm of one message
+              before publishing the next (BlockingChannel.confirm_delivery)
+  pipelined   one ConfirmingPublisher connection with many unconfirmed
+              messages in flight and cumulative acks
+
+The stand-in broker models a network round trip and a disk sync per batch of
+persistent messages, and acks everything that arrived before the sync with a
+single multiple=True Basic.Ack, as RabbitMQ does. Numbers therefore show the
+effect of pipelining under the configured latencies, not RabbitMQ itself.
+
+Usage:
+    python benchmarks/publisher_confirms_benchmark.py --messages 5000 --callers 64
+"""
+import argparse
+import json
+import os
+import queue
+import statistics
+import sys
+import threading
+import time
+
+import pika
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services import rabbitmq_utils  # noqa: E402
+from app.services.rabbitmq_utils import ConfirmingPublisher  # noqa: E402
+
+
+class StandInIOLoop:
+    def __init__(self):
+        self._callbacks = queue.Queue()
+        self._running = False
+
+    def add_callback_threadsafe(self, callback):
+        self._callbacks.put(callback)
+
+    def start(self):
+        self._running = True
+        while self._running:
+            self._callbacks.get()()
+
+    def stop(self):
+        self._running = False
+        self._callbacks.put(lambda: None)
+
+
+class StandInBroker:
+    """Acks every message that arrived before each simulated disk sync"""
+
+    def __init__(self, one_way_latency: float, sync_time: float):
+        self.one_way_latency = one_way_latency
+        self.sync_time = sync_time
+        self._inbox = queue.Queue()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def receive(self, channel, delivery_tag: int):
+        self._inbox.put((time.perf_counter() + self.one_way_latency, channel, delivery_tag))
+
+    def _run(self):
+        while True:
+            arrivals = [self._inbox.get()]
+            while True:
+                try:
+                    arrivals.append(self._inbox.get_nowait())
+                except queue.Empty:
+                    break
+            delay = arrivals[-1][0] - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            time.sleep(self.sync_time)
+            highest = {}
+            for _, channel, delivery_tag in arrivals:
+                highest[channel] = max(highest.get(channel, 0), delivery_tag)
+            for channel, delivery_tag in highest.items():
+                threading.Timer(self.one_way_latency, channel.ack, args=(delivery_tag,)).start()
+
+
+class StandInChannel:
+    def __init__(self, connection):
+        self._connection = connection
+        self._on_confirm = None
+        self._delivery_tag = 0
+
+    def _later(self, callback, *args):
+        self._connection.ioloop.add_callback_threadsafe(lambda: callback(*args))
+
+    def add_on_close_callback(self, callback):
+        pass
+
+    def exchange_declare(self, callback=None, **kwargs):
+        self._later(callback, None)
+
+    def queue_declare(self, callback=None, **kwargs):
+        self._later(callback, None)
+
+    def queue_bind(self, callback=None, **kwargs):
+        self._later(callback, None)
+
+    def confirm_delivery(self, ack_nack_callback, callback=None):
+        self._on_confirm = ack_nack_callback
+        self._later(callback, None)
+
+    def basic_publish(self, exchange, routing_key, body, properties=None):
+        self._delivery_tag += 1
+        self._connection.broker.receive(self, self._delivery_tag)
+
+    def ack(self, delivery_tag: int):
+        frame = pika.frame.Method(1, pika.spec.Basic.Ack(delivery_tag=delivery_tag, multiple=True))
+        self._later(self._on_confirm, frame)
+
+
+class StandInConnection:
+    def __init__(self, broker, on_open, on_open_error, on_close):
+        self.broker = broker
+        self.ioloop = StandInIOLoop()
+        self.is_open = True
+        self.ioloop.add_callback_threadsafe(lambda: on_open(self))
+
+    def channel(self, on_open_callback):
+        self.ioloop.add_callback_threadsafe(lambda: on_open_callback(StandInChannel(self)))
+
+    def close(self):
+        self.is_open = False
+        self.ioloop.stop()
+
+
+def _publisher(broker, max_unconfirmed: int) -> ConfirmingPublisher:
+    return ConfirmingPublisher(
+        connection_factory=lambda *callbacks: StandInConnection(broker, *callbacks),
+        max_unconfirmed=max_unconfirmed
+    )
+
+
+def _run(publish, messages: int, callers: int) -> dict:
+    latencies = []
+    lock = threading.Lock()
+    per_caller = messages // callers
+
+    def caller():
+        local = []
+        for _ in range(per_caller):
+            started = time.perf_counter()
+            publish().result(30)
+            local.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=caller) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "messages": len(latencies),
+        "throughput_msgs_per_s": round(len(latencies) / elapsed, 1),
+        "latency_p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "latency_p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--callers", type=int, default=64, help="concurrent request threads")
+    parser.add_argument("--pool-size", type=int, default=4, help="channels in the sync-pool baseline")
+    parser.add_argument("--rtt-ms", type=float, default=0.5, help="network round trip to the broker")
+    parser.add_argument("--sync-ms", type=float, default=2.0, help="broker disk sync per batch")
+    args = parser.parse_args()
+
+    rabbitmq_utils.logger.setLevel("WARNING")
+    broker = StandInBroker(args.rtt_ms / 2000, args.sync_ms / 1000)
+    body = json.dumps({"event_type": "document_uploaded", "file_path": "acme/retail/sc/spec-1.pdf"})
+
+    pool = queue.Queue()
+    for _ in range(args.pool_size):
+        pool.put(_publisher(broker, max_unconfirmed=1))
+
+    class _Done:
+        def __init__(self, future, publisher):
+            self._future = future
+            self._publisher = publisher
+
+        def result(self, timeout):
+            try:
+                return self._future.result(timeout)
+            finally:
+                pool.put(self._publisher)
+
+    def sync_publish():
+        publisher = pool.get()
+        return _Done(publisher.publish("document_upload_queue", body), publisher)
+
+    pipelined = _publisher(broker, max_unconfirmed=10000)
+
+    results = {
+        "config": vars(args),
+        "sync-pool": _run(sync_publish, args.messages, args.callers),
+        "pipelined": _run(lambda: pipelined.publish("document_upload_queue", body), args.messages, args.callers),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
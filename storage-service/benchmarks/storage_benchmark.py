@@ -0,0 +1,321 @@
+"""
+Upload benchmark for the MinIO and S3 storage code paths
+
+Sweeps object size, upload concurrency, part size and compression for
+upload_file_to_minio and upload_file_to_s3, and reports throughput, p50/p99
+latency and peak RSS per configuration as JSON.
+
+Every configuration runs in a fresh subprocess, so settings that are read at
+import time (part size, compression, connection pool size) take effect and
+peak RSS is measured per configuration. Objects are deleted after each run.
+
+Targets:
+  --moto        start an in-process moto S3 server and point both backends at it
+  (default)     use MINIO_ENDPOINT / S3_ENDPOINT_URL and credentials from the
+                environment, e.g. a local MinIO container:
+                docker run -p 9000:9000 minio/minio server /data
+
+Payloads are generated once per size under --workdir. "text" payloads are
+CSV-like and compress well, "random" payloads do not compress at all.
+
+Usage:
+    python benchmarks/storage_benchmark.py --moto --sizes 1KB,1MB,64MB --concurrency 1,8
+    python benchmarks/storage_benchmark.py --sizes 1KB,1MB,64MB,1GB,5GB --output report.json
+    python benchmarks/storage_benchmark.py --moto --baseline report.json --tolerance 0.2
+
+With --baseline, configurations whose throughput dropped or whose p99 latency
+grew by more than the tolerance are listed under "regressions" and the script
+exits with status 1.
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+SERVICE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+UNITS = {"B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+WRITE_CHUNK = 8 * 1024 * 1024
+
+
+def parse_size(text: str) -> int:
+    text = text.strip().upper()
+    for unit in sorted(UNITS, key=len, reverse=True):
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * UNITS[unit])
+    return int(text)
+
+
+def format_size(size: int) -> str:
+    for unit in ("GB", "MB", "KB"):
+        if size >= UNITS[unit] and size % UNITS[unit] == 0:
+            return f"{size // UNITS[unit]}{unit}"
+    return f"{size}B"
+
+
+def write_payload(path: str, size: int, kind: str):
+    """Write a payload file once; text payloads are deterministic CSV rows"""
+    if os.path.exists(path) and os.path.getsize(path) == size:
+        return
+    with open(path, "wb") as file_out:
+        written = 0
+        row = 0
+        while written < size:
+            if kind == "random":
+                chunk = os.urandom(min(WRITE_CHUNK, size - written))
+            else:
+                rows = []
+                length = 0
+                while length < min(WRITE_CHUNK, size - written):
+                    line = b"%d,acme,retail,supply-chain,spec,inventory-api,%d,platform\n" % (row, row * 7919 % 100003)
+                    rows.append(line)
+                    length += len(line)
+                    row += 1
+                chunk = b"".join(rows)[:size - written]
+            file_out.write(chunk)
+            written += len(chunk)
+
+
+def _percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(int(len(ordered) * fraction + 0.5) - 1, 0)]
+
+
+def _peak_rss_bytes() -> int:
+    """Peak RSS of this process; VmHWM is not inherited from the parent across exec"""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+def run_config(config: dict) -> dict:
+    """Run one configuration in this process; settings come from the environment"""
+    sys.path.insert(0, SERVICE_ROOT)
+    bucket_name = config["bucket"]
+    if config["backend"] == "minio":
+        from app.services import minio_storage
+        minio_storage.logger.setLevel("WARNING")
+        minio_storage.ensure_bucket_exists(bucket_name)
+
+        def upload(object_name: str):
+            minio_storage.upload_file_to_minio(config["payload"], bucket_name, object_name)
+
+        def stored_size(object_name: str) -> int:
+            return minio_storage.minio_client.stat_object(bucket_name, object_name).size
+
+        delete = minio_storage.delete_file_from_minio
+    else:
+        from app.services import S3_storage
+        try:
+            S3_storage.s3_client.head_bucket(Bucket=bucket_name)
+        except Exception:
+            S3_storage.s3_client.create_bucket(Bucket=bucket_name)
+
+        def upload(object_name: str):
+            S3_storage.upload_file_to_s3(config["payload"], bucket_name, object_name)
+
+        def stored_size(object_name: str) -> int:
+            return S3_storage.s3_client.head_object(Bucket=bucket_name, Key=object_name)["ContentLength"]
+
+        delete = S3_storage.delete_file_from_s3
+
+    # The extension drives the compression decision, as it does for real documents
+    extension = ".csv" if config["payload_kind"] == "text" else ".bin"
+    prefix = f"benchmark/{uuid.uuid4().hex}"
+    object_names = [f"{prefix}/{index}{extension}" for index in range(config["uploads"])]
+    latencies = []
+
+    def timed_upload(object_name: str):
+        started = time.perf_counter()
+        upload(object_name)
+        latencies.append(time.perf_counter() - started)
+
+    # One warm-up upload so connection setup is not counted
+    timed_upload(f"{prefix}/warmup{extension}")
+    latencies.clear()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=config["concurrency"]) as executor:
+        list(executor.map(timed_upload, object_names))
+    elapsed = time.perf_counter() - started
+
+    stored = stored_size(object_names[0])
+    for object_name in object_names + [f"{prefix}/warmup{extension}"]:
+        delete(bucket_name, object_name)
+
+    peak_rss = _peak_rss_bytes()
+    total_bytes = config["size"] * len(latencies)
+    return {
+        "uploads": len(latencies),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_mb_per_s": round(total_bytes / elapsed / UNITS["MB"], 2),
+        "uploads_per_s": round(len(latencies) / elapsed, 2),
+        "latency_p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "latency_p99_ms": round(_percentile(latencies, 0.99) * 1000, 3),
+        "peak_rss_mb": round(peak_rss / UNITS["MB"], 1),
+        "stored_bytes": stored,
+        "storage_ratio": round(stored / config["size"], 4),
+    }
+
+
+def _config_key(result: dict) -> str:
+    return "{backend}/{payload_kind}/{size_label}/c{concurrency}/p{part_size_label}/{compression}".format(**result)
+
+
+def _run_subprocess(config: dict, environment: dict) -> dict:
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--run-config", json.dumps(config)],
+        env=environment,
+        capture_output=True,
+        text=True
+    )
+    if completed.returncode != 0:
+        return {"error": completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "failed"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def compare(results: list, baseline: dict, tolerance: float) -> list:
+    """List configurations that regressed against a previous report"""
+    previous = {_config_key(result): result for result in baseline.get("results", []) if "error" not in result}
+    regressions = []
+    for result in results:
+        before = previous.get(_config_key(result))
+        if before is None or "error" in result:
+            continue
+        if result["throughput_mb_per_s"] < before["throughput_mb_per_s"] * (1 - tolerance):
+            regressions.append({"config": _config_key(result), "metric": "throughput_mb_per_s",
+                                "baseline": before["throughput_mb_per_s"], "current": result["throughput_mb_per_s"]})
+        if result["latency_p99_ms"] > before["latency_p99_ms"] * (1 + tolerance):
+            regressions.append({"config": _config_key(result), "metric": "latency_p99_ms",
+                                "baseline": before["latency_p99_ms"], "current": result["latency_p99_ms"]})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", default="minio,s3", help="comma-separated: minio, s3")
+    parser.add_argument("--sizes", default="1KB,1MB,16MB,64MB", help="object sizes, e.g. 1KB,1MB,1GB,5GB")
+    parser.add_argument("--concurrency", default="1,8", help="concurrent uploads")
+    parser.add_argument("--part-sizes", default="16MB", help="multipart part sizes (at least 5MB)")
+    parser.add_argument("--compression", default="off", help="off, on or off,on (MinIO only)")
+    parser.add_argument("--payload", default="text", choices=["text", "random"])
+    parser.add_argument("--uploads", type=int, default=16, help="uploads per configuration")
+    parser.add_argument("--max-bytes-per-config", default="2GB",
+                        help="cap on uploaded bytes per configuration; large sizes run one upload per worker")
+    parser.add_argument("--bucket", default="storage-benchmark")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "storage-benchmark"))
+    parser.add_argument("--moto", action="store_true", help="run against an in-process moto S3 server")
+    parser.add_argument("--output", help="write the JSON report to this file as well as stdout")
+    parser.add_argument("--baseline", help="previous JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed relative regression")
+    parser.add_argument("--run-config", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_config:
+        print(json.dumps(run_config(json.loads(args.run_config))))
+        return
+
+    environment = dict(os.environ)
+    server = None
+    if args.moto:
+        from moto.server import ThreadedMotoServer
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)
+        server = ThreadedMotoServer(port=0, verbose=False)
+        server.start()
+        host, port = server.get_host_and_port()
+        environment.update({
+            "MINIO_ENDPOINT": f"{host}:{port}",
+            "S3_ENDPOINT_URL": f"http://{host}:{port}",
+            "MINIO_ACCESS_KEY": "benchmark",
+            "MINIO_SECRET_KEY": "benchmark",
+            "AWS_ACCESS_KEY_ID": "benchmark",
+            "AWS_SECRET_ACCESS_KEY": "benchmark",
+            "AWS_DEFAULT_REGION": "us-east-1",
+        })
+    environment["MINIO_BUCKETS"] = args.bucket
+    environment["MINIO_CONTENT_ADDRESSED"] = "false"
+
+    os.makedirs(args.workdir, exist_ok=True)
+    max_bytes = parse_size(args.max_bytes_per_config)
+    results = []
+    try:
+        matrix = itertools.product(
+            args.backends.split(","),
+            [parse_size(size) for size in args.sizes.split(",")],
+            [int(value) for value in args.concurrency.split(",")],
+            [parse_size(size) for size in args.part_sizes.split(",")],
+            args.compression.split(",")
+        )
+        for backend, size, concurrency, part_size, compression in matrix:
+            if backend == "s3" and compression == "on":
+                continue
+            payload = os.path.join(args.workdir, f"{args.payload}-{size}.bin")
+            write_payload(payload, size, args.payload)
+            config = {
+                "backend": backend,
+                "payload_kind": args.payload,
+                "size": size,
+                "size_label": format_size(size),
+                "concurrency": concurrency,
+                "part_size": part_size,
+                "part_size_label": format_size(part_size),
+                "compression": compression,
+                "uploads": max(concurrency, min(args.uploads, max_bytes // size)),
+                "payload": payload,
+                "bucket": args.bucket,
+            }
+            run_environment = dict(environment)
+            run_environment.update({
+                "MINIO_PART_SIZE": str(part_size),
+                "MINIO_UPLOAD_CONCURRENCY": str(max(4, concurrency)),
+                "MINIO_COMPRESSION": "true" if compression == "on" else "false",
+                "S3_PART_SIZE": str(part_size),
+            })
+            result = {key: value for key, value in config.items() if key != "payload"}
+            result.update(_run_subprocess(config, run_environment))
+            results.append(result)
+            print(f"{_config_key(result)}: {result.get('throughput_mb_per_s', result.get('error'))}", file=sys.stderr)
+    finally:
+        if server is not None:
+            server.stop()
+
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "target": "moto" if args.moto else environment.get("MINIO_ENDPOINT", "minio:9000"),
+        },
+        "config": {key: value for key, value in vars(args).items() if key != "run_config"},
+        "results": results,
+    }
+    if args.baseline:
+        with open(args.baseline) as file_in:
+            report["regressions"] = compare(results, json.load(file_in), args.tolerance)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as file_out:
+            file_out.write(text)
+    if report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()